@@ -0,0 +1,68 @@
+'''Benchmark of native glTF loading from several Python threads
+
+Run from the repository root:
+    python bench/bench_gil.py [grid_size] [threads] [loads_per_thread]
+
+The script exports the grid mesh into the temporary folder and loads this file by tiny_gltf.load_gltf
+Native functions release the GIL, so threaded loads can run in parallel on several cores
+and the main thread can execute Python code while files are parsed
+The script prints the time of sequential and threaded loads,
+and the number of iterations of the Python loop in the main thread during threaded loads
+if the GIL is held by loads, then the main thread is blocked and this number is small
+'''
+import os
+import sys
+import time
+import tempfile
+import threading
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from py3dscene.bin import tiny_gltf
+from py3dscene.scene import Scene
+from py3dscene.mesh import create_mesh_from_buffers
+from py3dscene.gltf_io import to_gltf
+
+def export_grid(file_path: str, size: int) -> None:
+    positions: list[float] = [c for y in range(size + 1) for x in range(size + 1) for c in (x * 0.1, y * 0.1, 0.0)]
+    indices: list[int] = [v for y in range(size) for x in range(size)
+                            for v in (y * (size + 1) + x, y * (size + 1) + x + 1, (y + 1) * (size + 1) + x + 1, (y + 1) * (size + 1) + x)]
+    scene: Scene = Scene()
+    scene.create_object("grid").add_mesh_component(create_mesh_from_buffers(positions, indices, [4] * (size * size)))
+    to_gltf(scene, file_path)
+
+def load_several_times(file_path: str, count: int) -> None:
+    for _ in range(count):
+        tiny_gltf.load_gltf(file_path)
+
+def main() -> None:
+    size: int = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    threads_count: int = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    loads_count: int = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    current_dir: str = os.getcwd()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        os.chdir(temp_dir)
+        try:
+            file_path: str = "grid\\grid.glb"
+            export_grid(file_path, size)
+
+            start: float = time.perf_counter()
+            for _ in range(threads_count):
+                load_several_times(file_path, loads_count)
+            sequential_time: float = time.perf_counter() - start
+
+            threads: list[threading.Thread] = [threading.Thread(target=load_several_times, args=(file_path, loads_count)) for _ in range(threads_count)]
+            iterations: int = 0
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            while any(thread.is_alive() for thread in threads):
+                iterations += 1
+            threaded_time: float = time.perf_counter() - start
+        finally:
+            os.chdir(current_dir)
+    print(f"{size * size} quads, {threads_count} threads, {loads_count} loads per thread, {os.cpu_count()} cpus")
+    print(f"sequential {sequential_time:.3f} s, threaded {threaded_time:.3f} s")
+    print(f"main thread iterations during threaded loads: {iterations} ({iterations / threaded_time:.0f} per second)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+'''Benchmark of scene object and material lookups
+
+Run from the repository root:
+    python bench/bench_lookup.py [objects_count] [queries_count]
+
+The script creates the hierarchy of objects (roots with chains of three subobjects) and materials
+and measures the time of lookups by id and by name
+For comparison the same objects are also found by the walk over the whole hierarchy
+'''
+import os
+import sys
+import time
+import random
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typing import Optional
+from py3dscene.scene import Scene
+from py3dscene.object import Object
+
+CHAINS_PER_ROOT: int = 100
+
+def create_scene(objects_count: int) -> Scene:
+    scene: Scene = Scene()
+    created: int = 0
+    while created < objects_count:
+        root: Object = scene.create_object("root")
+        created += 1
+        for i in range(CHAINS_PER_ROOT):
+            a: Object = root.create_subobject("a" + str(i))
+            b: Object = a.create_subobject("b")
+            b.create_subobject("c")
+            created += 3
+        scene.create_material("material_" + str(created))
+    return scene
+
+def find_by_walk(scene: Scene, id: int) -> Optional[Object]:
+    '''Find the object by checking all objects of the scene
+    '''
+    stack: list[Object] = list(scene.get_root_objects())
+    while len(stack) > 0:
+        obj: Object = stack.pop()
+        if obj.get_id() == id:
+            return obj
+        stack.extend(obj.get_children())
+    return None
+
+def main() -> None:
+    objects_count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    queries_count: int = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    start: float = time.perf_counter()
+    scene: Scene = create_scene(objects_count)
+    build_time: float = time.perf_counter() - start
+
+    ids: list[int] = []
+    stack: list[Object] = list(scene.get_root_objects())
+    while len(stack) > 0:
+        obj: Object = stack.pop()
+        ids.append(obj.get_id())
+        stack.extend(obj.get_children())
+    random.seed(1)
+    queries: list[int] = random.sample(ids, min(queries_count, len(ids)))
+    materials: list[int] = [m.get_id() for m in scene.get_all_materials()]
+
+    start = time.perf_counter()
+    for id in queries:
+        scene.get_object_by_id(id)
+    by_id_time: float = (time.perf_counter() - start) / len(queries)
+    start = time.perf_counter()
+    for i in range(len(queries)):
+        scene.get_objects_by_name("a" + str(i % CHAINS_PER_ROOT))
+    by_name_time: float = (time.perf_counter() - start) / len(queries)
+    start = time.perf_counter()
+    for i in range(len(queries)):
+        scene.get_material(materials[i % len(materials)])
+    material_time: float = (time.perf_counter() - start) / len(queries)
+    start = time.perf_counter()
+    for id in queries:
+        find_by_walk(scene, id)
+    walk_time: float = (time.perf_counter() - start) / len(queries)
+
+    print(f"{len(ids)} objects, {len(materials)} materials, build {build_time:.2f} s")
+    print(f"get_object_by_id {by_id_time * 1000:.4f} ms, hierarchy walk {walk_time * 1000:.4f} ms")
+    print(f"get_objects_by_name {by_name_time * 1000:.4f} ms, get_material {material_time * 1000:.4f} ms")
+
+if __name__ == "__main__":
+    main()
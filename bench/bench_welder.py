@@ -0,0 +1,76 @@
+'''Benchmark of vertex welding in the mesh export (optimize_mesh_nodes=True)
+
+Run from the repository root:
+    python bench/bench_welder.py [grid_size ...]
+
+For each grid size the script creates the grid of quads with per-corner normals and uvs
+and encodes it as glTF primitive with and without welding
+For small grids the result is also compared with the brute-force search of coincident vertices,
+which checks each new vertex against all previous ones
+'''
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from py3dscene.mesh import MeshComponent
+from py3dscene.io.gltf_export.export_mesh import VertexType
+from py3dscene.io.gltf_export.export_mesh import VertexWelder
+from py3dscene.io.gltf_export.export_mesh import is_vertices_equal
+from py3dscene.io.gltf_export.export_mesh import encode_mesh_component
+
+# brute-force search is quadratic, so use it only for small grids
+BRUTE_FORCE_LIMIT: int = 20
+
+class BruteForceWelder(VertexWelder):
+    '''Reference welder, which compares each vertex with all previous vertices
+    '''
+    def add_vertex(self, vertex: VertexType) -> int:
+        for i, v in enumerate(self._vertices):
+            if is_vertices_equal(v, vertex):
+                return i
+        self._vertices.append(vertex)
+        return len(self._vertices) - 1
+
+def create_grid(size: int) -> MeshComponent:
+    vertices: list[tuple[float, float, float]] = [(x * 0.1, y * 0.1, 0.0) for y in range(size + 1) for x in range(size + 1)]
+    polygons: list[tuple[int, ...]] = [(y * (size + 1) + x, y * (size + 1) + x + 1, (y + 1) * (size + 1) + x + 1, (y + 1) * (size + 1) + x)
+                                       for y in range(size) for x in range(size)]
+    mesh: MeshComponent = MeshComponent(vertices, polygons)
+    mesh.add_normals([(0.0, 0.0, 1.0)] * (4 * size * size))
+    mesh.add_uvs([(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0)] * (size * size))
+    return mesh
+
+def weld_brute_force(mesh: MeshComponent) -> int:
+    welder: BruteForceWelder = BruteForceWelder()
+    triangles = mesh.get_triangulation_buffer()
+    nodes = mesh.get_triangle_nodes_buffer()
+    vertices = mesh.get_vertices()
+    for i in range(len(triangles)):
+        welder.add_vertex((vertices[triangles[i]],
+                           mesh.get_node_normals(nodes[i]),
+                           mesh.get_node_uvs(nodes[i]),
+                           mesh.get_node_colors(nodes[i]),
+                           mesh.get_node_tangents(nodes[i]),
+                           mesh.get_vertex_shapes(triangles[i])))
+    return len(welder.get_vertices())
+
+def main() -> None:
+    sizes: list[int] = [int(v) for v in sys.argv[1:]] if len(sys.argv) > 1 else [20, 40, 150]
+    for size in sizes:
+        mesh: MeshComponent = create_grid(size)
+        start: float = time.perf_counter()
+        plain = encode_mesh_component(mesh, False)
+        plain_time: float = time.perf_counter() - start
+        start = time.perf_counter()
+        welded = encode_mesh_component(mesh, True)
+        welded_time: float = time.perf_counter() - start
+        line: str = f"{size * size} quads: plain {plain_time:.3f} s, welded {welded_time:.3f} s ({welded[1][0][1][1]} vertices)"
+        if size <= BRUTE_FORCE_LIMIT:
+            start = time.perf_counter()
+            brute_count: int = weld_brute_force(mesh)
+            line += f", brute force {time.perf_counter() - start:.3f} s ({brute_count} vertices)"
+        print(line)
+
+if __name__ == "__main__":
+    main()
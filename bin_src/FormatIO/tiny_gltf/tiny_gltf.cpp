@@ -5,6 +5,29 @@
 #include "tinygltf/tiny_gltf.h"
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
+#include <pybind11/stl_bind.h>
+
+// vectors of glTF objects are bound as opaque types
+// so, access to one element from Python does not convert the whole vector to the list
+PYBIND11_MAKE_OPAQUE(std::vector<tinygltf::Accessor>);
+PYBIND11_MAKE_OPAQUE(std::vector<tinygltf::Animation>);
+PYBIND11_MAKE_OPAQUE(std::vector<tinygltf::AnimationChannel>);
+PYBIND11_MAKE_OPAQUE(std::vector<tinygltf::AnimationSampler>);
+PYBIND11_MAKE_OPAQUE(std::vector<tinygltf::Buffer>);
+PYBIND11_MAKE_OPAQUE(std::vector<tinygltf::BufferView>);
+PYBIND11_MAKE_OPAQUE(std::vector<tinygltf::Material>);
+PYBIND11_MAKE_OPAQUE(std::vector<tinygltf::Mesh>);
+PYBIND11_MAKE_OPAQUE(std::vector<tinygltf::Primitive>);
+PYBIND11_MAKE_OPAQUE(std::vector<tinygltf::Node>);
+PYBIND11_MAKE_OPAQUE(std::vector<tinygltf::Texture>);
+PYBIND11_MAKE_OPAQUE(std::vector<tinygltf::Image>);
+PYBIND11_MAKE_OPAQUE(std::vector<tinygltf::Skin>);
+PYBIND11_MAKE_OPAQUE(std::vector<tinygltf::Sampler>);
+PYBIND11_MAKE_OPAQUE(std::vector<tinygltf::Camera>);
+PYBIND11_MAKE_OPAQUE(std::vector<tinygltf::Scene>);
+PYBIND11_MAKE_OPAQUE(std::vector<tinygltf::Light>);
+PYBIND11_MAKE_OPAQUE(std::vector<tinygltf::AudioEmitter>);
+PYBIND11_MAKE_OPAQUE(std::vector<tinygltf::AudioSource>);
 
 tinygltf::Model load_gltf(const std::string filename) {
     tinygltf::Model model;
@@ -31,7 +54,7 @@ tinygltf::Model load_gltf(const std::string filename) {
     return model;
 }
 
-bool save_gltf(const tinygltf::Model model, const std::string filename, bool embed_images, bool embed_buffers, bool pretty_print, bool write_binary) {
+bool save_gltf(const tinygltf::Model& model, const std::string filename, bool embed_images, bool embed_buffers, bool pretty_print, bool write_binary) {
     tinygltf::TinyGLTF loader;
 
     tinygltf::WriteImageDataFunction WriteImageData = &tinygltf::WriteImageData;
@@ -46,12 +69,68 @@ bool save_gltf(const tinygltf::Model model, const std::string filename, bool emb
     return loader.WriteGltfSceneToFile(&model, filename, embed_images, embed_buffers, pretty_print, write_binary);
 }
 
-bool write_png(const std::string file_path, int width, int height, int components, const std::vector<int> pixels) {
-    unsigned char* u_pixels = new unsigned char[pixels.size()];
-    for (size_t i = 0; i < pixels.size(); i++) {
-        u_pixels[i] = pixels[i];
+// check that the image size is valid and the pixels array contains enough bytes for this size
+void check_png_size(int width, int height, int components, Py_ssize_t pixels_size) {
+    if (width < 0 || height < 0 || components < 1 || components > 4) {
+        throw pybind11::value_error("Invalid image size");
     }
-    int out = stbi_write_png(file_path.c_str(), width, height, components, u_pixels, width * components);
+    if (pixels_size < (Py_ssize_t)width * height * components) {
+        throw pybind11::value_error("Pixels array is shorter than width * height * components");
+    }
+}
+
+// check that items of the buffer are bytes, the format can start from the byte order character
+bool is_bytes_buffer(const Py_buffer& view) {
+    if (view.itemsize != 1) {
+        return false;
+    }
+    if (view.format == nullptr) {
+        return true;
+    }
+    std::string format(view.format);
+    if (format.size() == 2 && std::string("@=<>!").find(format[0]) != std::string::npos) {
+        format = format.substr(1);
+    }
+    return format == "B" || format == "b" || format == "c";
+}
+
+bool write_png(const std::string file_path, int width, int height, int components, const pybind11::object& pixels) {
+    if (PyObject_CheckBuffer(pixels.ptr())) {
+        // write pixels directly from the memory of the input object
+        Py_buffer view;
+        if (PyObject_GetBuffer(pixels.ptr(), &view, PyBUF_C_CONTIGUOUS | PyBUF_FORMAT) != 0) {
+            throw pybind11::error_already_set();
+        }
+        if (is_bytes_buffer(view)) {
+            try {
+                check_png_size(width, height, components, view.len);
+            }
+            catch (...) {
+                PyBuffer_Release(&view);
+                throw;
+            }
+            int out = 0;
+            {
+                // the buffer is locked by the view, so other threads can not resize it
+                pybind11::gil_scoped_release release;
+                out = stbi_write_png(file_path.c_str(), width, height, components, view.buf, width * components);
+            }
+            PyBuffer_Release(&view);
+            return out > 0;
+        }
+        // items of the buffer are not bytes, so convert each item as for other sequences
+        PyBuffer_Release(&view);
+    }
+    std::vector<unsigned char> u_pixels;
+    try {
+        u_pixels = pixels.cast<std::vector<unsigned char>>();
+    }
+    catch (const pybind11::cast_error&) {
+        throw pybind11::value_error("Pixels should be bytes or a sequence of integers from 0 to 255");
+    }
+    check_png_size(width, height, components, (Py_ssize_t)u_pixels.size());
+    pybind11::gil_scoped_release release;
+    int out = stbi_write_png(file_path.c_str(), width, height, components, u_pixels.data(), width * components);
     return out > 0;
 }
 
@@ -62,15 +141,58 @@ std::vector<int> get_image_info(const std::string file_name) {
     return { width, height, channels, is_ok ? 1 : 0 };
 }
 
-std::vector<unsigned char> load_image(const std::string file_path) {
+pybind11::bytes load_image(const std::string file_path) {
     int width, height, components;
-    unsigned char* data = stbi_load(file_path.c_str(), &width, &height, &components, 0);
-    std::vector<unsigned char> to_return((size_t)width * height * components);
-    to_return.assign(data, data + width * height * components);
-    
+    unsigned char* data = nullptr;
+    {
+        // decode the image without GIL, Python objects are created only after it
+        pybind11::gil_scoped_release release;
+        data = stbi_load(file_path.c_str(), &width, &height, &components, 0);
+    }
+    if (data == nullptr) {
+        return pybind11::bytes();
+    }
+    pybind11::bytes to_return(reinterpret_cast<const char*>(data), (size_t)width * height * components);
+    stbi_image_free(data);
+
     return to_return;
 }
 
+// describe bytes array as one-dimensional buffer, so Python can read it without copy to the list
+pybind11::buffer_info bytes_buffer_info(std::vector<unsigned char>& data) {
+    return pybind11::buffer_info(data.data(),
+                                 sizeof(unsigned char),
+                                 pybind11::format_descriptor<unsigned char>::format(),
+                                 1,
+                                 { data.size() },
+                                 { sizeof(unsigned char) });
+}
+
+// assign bytes array from any object with buffer protocol (bytes, bytearray, memoryview, array)
+// or from the list of integers
+void assign_bytes(std::vector<unsigned char>& data, const pybind11::object& value) {
+    if (PyObject_CheckBuffer(value.ptr())) {
+        Py_buffer view;
+        if (PyObject_GetBuffer(value.ptr(), &view, PyBUF_C_CONTIGUOUS) != 0) {
+            throw pybind11::error_already_set();
+        }
+        const unsigned char* ptr = static_cast<const unsigned char*>(view.buf);
+        data.assign(ptr, ptr + view.len);
+        PyBuffer_Release(&view);
+    }
+    else {
+        data = value.cast<std::vector<unsigned char>>();
+    }
+}
+
+// bind vector of glTF objects as indexable Python type
+// it also can be assigned from the Python list
+template <typename T>
+void bind_objects_vector(pybind11::module_& py_module, const char* name) {
+    pybind11::bind_vector<std::vector<T>>(py_module, name);
+    pybind11::implicitly_convertible<pybind11::list, std::vector<T>>();
+}
+
 #ifdef PYTHON310
 PYBIND11_MODULE(tiny_gltf_py310, py_module) {
 #else
@@ -145,15 +267,18 @@ PYBIND11_MODULE(tiny_gltf_py39, py_module) {
         .def_readwrite("extras_json_string", &tinygltf::Sampler::extras_json_string)
         .def_readwrite("extensions_json_string", &tinygltf::Sampler::extensions_json_string);
 
-    pybind11::class_<tinygltf::Image>(py_module, "Image")
+    pybind11::class_<tinygltf::Image>(py_module, "Image", pybind11::buffer_protocol())
         .def(pybind11::init<>())
+        .def_buffer([](tinygltf::Image& self) -> pybind11::buffer_info { return bytes_buffer_info(self.image); })
         .def_readwrite("name", &tinygltf::Image::name)
         .def_readwrite("width", &tinygltf::Image::width)
         .def_readwrite("height", &tinygltf::Image::height)
         .def_readwrite("component", &tinygltf::Image::component)
         .def_readwrite("bits", &tinygltf::Image::bits)
         .def_readwrite("pixel_type", &tinygltf::Image::pixel_type)
-        .def_readwrite("image", &tinygltf::Image::image)
+        .def_property("image",
+                      [](pybind11::object self) { return pybind11::memoryview(self); },
+                      [](tinygltf::Image& self, const pybind11::object& value) { assign_bytes(self.image, value); })
         .def_readwrite("buffer_view", &tinygltf::Image::bufferView)
         .def_readwrite("mime_type", &tinygltf::Image::mimeType)
         .def_readwrite("uri", &tinygltf::Image::uri)
@@ -228,6 +353,21 @@ PYBIND11_MODULE(tiny_gltf_py39, py_module) {
         .def_readwrite("extensions_json_string", &tinygltf::BufferView::extensions_json_string)
         .def_readwrite("draco_decoded", &tinygltf::BufferView::dracoDecoded);
 
+    pybind11::class_<decltype(tinygltf::Accessor::Sparse::indices)>(py_module, "AccessorSparseIndices")
+        .def_readwrite("byte_offset", &decltype(tinygltf::Accessor::Sparse::indices)::byteOffset)
+        .def_readwrite("buffer_view", &decltype(tinygltf::Accessor::Sparse::indices)::bufferView)
+        .def_readwrite("component_type", &decltype(tinygltf::Accessor::Sparse::indices)::componentType);
+
+    pybind11::class_<decltype(tinygltf::Accessor::Sparse::values)>(py_module, "AccessorSparseValues")
+        .def_readwrite("buffer_view", &decltype(tinygltf::Accessor::Sparse::values)::bufferView)
+        .def_readwrite("byte_offset", &decltype(tinygltf::Accessor::Sparse::values)::byteOffset);
+
+    pybind11::class_<tinygltf::Accessor::Sparse>(py_module, "AccessorSparse")
+        .def_readwrite("count", &tinygltf::Accessor::Sparse::count)
+        .def_readwrite("is_sparse", &tinygltf::Accessor::Sparse::isSparse)
+        .def_readwrite("indices", &tinygltf::Accessor::Sparse::indices)
+        .def_readwrite("values", &tinygltf::Accessor::Sparse::values);
+
     pybind11::class_<tinygltf::Accessor>(py_module, "Accessor")
         .def(pybind11::init<>())
         .def_readwrite("buffer_view", &tinygltf::Accessor::bufferView)
@@ -240,7 +380,8 @@ PYBIND11_MODULE(tiny_gltf_py39, py_module) {
         .def_readwrite("extras_json_string", &tinygltf::Accessor::extras_json_string)
         .def_readwrite("extensions_json_string", &tinygltf::Accessor::extensions_json_string)
         .def_readwrite("min_values", &tinygltf::Accessor::minValues)
-        .def_readwrite("max_values", &tinygltf::Accessor::maxValues);
+        .def_readwrite("max_values", &tinygltf::Accessor::maxValues)
+        .def_readwrite("sparse", &tinygltf::Accessor::sparse);
 
     pybind11::class_<tinygltf::PerspectiveCamera>(py_module, "PerspectiveCamera")
         .def(pybind11::init<>())
@@ -304,10 +445,13 @@ PYBIND11_MODULE(tiny_gltf_py39, py_module) {
         .def_readwrite("extras_json_string", &tinygltf::Node::extras_json_string)
         .def_readwrite("extensions_json_string", &tinygltf::Node::extensions_json_string);
 
-    pybind11::class_<tinygltf::Buffer>(py_module, "Buffer")
+    pybind11::class_<tinygltf::Buffer>(py_module, "Buffer", pybind11::buffer_protocol())
         .def(pybind11::init<>())
+        .def_buffer([](tinygltf::Buffer& self) -> pybind11::buffer_info { return bytes_buffer_info(self.data); })
         .def_readwrite("name", &tinygltf::Buffer::name)
-        .def_readwrite("data", &tinygltf::Buffer::data)
+        .def_property("data",
+                      [](pybind11::object self) { return pybind11::memoryview(self); },
+                      [](tinygltf::Buffer& self, const pybind11::object& value) { assign_bytes(self.data, value); })
         .def_readwrite("uri", &tinygltf::Buffer::uri)
         .def_readwrite("extras_json_string", &tinygltf::Buffer::extras_json_string)
         .def_readwrite("extensions_json_string", &tinygltf::Buffer::extensions_json_string);
@@ -405,6 +549,26 @@ PYBIND11_MODULE(tiny_gltf_py39, py_module) {
         .def_readwrite("extras_json_string", &tinygltf::Model::extras_json_string)
         .def_readwrite("extensions_json_string", &tinygltf::Model::extensions_json_string);
 
+    bind_objects_vector<tinygltf::Accessor>(py_module, "AccessorVector");
+    bind_objects_vector<tinygltf::Animation>(py_module, "AnimationVector");
+    bind_objects_vector<tinygltf::AnimationChannel>(py_module, "AnimationChannelVector");
+    bind_objects_vector<tinygltf::AnimationSampler>(py_module, "AnimationSamplerVector");
+    bind_objects_vector<tinygltf::Buffer>(py_module, "BufferVector");
+    bind_objects_vector<tinygltf::BufferView>(py_module, "BufferViewVector");
+    bind_objects_vector<tinygltf::Material>(py_module, "MaterialVector");
+    bind_objects_vector<tinygltf::Mesh>(py_module, "MeshVector");
+    bind_objects_vector<tinygltf::Primitive>(py_module, "PrimitiveVector");
+    bind_objects_vector<tinygltf::Node>(py_module, "NodeVector");
+    bind_objects_vector<tinygltf::Texture>(py_module, "TextureVector");
+    bind_objects_vector<tinygltf::Image>(py_module, "ImageVector");
+    bind_objects_vector<tinygltf::Skin>(py_module, "SkinVector");
+    bind_objects_vector<tinygltf::Sampler>(py_module, "SamplerVector");
+    bind_objects_vector<tinygltf::Camera>(py_module, "CameraVector");
+    bind_objects_vector<tinygltf::Scene>(py_module, "SceneVector");
+    bind_objects_vector<tinygltf::Light>(py_module, "LightVector");
+    bind_objects_vector<tinygltf::AudioEmitter>(py_module, "AudioEmitterVector");
+    bind_objects_vector<tinygltf::AudioSource>(py_module, "AudioSourceVector");
+
     py_module.attr("TINYGLTF_MODE_POINTS") = TINYGLTF_MODE_POINTS;
     py_module.attr("TINYGLTF_MODE_LINE") = TINYGLTF_MODE_LINE;
     py_module.attr("TINYGLTF_MODE_LINE_LOOP") = TINYGLTF_MODE_LINE_LOOP;
@@ -468,9 +632,11 @@ PYBIND11_MODULE(tiny_gltf_py39, py_module) {
     py_module.def("get_component_size_in_bytes", &tinygltf::GetComponentSizeInBytes);
     py_module.def("get_num_components_in_type", &tinygltf::GetNumComponentsInType);
 
-    py_module.def("load_gltf", &load_gltf);
-    py_module.def("save_gltf", &save_gltf);
+    // functions, which work only with C++ data, release the GIL
+    // arguments are converted before the release and the result is converted after it
+    py_module.def("load_gltf", &load_gltf, pybind11::call_guard<pybind11::gil_scoped_release>());
+    py_module.def("save_gltf", &save_gltf, pybind11::call_guard<pybind11::gil_scoped_release>());
     py_module.def("write_png", &write_png);
-    py_module.def("get_image_info", &get_image_info);
+    py_module.def("get_image_info", &get_image_info, pybind11::call_guard<pybind11::gil_scoped_release>());
     py_module.def("load_image", &load_image);
 }
\ No newline at end of file
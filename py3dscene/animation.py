@@ -1,4 +1,12 @@
+from __future__ import annotations  # remove for Python 3.11
+import math
+from array import array
+from bisect import bisect_left
+from bisect import bisect_right
+from itertools import islice
+from operator import gt
 from typing import Optional
+from typing import Sequence
 from enum import Enum
 
 class AnimationCurveType(Enum):
@@ -12,6 +20,30 @@ Vector3dTriple = tuple[Vector3d, Vector3d, Vector3d]
 Quaternion4dTriple = tuple[Quaternion4d, Quaternion4d, Quaternion4d]
 ValuesVariants = Vector3d | Quaternion4d | Vector3dTriple | Quaternion4dTriple
 
+def slerp(a: Sequence[float], b: Sequence[float], t: float) -> Quaternion4d:
+    '''Return spherical interpolation between unit quaternions a and b, t should be in [0, 1]
+    Interpolation goes along the shortest path
+    For very close quaternions use normalized linear interpolation
+    '''
+    ax, ay, az, aw = a
+    bx, by, bz, bw = b
+    dot: float = ax * bx + ay * by + az * bz + aw * bw
+    if dot < 0.0:
+        bx, by, bz, bw = -bx, -by, -bz, -bw
+        dot = -dot
+    if dot > 0.9995:
+        x = ax + t * (bx - ax)
+        y = ay + t * (by - ay)
+        z = az + t * (bz - az)
+        w = aw + t * (bw - aw)
+        l: float = math.sqrt(x * x + y * y + z * z + w * w)
+        return (x / l, y / l, z / l, w / l)
+    theta: float = math.acos(dot)
+    sin_theta: float = math.sin(theta)
+    ka: float = math.sin((1.0 - t) * theta) / sin_theta
+    kb: float = math.sin(t * theta) / sin_theta
+    return (ka * ax + kb * bx, ka * ay + kb * by, ka * az + kb * bz, ka * aw + kb * bw)
+
 class Animation:
     '''Store animation clip
     '''
@@ -22,10 +54,27 @@ class Animation:
             value_components - the number of vector component for one value (3 for position, 4 for quaternion)
         '''
         self._type: AnimationCurveType = type
-        self._points_count: int = 0
-        self._frames: list[float] = []
-        self._values: list[ValuesVariants] = []
         self._value_components = value_components
+        # the number of floats for one key frame
+        # for cubic curve it contains in-tangent, value and out-tangent
+        self._value_stride: int = 3 * value_components if type == AnimationCurveType.CUBICSPLINE else value_components
+        # sorted key frames and plain array with values for each key frame
+        self._frames: array = array("d")
+        self._values: array = array("d")
+        # index of the key frame segment, used at the last evaluation
+        # the next evaluation starts the search from this segment
+        self._segment: int = 0
+
+    def _get_value(self, index: int) -> ValuesVariants:
+        '''Return value of the key frame with a given index as a tuple
+        '''
+        c: int = self._value_components
+        shift: int = index * self._value_stride
+        if self._type == AnimationCurveType.CUBICSPLINE:
+            return (tuple(self._values[shift:shift + c]),
+                    tuple(self._values[shift + c:shift + 2 * c]),
+                    tuple(self._values[shift + 2 * c:shift + 3 * c]))  # type: ignore
+        return tuple(self._values[shift:shift + c])  # type: ignore
     
     def add_keyframe(self, frame: float, value: ValuesVariants) -> None:
         '''Add keyframe to the clip at specific frame and with specific value
@@ -36,21 +85,37 @@ class Animation:
             for v in value:
                 if not (type(v) == tuple and len(v) == self._value_components):
                     return None
+            flat_value: array = array("d", [c for v in value for c in v])  # type: ignore
         else:
             # in this case case should be a tuple
             if len(value) != self._value_components:
                 return None
+            flat_value = array("d", value)  # type: ignore
 
-        i: int = 0
-        while i < len(self._frames) and self._frames[i] < frame:
-            i += 1
-        if i == len(self._frames):
-            self._frames.append(frame)
-            self._values.append(value)
-        else:
-            self._frames.insert(i, frame)
-            self._values.insert(i, value)
-        self._points_count += 1
+        # new key is placed before all keys with the same or greater frame
+        i: int = bisect_left(self._frames, frame)
+        self._frames.insert(i, frame)
+        self._values[i * self._value_stride:i * self._value_stride] = flat_value
+
+    def set_keyframes(self, frames: Sequence[float], values: Sequence[float]) -> None:
+        '''Replace all keyframes of the clip
+        Parameters:
+            frames - key frames, it can be unsorted
+            values - plain array with values of all key frames
+                for linear and step curves it contains value_components floats for each frame
+                for cubic curve it contains in-tangent, value and out-tangent for each frame
+        Raise ValueError if the number of values does not correspond to the number of frames
+        '''
+        stride: int = self._value_stride
+        if len(values) != stride * len(frames):
+            raise ValueError(f"Expected {stride * len(frames)} values for {len(frames)} key frames, but got {len(values)}")
+        self._frames = array("d", frames)
+        self._values = array("d", values)
+        if any(map(gt, self._frames, islice(self._frames, 1, None))):
+            # frames are unsorted, so reorder keys, keys with the same frame keep their order
+            order: list[int] = sorted(range(len(self._frames)), key=self._frames.__getitem__)
+            self._frames = array("d", [self._frames[i] for i in order])
+            self._values = array("d", [v for i in order for v in self._values[i * stride:(i + 1) * stride]])
     
     def get_type(self) -> AnimationCurveType:
         '''Return type of the animation clip (linear, step or cubic)
@@ -67,21 +132,215 @@ class Animation:
     def get_frames(self) -> list[float]:
         '''Return the list of all key frames
         '''
-        return self._frames
+        return self._frames.tolist()
     
+    def get_keyframes_count(self) -> int:
+        '''Return the number of key frames in the clip
+        '''
+        return len(self._frames)
+
+    def get_keyframe(self, index: int) -> Optional[tuple[float, ValuesVariants]]:
+        '''Return the pair (frame, value) of the key frame with a given index
+        Key frames are sorted by frames. If the index is invalid, then return None
+        '''
+        if 0 <= index < len(self._frames):
+            return self._frames[index], self._get_value(index)
+        return None
+
+    def get_keyframes_range(self, start: int, end: int) -> tuple[array, array]:
+        '''Return arrays with frames and values of key frames with indices from start to end (not included)
+        Values are stored in the same plain layout as in the get_values_buffer method
+        '''
+        start = max(0, start)
+        end = max(start, min(end, len(self._frames)))
+        return self._frames[start:end], self._values[start * self._value_stride:end * self._value_stride]
+
+    def get_frames_buffer(self) -> array:
+        '''Return plain array with all key frames in sorted order
+        The array is used by the clip, so it should not be modified
+        '''
+        return self._frames
+
+    def get_values_buffer(self) -> array:
+        '''Return plain array with values of all key frames in the order of frames
+        For linear and step curves it contains value_components floats for each key frame
+        For cubic curve it contains in-tangent, value and out-tangent for each key frame
+        The array is used by the clip, so it should not be modified
+        '''
+        return self._values
+
     def get_value_at_frame(self, frame: float) -> Optional[ValuesVariants]:
         '''Return value at specific key frame
         If there are no key frame in the clip, then return None
-        This method does not interpolate values between different key frames
+        This method does not interpolate values between different key frames, use evaluate for it
         '''
-        for i, f in enumerate(self._frames):
-            if abs(f - frame) < 0.0001:
-                return self._values[i]
+        # the first key frame, which is close enough to the given one
+        i: int = bisect_right(self._frames, frame - 0.0001)
+        if i < len(self._frames) and self._frames[i] - frame < 0.0001:
+            return self._get_value(i)
         return None
     
+    def _interpolate(self, i: int, j: int, frame: float, fps: float) -> Sequence[float]:
+        '''Return value of the curve between key frames with indices i and j at a given frame
+        Key frames between i and j are ignored, so it's also used for checking the curve without these keys
+        The frame should be inside the segment and the curve should not be step
+        '''
+        keys: array = self._frames
+        values: array = self._values
+        c: int = self._value_components
+        is_cubic: bool = self._type == AnimationCurveType.CUBICSPLINE
+        start: int = i * self._value_stride + (c if is_cubic else 0)
+        next_start: int = j * self._value_stride + (c if is_cubic else 0)
+        t: float = (frame - keys[i]) / (keys[j] - keys[i])
+        if is_cubic:
+            # Hermite spline with out-tangent of the first key and in-tangent of the second key
+            delta: float = (keys[j] - keys[i]) / fps
+            t2: float = t * t
+            t3: float = t2 * t
+            k0: float = 2.0 * t3 - 3.0 * t2 + 1.0
+            k1: float = delta * (t3 - 2.0 * t2 + t)
+            k2: float = -2.0 * t3 + 3.0 * t2
+            k3: float = delta * (t3 - t2)
+            value: Sequence[float] = [k0 * values[start + k] + k1 * values[start + c + k] + k2 * values[next_start + k] + k3 * values[next_start - c + k] for k in range(c)]
+            if c == 4:
+                l: float = math.sqrt(sum(v * v for v in value))
+                if l > 0.0:
+                    value = [v / l for v in value]
+            return value
+        if c == 4:
+            return slerp(values[start:start + 4], values[next_start:next_start + 4], t)
+        return [values[start + k] + t * (values[next_start + k] - values[start + k]) for k in range(c)]
+
+    def evaluate(self, frames: Sequence[float], fps: float=30.0) -> array:
+        '''Return interpolated values of the curve at given frames
+        Parameters:
+            frames - frames, where the curve should be evaluated
+                it's not required to be sorted, but sorted frames are processed faster
+            fps - the number of frames per second
+                it's used only for cubic curve, because tangents are defined per second (as in glTF)
+        Return plain array with value_components floats for each frame
+        Before the first and after the last key frame the curve is constant
+        Rotation (4 components) is interpolated by slerp for linear curve and normalized for cubic curve
+        If there are no key frames in the clip, then return empty array
+        '''
+        output: array = array("d")
+        keys: array = self._frames
+        values: array = self._values
+        count: int = len(keys)
+        if count == 0:
+            return output
+        c: int = self._value_components
+        stride: int = self._value_stride
+        is_step: bool = self._type == AnimationCurveType.STEP
+        is_cubic: bool = self._type == AnimationCurveType.CUBICSPLINE
+        # for cubic curve the value is stored after in-tangent
+        value_shift: int = c if is_cubic else 0
+        last: int = count - 1
+        i: int = self._segment
+        for frame in frames:
+            # find the segment with keys[i] <= frame < keys[i + 1]
+            # at first check the current and the next segment, and only then use binary search
+            if i > last or keys[i] > frame or (i < last and keys[i + 1] <= frame):
+                if i < last - 1 and keys[i + 1] <= frame < keys[i + 2]:
+                    i += 1
+                else:
+                    i = max(bisect_right(keys, frame) - 1, 0)
+            start: int = i * stride + value_shift
+            if i == last or frame <= keys[i] or is_step:
+                # outside of the curve, at the key frame or inside step segment
+                output.extend(values[start:start + c])
+                continue
+            output.extend(self._interpolate(i, i + 1, frame, fps))
+        self._segment = i
+        return output
+
+    def _get_error(self, a: Sequence[float], b: Sequence[float]) -> float:
+        '''Return the difference between two values of the curve
+        For rotation it's the angle (in radians) between quaternions, for other values it's the distance
+        '''
+        if self._value_components == 4:
+            dot: float = abs(sum(x * y for x, y in zip(a, b)))
+            return 2.0 * math.acos(min(dot, 1.0))
+        return math.sqrt(sum((x - y) ** 2 for x, y in zip(a, b)))
+
+    def get_reduced(self, tolerance: float, angle_tolerance: float, fps: float=30.0) -> Animation:
+        '''Return the new clip without key frames, which can be reproduced by interpolation of other key frames
+        Parameters:
+            tolerance - maximal distance between the new and the original curves (for translation and scale)
+            angle_tolerance - maximal angle (in radians) between the new and the original rotations
+            fps - the number of frames per second, used for cubic curve
+        The first and the last key frames are always preserved
+        For linear curve the error is checked at removed key frames, for cubic curve also at the middle of each original segment
+        The longest segments are found by exponential and binary search, so it takes near-linear time
+        '''
+        keys: array = self._frames
+        stride: int = self._value_stride
+        c: int = self._value_components
+        count: int = len(keys)
+        max_error: float = angle_tolerance if c == 4 else tolerance
+        value_shift: int = c if self._type == AnimationCurveType.CUBICSPLINE else 0
+
+        def get_key_value(index: int) -> array:
+            start: int = index * stride + value_shift
+            return self._values[start:start + c]
+
+        kept: list[int] = [0]
+        if self._type == AnimationCurveType.STEP:
+            # key is not required if it has the same value as the previous key
+            for i in range(1, count - 1):
+                if self._get_error(get_key_value(i), get_key_value(kept[-1])) > max_error:
+                    kept.append(i)
+        elif count > 2:
+            # values of the original cubic curve at the middle of each segment
+            middles: list[Optional[Sequence[float]]] = []
+            if self._type == AnimationCurveType.CUBICSPLINE:
+                middles = [self._interpolate(i, i + 1, 0.5 * (keys[i] + keys[i + 1]), fps) if keys[i] < keys[i + 1] else None for i in range(count - 1)]
+
+            def is_valid(a: int, b: int) -> bool:
+                '''Return True if the segment from the key a to the key b can replace all keys inside it
+                '''
+                if keys[a] == keys[b]:
+                    return False
+                for i in range(a + 1, b):
+                    if self._get_error(self._interpolate(a, b, keys[i], fps), get_key_value(i)) > max_error:
+                        return False
+                for i in range(a, b):
+                    middle: Optional[Sequence[float]] = middles[i] if len(middles) > 0 else None
+                    if middle is not None and self._get_error(self._interpolate(a, b, 0.5 * (keys[i] + keys[i + 1]), fps), middle) > max_error:
+                        return False
+                return True
+
+            last: int = count - 1
+            a: int = 0
+            while a < last - 1:
+                # the segment to the next key is always valid
+                valid: int = a + 1
+                span: int = 2
+                while a + span <= last and is_valid(a, a + span):
+                    valid = a + span
+                    span *= 2
+                invalid: int = min(a + span, last + 1)
+                while invalid - valid > 1:
+                    middle_index: int = (valid + invalid) // 2
+                    if is_valid(a, middle_index):
+                        valid = middle_index
+                    else:
+                        invalid = middle_index
+                if valid < last:
+                    kept.append(valid)
+                a = valid
+        if count > 1:
+            kept.append(count - 1)
+
+        reduced: Animation = Animation(self._type, c)
+        if count > 0:
+            reduced.set_keyframes([keys[i] for i in kept],
+                                  [v for i in kept for v in self._values[i * stride:(i + 1) * stride]])
+        return reduced
+
     def __str__(self) -> str:
-        end = " empty" if self._points_count == 0 else ""
+        end = " empty" if len(self._frames) == 0 else ""
         parts: list[str] = [f"Animation {self._type}:{end}"]
-        for i in range(self._points_count):
-            parts.append(f"  frame {self._frames[i]}: {self._values[i]}")
+        for i in range(len(self._frames)):
+            parts.append(f"  frame {self._frames[i]}: {self._get_value(i)}")
         return "\n".join(parts)
@@ -1,36 +1,69 @@
 import os
+from typing import Optional
 from py3dscene.bin import tiny_gltf
 from py3dscene.scene import Scene
 from py3dscene.material import PBRMaterial
 from py3dscene.object import Object
+from py3dscene.mesh import MeshComponent
+from py3dscene.io.gltf_import.import_buffer import get_buffer_bytes
 from py3dscene.io.gltf_import.import_image import import_images
+from py3dscene.io.gltf_import.import_json import load_gltf_json
 from py3dscene.io.gltf_import.import_material import import_material
 from py3dscene.io.gltf_import.import_object import process_node
+from py3dscene.io.gltf_import.import_object import import_meshes
 from py3dscene.io.gltf_import.import_skin import import_object_skin
 from py3dscene.io.gltf_import.import_animation import import_animations
+from py3dscene.io.gltf_export.export_buffer import BufferWriter
+from py3dscene.io.gltf_export.export_mesh import EncodedPrimitive
+from py3dscene.io.gltf_export.export_mesh import encode_mesh_components
+from py3dscene.io.gltf_export.export_mesh import get_mesh_fingerprint
+from py3dscene.io.gltf_export.export_object import collect_mesh_components
 from py3dscene.io.gltf_export.export_object import export_iterate
 from py3dscene.io.gltf_export.export_skin import export_skin
 from py3dscene.io.gltf_export.export_animation import export_animation
 from py3dscene.io.gltf_export.export_material import export_materials
+from py3dscene.io.gltf_export.export_stats import ExportStatistics
+from py3dscene.io.gltf_export.export_file import write_glb_buffer
+from py3dscene.io.gltf_export.export_file import write_gltf_buffer
 
-def from_gltf(file_path: str, fps: float=30.0) -> Scene:
+def from_gltf(file_path: str, fps: float=30.0, attributes_per_vertex: bool=False, lazy: bool=False, workers: int=1) -> Scene:
     '''Create and return Scene object, which contains default scene from input gltf/glb file
     Parameter fps is used for animations
     glTF format store animation keyframes in seconds, but more traditional way is to store it in frames
     parameter fps used to convert seconds-related values to frame-related values
+    Parameter attributes_per_vertex define how mesh attributes (normals, uvs and so on) are stored in imported meshes
+    glTF store these attributes for each vertex, if the parameter is True, then this layout is used as is
+    it's much faster for big meshes, because attribute values are not copied to each polygon node
+    if the parameter is False, then attributes are stored for each polygon node
+    Parameter lazy define how the file is loaded
+    if it's True, then only json part of the file is parsed and binary buffers are mapped into the memory
+    mesh components are created without data, vertices and attributes are decoded at the first request to the mesh
+    primitives without positions or indices are skipped, but primitives with only degenerate triangles are found only after decoding
+    so such mesh components become empty at the first request (the eager import skips them)
+    if it's False, then the file is loaded by tiny_gltf and all meshes are decoded immediately
+    Parameter workers define the number of processes for decoding meshes
+    if it's greater than 1, then meshes are decoded in parallel, each process read the file by itself
+    if it's 1 (or processes can not be started), then all meshes are decoded in the main process
+    workers are not used if lazy is True, because in this case meshes are decoded only by request in the main process
+    If several nodes refer to the same glTF mesh, then it's decoded only once
+    objects of these nodes get copies of mesh components, which share data arrays (see MeshComponent.get_shared_copy)
     '''
-    gltf_model = tiny_gltf.load_gltf(file_path)
+    # store byte views of all buffers, accessors are decoded directly from these views
+    model_buffers_data: list[memoryview] = []
+    if lazy:
+        gltf_model, model_buffers_data = load_gltf_json(file_path)
+    else:
+        gltf_model = tiny_gltf.load_gltf(file_path)
+        model_buffers: list[tiny_gltf.Buffer] = gltf_model.buffers
+        for i in range(len(model_buffers)):
+            gltf_buffer = model_buffers[i]
+            model_buffers_data.append(get_buffer_bytes(gltf_buffer.data))
     gltf_scene = gltf_model.scenes[gltf_model.default_scene if gltf_model.default_scene > -1 else 0]
-    model_buffers_data: list[list[int]] = []
-    model_buffers: list[tiny_gltf.Buffer] = gltf_model.buffers
-    for i in range(len(model_buffers)):
-        gltf_buffer = model_buffers[i]
-        model_buffers_data.append(gltf_buffer.data)
 
     scene: Scene = Scene()
 
     # at first import images
-    images_map: dict[int, str] = import_images(gltf_model, file_path)
+    images_map: dict[int, str] = import_images(gltf_model, file_path, model_buffers_data)
 
     # next materials
     # key is material id = index in gltf
@@ -49,15 +82,26 @@ def from_gltf(file_path: str, fps: float=30.0) -> Scene:
     #       key - scene node index
     #       value - weights for the mesh
     envelopes: list[tuple[int, Object, dict[int, list[float]]]] = []
+    # at first create objects for all nodes and collect nodes with meshes
+    mesh_jobs: list[tuple[Object, int]] = []
     for i in range(len(gltf_scene.nodes)):
         process_node(gltf_model,
                      gltf_model.nodes[gltf_scene.nodes[i]],
-                     model_buffers_data,
                      gltf_scene.nodes[i],
                      scene,
                      None,
-                     materials_map,
-                     nodes_map, envelopes)
+                     nodes_map,
+                     mesh_jobs)
+    # next decode meshes
+    import_meshes(gltf_model,
+                  model_buffers_data,
+                  file_path,
+                  mesh_jobs,
+                  materials_map,
+                  envelopes,
+                  attributes_per_vertex,
+                  lazy,
+                  workers)
     
     # after nodes import skin data
     # TODO: implement store object skinning
@@ -75,7 +119,15 @@ def to_gltf(scene: Scene,
             optimize_mesh_nodes: bool=False,
             embed_images: bool=False,
             embed_buffers: bool=False,
-            fps: float=30.0) -> None:
+            fps: float=30.0,
+            use_temp_buffer_file: bool=False,
+            workers: int=1,
+            reduce_keyframes: bool=False,
+            keyframes_tolerance: float=0.0001,
+            keyframes_angle_tolerance: float=0.0001,
+            single_animation: bool=False,
+            deduplicate_buffers: bool=False,
+            instance_meshes: bool=False) -> Optional[ExportStatistics]:
     '''Export scene object as gltf or glb file
     Parameters:
     file_path: full output path with extension
@@ -84,8 +136,8 @@ def to_gltf(scene: Scene,
         if optimization is ON, then the exporter check is polygon nodes have different attributes or not
         if at least one attribute (position, normal, uv etc) is different, then it creates the new vertex
         if all attributes the same, then use the same vertex
-        but this process is long for dense mesh
-        so, it's possible to deactivate this flag
+        vertices are compared only with ones in the neighbouring cells of the spatial hash, so it takes near-linear time
+        but it's still slower than the plain export, so it's possible to deactivate this flag
         it the flag is False then the output mesh have the same vertices as it is, node attributes are override by last node
         if the mesh is imported from glTF, then it's ok, because all vertices already are splitted by difference in node attributes
     embed_images: if True then embed image data into output file and does not create separate texture files
@@ -95,6 +147,27 @@ def to_gltf(scene: Scene,
     fps: the number of frames per second for exporting animations
         in 3d-scene animations are stored by using key-frames, but in glTF it use seconds
         so, fps used for converting frames to seconds
+    use_temp_buffer_file: if True then binary data of meshes and animations is accumulated in the temporary file
+        if False then this data is accumulated in the memory
+        the temporary file reduce memory usage for big scenes, because the data is copied to the output file by small chunks
+        but if the buffer is embedded into gltf file (as base64 data uri), then it's loaded into the memory anyway
+    workers: the number of processes for encoding meshes
+        if it's greater than 1, then binary data of all meshes is prepared in parallel before writing the file
+        the output file is the same as for one process
+    reduce_keyframes: if True then key frames of animations, which can be reproduced by interpolation of other key frames, are not exported
+        animations of the scene objects are not changed
+    keyframes_tolerance: maximal allowed error of translation and scale animations after key frames reduction
+    keyframes_angle_tolerance: maximal allowed error (angle in radians) of rotation animations after key frames reduction
+    single_animation: if True then animations of all objects are written into one glTF animation
+        and identical time arrays are written only once and shared between channels
+        if False then each animated object has its own glTF animation
+    deduplicate_buffers: if True then identical binary data (for example, the same indices or uvs of different meshes) is written only once
+        and all accessors with this data are replaced by one accessor
+    instance_meshes: if True then objects with the same mesh components (the same objects or components with identical data and materials)
+        refer to one glTF mesh, and the data of this mesh is written only once
+        mesh components are compared by the hash of their data
+    Return statistics of the export process
+    Return None if the file extension is not supported or the file (or its binary data) can not be saved
     '''
     # extract output extension
     ext_str: str = file_path.split(".")[-1].lower()
@@ -125,80 +198,135 @@ def to_gltf(scene: Scene,
     gltf_model_cameras: list[tiny_gltf.Camera] = []
     gltf_model_lights: list[tiny_gltf.Light] = []
     gltf_model_meshes: list[tiny_gltf.Mesh] = []
-    gltf_model_buffers_data: list[int] = []
+    buffer_writer: BufferWriter = BufferWriter(use_temp_buffer_file, deduplicate_buffers)
     gltf_model_buffer_views: list[tiny_gltf.BufferView] = []
     gltf_model_accessors: list[tiny_gltf.Accessor] = []
     gltf_model_materials: list[tiny_gltf.Material] = []
     gltf_model_textures: list[tiny_gltf.Texture] = []
     gltf_model_images: list[tiny_gltf.FImage] = []
     gltf_model_skins: list[tiny_gltf.Skin] = []
+    statistics: ExportStatistics = ExportStatistics()
 
-    # at the beginning we should export materials and used textures
-    export_materials(folder_path,
-                     scene.get_all_materials(),
-                     gltf_model_materials,
-                     gltf_model_textures,
-                     gltf_model_images,
-                     materials_map)
-    gltf_model.materials = gltf_model_materials
-    gltf_model.textures = gltf_model_textures
-    gltf_model.images = gltf_model_images
-
-    for obj in scene.get_root_objects():
-        scene_node_index: int = export_iterate(gltf_model_buffers_data,
-                                               gltf_model_buffer_views,
-                                               gltf_model_accessors,
-                                               gltf_model_nodes,
-                                               gltf_model_cameras,
-                                               gltf_model_lights,
-                                               gltf_model_meshes,
-                                               obj,
-                                               exported_objects,
-                                               materials_map,
-                                               envelope_meshes,
-                                               object_to_node,
-                                               optimize_mesh_nodes)
-        if scene_node_index >= 0:
-            gltf_scene_nodes.append(scene_node_index)
-
-    gltf_scene.nodes = gltf_scene_nodes
-    gltf_model.nodes = gltf_model_nodes
-    gltf_model.cameras = gltf_model_cameras
-    gltf_model.lights = gltf_model_lights
-    gltf_model.meshes = gltf_model_meshes
-
-    for i in range(len(envelope_meshes)):
-        export_skin(gltf_model_skins, i, envelope_meshes[i], object_to_node)
-    gltf_model.skins = gltf_model_skins
+    # the temporary file of the buffer writer should be released even if the export fails
+    try:
+        # at the beginning we should export materials and used textures
+        export_materials(folder_path,
+                         scene.get_all_materials(),
+                         gltf_model_materials,
+                         gltf_model_textures,
+                         gltf_model_images,
+                         materials_map)
+        gltf_model.materials = gltf_model_materials
+        gltf_model.textures = gltf_model_textures
+        gltf_model.images = gltf_model_images
+
+        # encode meshes in parallel processes
+        # if workers = 1, then the dictionary is empty and meshes are encoded when objects are exported
+        # key - id of the mesh component, or its fingerprint if instancing is used
+        encoded_meshes: dict[int | bytes, EncodedPrimitive] = {}
+        # fingerprints of mesh components, used for mesh instancing, key - id of the mesh component
+        fingerprints: dict[int, bytes] = {}
+        if workers > 1:
+            export_meshes: list[MeshComponent] = []
+            visited_objects: set[int] = set()
+            for obj in scene.get_root_objects():
+                collect_mesh_components(obj, export_meshes, visited_objects)
+            # encode each mesh component only once
+            # if instancing is used, then components with the same data are also encoded once
+            unique_meshes: list[MeshComponent] = []
+            visited_meshes: set[int | bytes] = set()
+            for mesh in export_meshes:
+                mesh_key: int | bytes = id(mesh)
+                if instance_meshes:
+                    if id(mesh) not in fingerprints:
+                        fingerprints[id(mesh)] = get_mesh_fingerprint(mesh)
+                    mesh_key = fingerprints[id(mesh)]
+                if mesh_key not in visited_meshes:
+                    visited_meshes.add(mesh_key)
+                    unique_meshes.append(mesh)
+            encoded_meshes = encode_mesh_components(unique_meshes, optimize_mesh_nodes, workers)
+            if instance_meshes:
+                # components with the same data (but maybe with other materials) use the same encoded data
+                encoded_meshes = {fingerprints[mesh_id]: data for mesh_id, data in encoded_meshes.items()}
+
+        # key - fingerprints and materials of object mesh components, value - index of the glTF mesh
+        mesh_instances: Optional[dict[tuple[tuple[bytes, int], ...], int]] = {} if instance_meshes else None
+        for obj in scene.get_root_objects():
+            scene_node_index: int = export_iterate(buffer_writer,
+                                                   gltf_model_buffer_views,
+                                                   gltf_model_accessors,
+                                                   gltf_model_nodes,
+                                                   gltf_model_cameras,
+                                                   gltf_model_lights,
+                                                   gltf_model_meshes,
+                                                   obj,
+                                                   exported_objects,
+                                                   materials_map,
+                                                   envelope_meshes,
+                                                   object_to_node,
+                                                   optimize_mesh_nodes,
+                                                   encoded_meshes,
+                                                   mesh_instances,
+                                                   fingerprints)
+            if scene_node_index >= 0:
+                gltf_scene_nodes.append(scene_node_index)
+
+        gltf_scene.nodes = gltf_scene_nodes
+        gltf_model.nodes = gltf_model_nodes
+        gltf_model.cameras = gltf_model_cameras
+        gltf_model.lights = gltf_model_lights
+        gltf_model.meshes = gltf_model_meshes
+
+        for i in range(len(envelope_meshes)):
+            export_skin(gltf_model_skins, i, envelope_meshes[i], object_to_node)
+        gltf_model.skins = gltf_model_skins
     
-    gltf_model_animations: list[tiny_gltf.Animation] = export_animation(gltf_model_buffers_data,
-                                                                  gltf_model_buffer_views,
-                                                                  gltf_model_accessors,
-                                                                  scene,
-                                                                  fps,
-                                                                  object_to_node)
-    if len(gltf_model_animations) > 0:
-        gltf_model.animations = gltf_model_animations
-
-    gltf_model.accessors = gltf_model_accessors
-    gltf_model.buffer_views = gltf_model_buffer_views
-
-    data_buffer = tiny_gltf.Buffer()
-    data_buffer.data = gltf_model_buffers_data
-    gltf_model.buffers = [data_buffer]
-
-    gltf_scene.name = file_name
-    gltf_model.scenes = [gltf_scene]
-    gltf_model.default_scene = 0
-
-    gltf_asset = tiny_gltf.Asset()
-    gltf_asset.version = "2.0"
-    gltf_asset.generator = "py3dscene"
-    gltf_model.asset = gltf_asset
-
-    tiny_gltf.save_gltf(gltf_model,
-                        file_path,
-                        embed_images,
-                        embed_buffers,
-                        True,
-                        ext_str == "glb")
+        gltf_model_animations: list[tiny_gltf.Animation] = export_animation(buffer_writer,
+                                                                      gltf_model_buffer_views,
+                                                                      gltf_model_accessors,
+                                                                      scene,
+                                                                      fps,
+                                                                      object_to_node,
+                                                                      (keyframes_tolerance, keyframes_angle_tolerance) if reduce_keyframes else None,
+                                                                      statistics,
+                                                                      single_animation)
+        if len(gltf_model_animations) > 0:
+            gltf_model.animations = gltf_model_animations
+
+        gltf_model.accessors = gltf_model_accessors
+        gltf_model.buffer_views = gltf_model_buffer_views
+
+        # binary data is added to the output files after the model is saved, so it's not copied into the model
+        # only the buffer, embedded into gltf file as data uri, is passed through the model
+        embed_data: bool = embed_buffers and ext_str == "gltf"
+        gltf_model.buffers = [tiny_gltf.Buffer()]
+        if embed_data:
+            gltf_model.buffers[0].data = buffer_writer.get_data()
+
+        gltf_scene.name = file_name
+        gltf_model.scenes = [gltf_scene]
+        gltf_model.default_scene = 0
+
+        gltf_asset = tiny_gltf.Asset()
+        gltf_asset.version = "2.0"
+        gltf_asset.generator = "py3dscene"
+        gltf_model.asset = gltf_asset
+
+        is_saved: bool = tiny_gltf.save_gltf(gltf_model,
+                                             file_path,
+                                             embed_images,
+                                             embed_buffers,
+                                             True,
+                                             ext_str == "glb")
+        if is_saved and not embed_data and buffer_writer.get_length() > 0:
+            if ext_str == "glb":
+                is_saved = write_glb_buffer(file_path, buffer_writer)
+            else:
+                is_saved = write_gltf_buffer(file_path, buffer_writer)
+        if not is_saved:
+            return None
+        statistics.add_deduplicated_data(buffer_writer.get_shared_accessors(), buffer_writer.get_shared_bytes())
+    finally:
+        buffer_writer.close()
+
+    return statistics
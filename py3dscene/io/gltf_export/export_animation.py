@@ -1,15 +1,19 @@
+import hashlib
+from array import array
 from typing import Optional
-import sys
-import struct
 from py3dscene.bin import tiny_gltf
-from py3dscene.io.gltf_export.export_buffer import add_data_to_buffer
+from py3dscene.io.gltf_export.export_buffer import BufferWriter
+from py3dscene.io.gltf_export.export_buffer import EncodedAccessor
+from py3dscene.io.gltf_export.export_buffer import encode_float
+from py3dscene.io.gltf_export.export_buffer import add_encoded_to_buffer
+from py3dscene.io.gltf_export.export_buffer import add_float_to_buffer
+from py3dscene.io.gltf_export.export_stats import ExportStatistics
 from py3dscene.scene import Scene
 from py3dscene.object import Object
 from py3dscene.animation import Animation
 from py3dscene.animation import AnimationCurveType
-from py3dscene.animation import ValuesVariants
 
-def write_animation_clip(gltf_model_buffers_data: list[int],
+def write_animation_clip(buffer_writer: BufferWriter,
                          gltf_model_buffer_views: list[tiny_gltf.BufferView],
                          gltf_model_accessors: list[tiny_gltf.Accessor],
                          gltf_animation_samplers: list[tiny_gltf.AnimationSampler],
@@ -17,69 +21,61 @@ def write_animation_clip(gltf_model_buffers_data: list[int],
                          animation: Animation,
                          target_str: str,
                          node_index: int,
-                         fps: float) -> None:
+                         fps: float,
+                         keyframes_tolerance: Optional[tuple[float, float]],
+                         statistics: ExportStatistics,
+                         share_time_accessors: bool) -> None:
+    # remove redundant key frames, if it's required
+    input_keyframes: int = animation.get_keyframes_count()
+    input_bytes: int = 4 * (input_keyframes + len(animation.get_values_buffer()))
+    if keyframes_tolerance is not None:
+        animation = animation.get_reduced(keyframes_tolerance[0], keyframes_tolerance[1], fps)
+    statistics.add_animation_channel(input_keyframes,
+                                     animation.get_keyframes_count(),
+                                     input_bytes,
+                                     4 * (animation.get_keyframes_count() + len(animation.get_values_buffer())))
+
     # for the animation we should transform key frames into plane array of seconds
-    # values into plane array of floats
+    # values are already stored in the plain array with the same layout as in glTF
     # and then write it to the buffer
-    frames = animation.get_frames()
     curve_type: AnimationCurveType = animation.get_type()
     value_components: int = animation.get_value_components()
 
-    times_array: list[float] = []
-    values_array: list[float] = []
-    for frame in frames:
-        value: Optional[ValuesVariants] = animation.get_value_at_frame(frame)
-        if value:
-            frame_time = frame / fps
-            times_array.append(frame_time)
-
-            if curve_type == AnimationCurveType.CUBICSPLINE:
-                # in this case value is a tuple of tuples
-                for v in value:
-                    values_array.extend(v)  # type: ignore
-            else:
-                # in this case value is simple tuple
-                values_array.extend(value)  # type: ignore
-    # calculate minimum and maximum values for coordinates
-    min_values: list[float] = [sys.float_info.max] * value_components
-    max_values: list[float] = [-sys.float_info.max] * value_components
-    time_bytes: list[int] = []
-    values_bytes: list[int] = []
-    times_count = len(times_array)
-    for i in range(times_count):
-        time_bytes.extend(struct.pack("f", times_array[i]))
-    steps: int = len(values_array) // value_components
-    for i in range(steps):
-        for c in range(value_components):
-            v = values_array[i * value_components + c]
-            values_bytes.extend(struct.pack("f", v))
-            if v < min_values[c]:
-                min_values[c] = v
-            if v > max_values[c]:
-                max_values[c] = v
+    times_array: array = array("d", [frame / fps for frame in animation.get_frames_buffer()])
+    values_array: array = animation.get_values_buffer()
     # write arrays to the buffer
-    time_index: int = add_data_to_buffer(gltf_model_buffers_data,
-                                         gltf_model_buffer_views,
-                                         gltf_model_accessors,
-                                         time_bytes,
-                                         times_count,
-                                         False,
-                                         True,
-                                         tiny_gltf.TINYGLTF_COMPONENT_TYPE_FLOAT,
-                                         tiny_gltf.TINYGLTF_TYPE_SCALAR,
-                                         [times_array[0]],
-                                         [times_array[-1]])
-    values_index: int = add_data_to_buffer(gltf_model_buffers_data,
+    # if time accessors are shared, then the same times are written only once
+    # accessors are found by the hash of the data, and then the data is compared byte by byte
+    encoded_times: EncodedAccessor = encode_float(times_array,
+                                                  tiny_gltf.TINYGLTF_COMPONENT_TYPE_FLOAT,
+                                                  tiny_gltf.TINYGLTF_TYPE_SCALAR,
+                                                  True)
+    times_key: tuple[str, bytes] = ("time", b"")
+    shared_index: Optional[int] = None
+    if share_time_accessors:
+        times_key = ("time", hashlib.blake2b(encoded_times[0], digest_size=16).digest())
+        shared_index = buffer_writer.find_accessor(times_key, encoded_times[0])
+    if shared_index is not None:
+        time_index: int = shared_index
+        statistics.add_shared_time_accessor(len(encoded_times[0]))
+    else:
+        time_index = add_encoded_to_buffer(buffer_writer,
                                            gltf_model_buffer_views,
                                            gltf_model_accessors,
-                                           values_bytes,
-                                           times_count * 3 if curve_type == AnimationCurveType.CUBICSPLINE else times_count,
+                                           encoded_times,
                                            False,
-                                           True,
-                                           tiny_gltf.TINYGLTF_COMPONENT_TYPE_FLOAT,
-                                           tiny_gltf.TINYGLTF_TYPE_VEC3 if value_components == 3 else tiny_gltf.TINYGLTF_TYPE_VEC4,
-                                           min_values,
-                                           max_values)
+                                           True)
+        if share_time_accessors:
+            time_view: tiny_gltf.BufferView = gltf_model_buffer_views[gltf_model_accessors[time_index].buffer_view]
+            buffer_writer.add_accessor(times_key, time_index, time_view.byte_offset, time_view.byte_length)
+    values_index: int = add_float_to_buffer(buffer_writer,
+                                            gltf_model_buffer_views,
+                                            gltf_model_accessors,
+                                            values_array,
+                                            True,
+                                            tiny_gltf.TINYGLTF_COMPONENT_TYPE_FLOAT,
+                                            tiny_gltf.TINYGLTF_TYPE_VEC3 if value_components == 3 else tiny_gltf.TINYGLTF_TYPE_VEC4,
+                                            True)
     
     # next write accessor indices to animation objects
     gltf_sampler = tiny_gltf.AnimationSampler()
@@ -95,15 +91,21 @@ def write_animation_clip(gltf_model_buffers_data: list[int],
     channel.target_path = target_str
     gltf_animation_channels.append(channel)
 
-def export_object_animation(gltf_model_buffers_data: list[int],
+def export_object_animation(buffer_writer: BufferWriter,
                             gltf_model_buffer_views: list[tiny_gltf.BufferView],
                             gltf_model_accessors: list[tiny_gltf.Accessor],
                             gltf_model_animations: list[tiny_gltf.Animation],
                             object_to_node: dict[int, int],
                             object: Object,
-                            fps: float) -> None:
-    gltf_animation_samplers: list[tiny_gltf.AnimationSampler] = []
-    gltf_animation_channels: list[tiny_gltf.AnimationChannel] = []
+                            fps: float,
+                            keyframes_tolerance: Optional[tuple[float, float]],
+                            statistics: ExportStatistics,
+                            share_time_accessors: bool,
+                            single_clip: Optional[tuple[list[tiny_gltf.AnimationSampler], list[tiny_gltf.AnimationChannel]]]) -> None:
+    # if the single clip is used, then write samplers and channels into it
+    # in other case create separate animation for the object
+    gltf_animation_samplers: list[tiny_gltf.AnimationSampler] = [] if single_clip is None else single_clip[0]
+    gltf_animation_channels: list[tiny_gltf.AnimationChannel] = [] if single_clip is None else single_clip[1]
 
     translation_anim: Optional[Animation] = object.get_translation_animation()
     rotation_anim: Optional[Animation] = object.get_rotation_animation()
@@ -116,7 +118,7 @@ def export_object_animation(gltf_model_buffers_data: list[int],
     node_index: int = object_to_node[object_id]
 
     if translation_anim:
-        write_animation_clip(gltf_model_buffers_data,
+        write_animation_clip(buffer_writer,
                              gltf_model_buffer_views,
                              gltf_model_accessors,
                              gltf_animation_samplers,
@@ -124,9 +126,12 @@ def export_object_animation(gltf_model_buffers_data: list[int],
                              translation_anim,
                              "translation",
                              node_index,
-                             fps)
+                             fps,
+                             keyframes_tolerance,
+                             statistics,
+                             share_time_accessors)
     if rotation_anim:
-        write_animation_clip(gltf_model_buffers_data,
+        write_animation_clip(buffer_writer,
                              gltf_model_buffer_views,
                              gltf_model_accessors,
                              gltf_animation_samplers,
@@ -134,9 +139,12 @@ def export_object_animation(gltf_model_buffers_data: list[int],
                              rotation_anim,
                              "rotation",
                              node_index,
-                             fps)
+                             fps,
+                             keyframes_tolerance,
+                             statistics,
+                             share_time_accessors)
     if scale_anim:
-         write_animation_clip(gltf_model_buffers_data,
+         write_animation_clip(buffer_writer,
                              gltf_model_buffer_views,
                              gltf_model_accessors,
                              gltf_animation_samplers,
@@ -144,9 +152,12 @@ def export_object_animation(gltf_model_buffers_data: list[int],
                              scale_anim,
                              "scale",
                              node_index,
-                             fps)
+                             fps,
+                             keyframes_tolerance,
+                             statistics,
+                             share_time_accessors)
 
-    if len(gltf_animation_samplers) > 0 and len(gltf_animation_channels) > 0:
+    if single_clip is None and len(gltf_animation_samplers) > 0 and len(gltf_animation_channels) > 0:
         gltf_animation = tiny_gltf.Animation()
         gltf_animation.samplers = gltf_animation_samplers
         gltf_animation.channels = gltf_animation_channels
@@ -154,28 +165,51 @@ def export_object_animation(gltf_model_buffers_data: list[int],
         gltf_model_animations.append(gltf_animation)
 
     for obj in object.get_children():
-        export_object_animation(gltf_model_buffers_data,
+        export_object_animation(buffer_writer,
                                 gltf_model_buffer_views,
                                 gltf_model_accessors,
                                 gltf_model_animations,
                                 object_to_node,
                                 obj,
-                                fps)
+                                fps,
+                                keyframes_tolerance,
+                                statistics,
+                                share_time_accessors,
+                                single_clip)
 
-def export_animation(gltf_model_buffers_data: list[int],
+def export_animation(buffer_writer: BufferWriter,
                      gltf_model_buffer_views: list[tiny_gltf.BufferView],
                      gltf_model_accessors: list[tiny_gltf.Accessor],
                      scene: Scene,
                      fps: float,
-                     object_to_node: dict[int, int]) -> list[tiny_gltf.Animation]:
+                     object_to_node: dict[int, int],
+                     keyframes_tolerance: Optional[tuple[float, float]],
+                     statistics: ExportStatistics,
+                     single_animation: bool) -> list[tiny_gltf.Animation]:
+    '''Export animations of all scene objects
+    If keyframes_tolerance is not None, then it contains tolerances for values and angles, and redundant key frames are removed
+    If single_animation is True, then all channels are written into one animation and identical time accessors are shared
+    '''
     gltf_model_animations: list[tiny_gltf.Animation] = []
+    single_clip: Optional[tuple[list[tiny_gltf.AnimationSampler], list[tiny_gltf.AnimationChannel]]] = ([], []) if single_animation else None
     for obj in scene.get_root_objects():
-        export_object_animation(gltf_model_buffers_data,
+        export_object_animation(buffer_writer,
                                 gltf_model_buffer_views,
                                 gltf_model_accessors,
                                 gltf_model_animations,
                                 object_to_node,
                                 obj,
-                                fps)
+                                fps,
+                                keyframes_tolerance,
+                                statistics,
+                                single_animation,
+                                single_clip)
+
+    if single_clip is not None and len(single_clip[0]) > 0:
+        gltf_animation = tiny_gltf.Animation()
+        gltf_animation.samplers = single_clip[0]
+        gltf_animation.channels = single_clip[1]
+        gltf_animation.name = "animation"
+        gltf_model_animations.append(gltf_animation)
     
     return gltf_model_animations
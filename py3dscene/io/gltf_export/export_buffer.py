@@ -1,10 +1,205 @@
-import struct
+import os
+import sys
+import mmap
+import shutil
+import hashlib
+import tempfile
+from array import array
+from typing import IO
+from typing import Optional
+from typing import Sequence
 from py3dscene.bin import tiny_gltf
 
-def add_data_to_buffer(gltf_model_buffers_data: list[int],
+class BufferWriter:
+    '''Class for accumulate binary data of the output glTF buffer
+    Data is written into growable bytearray or into temporary file
+    Each chunk of data is aligned by 4 bytes
+    '''
+    def __init__(self, use_temp_file: bool=False, deduplicate: bool=False) -> None:
+        '''Create the writer
+
+        Parameters:
+            use_temp_file - if True, then data is written into temporary file, in other case data is stored in the memory
+            deduplicate - if True, then identical data with the same accessor parameters is written only once
+        '''
+        self._data: bytearray = bytearray()
+        self._file: Optional[IO[bytes]] = tempfile.TemporaryFile() if use_temp_file else None
+        self._map: Optional[mmap.mmap] = None
+        self._length: int = 0
+        # key - accessor parameters and hash of the data
+        # value - index of the accessor, byte offset and length of its data in the buffer
+        self._deduplicate: bool = deduplicate
+        self._accessors_map: dict[tuple[str, bytes], tuple[int, int, int]] = {}
+        self._shared_accessors: int = 0
+        self._shared_bytes: int = 0
+
+    def write(self, data: bytes | bytearray | memoryview) -> int:
+        '''Write data at the end of the buffer and return byte offset of this data
+        After the data the buffer is padded by zeros to the multiple of 4 bytes
+        '''
+        offset: int = self._length
+        data_length: int = memoryview(data).nbytes
+        padding: bytes = bytes((4 - data_length % 4) % 4)
+        if self._file is not None:
+            self._file.write(data)
+            self._file.write(padding)
+        else:
+            self._data += data
+            self._data += padding
+        self._length += data_length + len(padding)
+        return offset
+
+    def is_deduplicate(self) -> bool:
+        '''Return True if identical data should be written only once
+        '''
+        return self._deduplicate
+
+    def is_data_written(self, offset: int, data: bytes | bytearray | memoryview) -> bool:
+        '''Return True if the buffer contains exactly the same data at a given byte offset
+        '''
+        data_view: memoryview = memoryview(data).cast("B")
+        if self._file is not None:
+            self._file.seek(offset)
+            written: bytes = self._file.read(data_view.nbytes)
+            # next data should be written at the end of the file
+            self._file.seek(0, os.SEEK_END)
+            return written == data_view
+        return self._data[offset:offset + data_view.nbytes] == data_view
+
+    def find_accessor(self, key: tuple[str, bytes], data: bytes | bytearray | memoryview) -> Optional[int]:
+        '''Return index of the accessor with a given key and the same data, or None if there are no such accessor
+        The hash of the data in the key can be the same for different data, so the data is compared byte by byte
+        '''
+        accessor: Optional[tuple[int, int, int]] = self._accessors_map.get(key)
+        if accessor is None:
+            return None
+        index, offset, length = accessor
+        if length != memoryview(data).nbytes or not self.is_data_written(offset, data):
+            return None
+        return index
+
+    def add_accessor(self, key: tuple[str, bytes], index: int, offset: int, length: int) -> None:
+        '''Remember index of the accessor with a given key and the position of its data in the buffer
+        '''
+        self._accessors_map.setdefault(key, (index, offset, length))
+
+    def add_shared_data(self, data_length: int) -> None:
+        '''Count the data, which is not written, because it's replaced by existing accessor
+        '''
+        self._shared_accessors += 1
+        self._shared_bytes += data_length
+
+    def get_shared_accessors(self) -> int:
+        '''Return the number of accessors, replaced by existing ones
+        '''
+        return self._shared_accessors
+
+    def get_shared_bytes(self) -> int:
+        '''Return the number of bytes, which are not written because of deduplication
+        '''
+        return self._shared_bytes
+
+    def get_length(self) -> int:
+        '''Return the number of bytes in the buffer
+        '''
+        return self._length
+
+    def get_data(self) -> bytearray | mmap.mmap:
+        '''Return object with all data of the buffer
+        If the data is stored in the temporary file, then return read-only map of this file
+        '''
+        if self._file is None or self._length == 0:
+            return self._data
+        if self._map is None:
+            self._file.flush()
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def write_to(self, stream: IO[bytes]) -> None:
+        '''Write all data of the buffer into the output stream
+        Data of the temporary file is copied by small chunks, so it's not loaded into the memory
+        '''
+        if self._file is not None:
+            self._file.flush()
+            self._file.seek(0)
+            shutil.copyfileobj(self._file, stream)
+        else:
+            stream.write(self._data)
+
+    def close(self) -> None:
+        '''Release the temporary file
+        '''
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._data = bytearray()
+        self._length = 0
+        self._accessors_map = {}
+
+def to_little_endian_bytes(values: array) -> bytes:
+    '''Return bytes of the array in little-endian order, which is used in glTF
+    '''
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+def get_components_bounds(values: Sequence[float], components: int) -> tuple[list[float], list[float]]:
+    '''Return minimum and maximum values of each component in the plain array
+    '''
+    if len(values) < components:
+        return [], []
+    return ([min(values[c::components]) for c in range(components)],
+            [max(values[c::components]) for c in range(components)])
+
+# encoded data of one accessor:
+#   - bytes of the data
+#   - the number of items
+#   - component type
+#   - data type
+#   - minimum and maximum values
+EncodedAccessor = tuple[bytes, int, int, int, list[float], list[float]]
+
+def encode_triangle_indices(data: Sequence[int],
+                            component_type: int,
+                            data_type: int) -> EncodedAccessor:
+    '''Encode plain array with vertex indices of triangles (three values for each triangle)
+    '''
+    min_value: list[float] = [float(min(data))] if len(data) > 0 else [0.0]
+    max_value: list[float] = [float(max(data))] if len(data) > 0 else [0.0]
+    return (to_little_endian_bytes(array("I", data)),
+            len(data),
+            component_type,
+            data_type,
+            min_value,
+            max_value)
+
+def encode_float(data: Sequence[float],
+                 component_type: int,
+                 data_type: int,
+                 write_bounds: bool=False) -> EncodedAccessor:
+    '''Encode plain array with float values as 32-bit floats
+    If write_bounds is True, then minimum and maximum values of each component are calculated
+    '''
+    components: int = tiny_gltf.get_num_components_in_type(data_type)
+    min_value: list[float] = []
+    max_value: list[float] = []
+    if write_bounds:
+        min_value, max_value = get_components_bounds(data, components)
+    return (to_little_endian_bytes(array("f", data)),
+            len(data) // components,
+            component_type,
+            data_type,
+            min_value,
+            max_value)
+
+def add_data_to_buffer(buffer_writer: BufferWriter,
                        gltf_model_buffer_views: list[tiny_gltf.BufferView],
                        gltf_model_accessors: list[tiny_gltf.Accessor],
-                       byte_vector: list[int],
+                       byte_vector: bytes | bytearray | memoryview,
                        data_count: int,
                        is_indices: bool,
                        ignore_target: bool,
@@ -12,18 +207,23 @@ def add_data_to_buffer(gltf_model_buffers_data: list[int],
                        data_type: int,
                        min_value: list[float],
                        max_value: list[float]) -> int:
+    # if the same data with the same parameters is already written, then use existing accessor
+    key: tuple[str, bytes] = ("", b"")
+    if buffer_writer.is_deduplicate():
+        key = (repr((data_count, is_indices, ignore_target, component_type, data_type, min_value, max_value)),
+               hashlib.blake2b(byte_vector, digest_size=16).digest())
+        existing_index: Optional[int] = buffer_writer.find_accessor(key, byte_vector)
+        if existing_index is not None:
+            buffer_writer.add_shared_data(memoryview(byte_vector).nbytes)
+            return existing_index
+
     view = tiny_gltf.BufferView()
     view.buffer = 0
-    view.byte_offset = len(gltf_model_buffers_data)
-    view.byte_length = len(byte_vector)
+    view.byte_length = memoryview(byte_vector).nbytes
+    view.byte_offset = buffer_writer.write(byte_vector)
     if not ignore_target:
         view.target = tiny_gltf.TINYGLTF_TARGET_ELEMENT_ARRAY_BUFFER if is_indices else tiny_gltf.TINYGLTF_TARGET_ARRAY_BUFFER
 
-    rem: int = len(byte_vector) % 4
-    byte_vector.extend([0] * rem)
-
-    gltf_model_buffers_data.extend(byte_vector)
-
     accessor = tiny_gltf.Accessor()
     accessor.buffer_view = len(gltf_model_buffer_views)
     accessor.byte_offset = 0
@@ -36,65 +236,59 @@ def add_data_to_buffer(gltf_model_buffers_data: list[int],
     gltf_model_buffer_views.append(view)
     gltf_model_accessors.append(accessor)
 
+    if buffer_writer.is_deduplicate():
+        buffer_writer.add_accessor(key, len(gltf_model_accessors) - 1, view.byte_offset, view.byte_length)
     return len(gltf_model_accessors) - 1
 
-def add_triangle_indices_to_buffer(gltf_model_buffers_data: list[int],
+def add_encoded_to_buffer(buffer_writer: BufferWriter,
+                          gltf_model_buffer_views: list[tiny_gltf.BufferView],
+                          gltf_model_accessors: list[tiny_gltf.Accessor],
+                          encoded: EncodedAccessor,
+                          is_indices: bool,
+                          ignore_target: bool) -> int:
+    '''Write encoded data to the buffer and create the buffer view and the accessor for it
+    '''
+    return add_data_to_buffer(buffer_writer,
+                              gltf_model_buffer_views,
+                              gltf_model_accessors,
+                              encoded[0],
+                              encoded[1],
+                              is_indices,
+                              ignore_target,
+                              encoded[2],
+                              encoded[3],
+                              encoded[4],
+                              encoded[5])
+
+def add_triangle_indices_to_buffer(buffer_writer: BufferWriter,
                                    gltf_model_buffer_views: list[tiny_gltf.BufferView],
                                    gltf_model_accessors: list[tiny_gltf.Accessor],
-                                   data: list[tuple[int, int, int]],
+                                   data: Sequence[int],
                                    component_type: int,
                                    data_type: int) -> int:
-    byte_vector: list[int] = []
-    for triangle in data:
-        for c in triangle:
-            byte_vector.extend(list(struct.pack("I", c)))
-    min: int = 2147483647
-    max: int = 0
-    for i in range(len(data)):
-        for j in range(3):
-            v = data[i][j]
-            if v < min:
-                min = v
-            if v > max:
-                max = v
-    min_value: list[float] = [float(min)]
-    max_value: list[float] = [float(max)]
-
-    return add_data_to_buffer(gltf_model_buffers_data,
-                              gltf_model_buffer_views,
-                              gltf_model_accessors,
-                              byte_vector,
-                              len(data) * 3,
-                              True,
-                              False,
-                              component_type,
-                              data_type,
-                              min_value,
-                              max_value)
-
-def add_float_to_buffer(gltf_model_buffers_data: list[int],
+    '''Write plain array with vertex indices of triangles (three values for each triangle)
+    '''
+    return add_encoded_to_buffer(buffer_writer,
+                                 gltf_model_buffer_views,
+                                 gltf_model_accessors,
+                                 encode_triangle_indices(data, component_type, data_type),
+                                 True,
+                                 False)
+
+def add_float_to_buffer(buffer_writer: BufferWriter,
                         gltf_model_buffer_views: list[tiny_gltf.BufferView],
                         gltf_model_accessors: list[tiny_gltf.Accessor],
-                        data: list[float],
+                        data: Sequence[float],
                         ignore_target: bool,
                         component_type: int,
-                        data_type: int) -> int:
-    items_count: int = len(data) // tiny_gltf.get_num_components_in_type(data_type)
-    byte_vector: list[int] = []
-    for v in data:
-        byte_vector.extend(struct.pack("f", v))
-
-    min_value: list[float] = []
-    max_value: list[float] = []
-
-    return add_data_to_buffer(gltf_model_buffers_data,
-                              gltf_model_buffer_views,
-                              gltf_model_accessors,
-                              byte_vector,
-                              items_count,
-                              False,
-                              ignore_target,
-                              component_type,
-                              data_type,
-                              min_value,
-                              max_value)
+                        data_type: int,
+                        write_bounds: bool=False) -> int:
+    '''Write plain array with float values as 32-bit floats
+    If write_bounds is True, then minimum and maximum values of each component are stored in the accessor
+    '''
+    return add_encoded_to_buffer(buffer_writer,
+                                 gltf_model_buffer_views,
+                                 gltf_model_accessors,
+                                 encode_float(data, component_type, data_type, write_bounds),
+                                 False,
+                                 ignore_target)
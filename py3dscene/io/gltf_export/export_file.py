@@ -0,0 +1,68 @@
+import json
+import struct
+from typing import Any
+from urllib.parse import unquote
+from py3dscene.io.gltf_export.export_buffer import BufferWriter
+
+'''Write binary data of the exported model into output files
+tiny_gltf saves the model with empty buffer, and then the data of the buffer writer is added to the saved files
+So, the binary data is not copied into the model
+'''
+
+GLB_MAGIC: bytes = b"glTF"
+GLB_VERSION: int = 2
+GLB_CHUNK_JSON: int = 0x4E4F534A
+GLB_CHUNK_BIN: int = 0x004E4942
+
+def write_glb_buffer(file_path: str, buffer_writer: BufferWriter) -> bool:
+    '''Add binary chunk with the data of the buffer writer to the glb file
+    The file should be saved with empty first buffer, the length of this buffer is updated in the json chunk
+    Return False if the file is not valid glb file
+    '''
+    with open(file_path, "rb") as file:
+        header: bytes = file.read(20)
+        if len(header) < 20 or header[:4] != GLB_MAGIC:
+            return False
+        json_length, json_type = struct.unpack_from("<II", header, 12)
+        if json_type != GLB_CHUNK_JSON:
+            return False
+        json_data: dict[str, Any] = json.loads(file.read(json_length))
+    buffers: list[dict[str, Any]] = json_data.get("buffers", [])
+    if len(buffers) == 0:
+        return False
+    buffers[0]["byteLength"] = buffer_writer.get_length()
+
+    # chunks are aligned by 4 bytes, json is padded by spaces and binary data by zeros
+    content: bytes = json.dumps(json_data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    content += b" " * ((4 - len(content) % 4) % 4)
+    bin_padding: bytes = bytes((4 - buffer_writer.get_length() % 4) % 4)
+    bin_length: int = buffer_writer.get_length() + len(bin_padding)
+    with open(file_path, "wb") as file:
+        file.write(struct.pack("<4sII", GLB_MAGIC, GLB_VERSION, 12 + 8 + len(content) + 8 + bin_length))
+        file.write(struct.pack("<II", len(content), GLB_CHUNK_JSON))
+        file.write(content)
+        file.write(struct.pack("<II", bin_length, GLB_CHUNK_BIN))
+        buffer_writer.write_to(file)
+        file.write(bin_padding)
+    return True
+
+def write_gltf_buffer(file_path: str, buffer_writer: BufferWriter) -> bool:
+    '''Write the data of the buffer writer into the external binary file of the gltf file
+    The file should be saved with empty first buffer, which refers to the external file
+    Return False if the first buffer does not refer to the file
+    '''
+    with open(file_path, "r", encoding="utf-8") as file:
+        json_data: dict[str, Any] = json.load(file)
+    buffers: list[dict[str, Any]] = json_data.get("buffers", [])
+    if len(buffers) == 0 or len(buffers[0].get("uri", "")) == 0 or buffers[0]["uri"].startswith("data:"):
+        return False
+    buffers[0]["byteLength"] = buffer_writer.get_length()
+
+    # binary file is relative to the folder of the gltf file
+    last_slash: int = max(file_path.rfind("/"), file_path.rfind("\\"))
+    folder_path: str = file_path[:last_slash] + "/" if last_slash >= 0 else ""
+    with open(folder_path + unquote(buffers[0]["uri"]), "wb") as bin_file:
+        buffer_writer.write_to(bin_file)
+    with open(file_path, "w", encoding="utf-8") as file:
+        json.dump(json_data, file, ensure_ascii=False, indent=2)
+    return True
@@ -1,13 +1,22 @@
 import math
-import struct
-import sys
+import hashlib
+from array import array
+from typing import Callable
+from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from py3dscene.bin import tiny_gltf
-from py3dscene.io.gltf_export.export_buffer import add_triangle_indices_to_buffer
-from py3dscene.io.gltf_export.export_buffer import add_data_to_buffer
+from py3dscene.io.gltf_export.export_buffer import BufferWriter
+from py3dscene.io.gltf_export.export_buffer import EncodedAccessor
+from py3dscene.io.gltf_export.export_buffer import encode_triangle_indices
+from py3dscene.io.gltf_export.export_buffer import encode_float
+from py3dscene.io.gltf_export.export_buffer import add_encoded_to_buffer
 from py3dscene.object import Object
+from py3dscene.mesh import MeshComponent
 from py3dscene.material import PBRMaterial
 
 EPSILON: float = 0.001
+CELL_NEIGHBOURS: list[tuple[int, int, int]] = [(x, y, z) for x in (-1, 0, 1) for y in (-1, 0, 1) for z in (-1, 0, 1)]
 
 VertexType = tuple[
                 tuple[float, float, float],  # position
@@ -29,64 +38,222 @@ def distance4(a: tuple[float, float, float, float],
               b: tuple[float, float, float, float]) -> float:
     return math.sqrt(sum([(a[i] - b[i])**2 for i in range(4)]))
 
-def get_index_from_vertex_array(array: list[VertexType], value: VertexType) -> int:
-    for i, v in enumerate(array):
-        is_next = False
-        # return -1 if value is different with array element (in some place)
-        # check positions
-        if distance3(v[0], value[0]) > EPSILON:
-            continue
-        # check normals
-        if len(v[1]) != len(value[1]):
-            continue
-        for j in range(len(v[1])):
-            if distance3(v[1][j], value[1][j]) > EPSILON:
-                is_next = True
-                continue
-        if is_next:
-            continue
-        # check uvs
-        if len(v[2]) != len(value[2]):
-            continue
-        for j in range(len(v[2])):
-            if distance2(v[2][j], value[2][j]) > EPSILON:
-                is_next = True
-                continue
-        if is_next:
-            continue
-        # colors
-        if len(v[3]) != len(value[3]):
-            continue
-        for j in range(len(v[3])):
-            if distance4(v[3][j], value[3][j]) > EPSILON:
-                is_next = False
-                continue
-        if is_next:
-            continue
-        # tangents
-        if len(v[4]) != len(value[4]):
-            continue
-        for j in range(len(v[4])):
-            if distance4(v[4][j], value[4][j]) > EPSILON:
-                is_next = False
-                continue
-        if is_next:
-            continue
-        # shapes
-        if len(v[5]) != len(value[5]):
-            continue
-        for j in range(len(v[5])):
-            if distance3(v[5][j], value[5][j]) > EPSILON:
-                is_next = False
+def is_attributes_equal(a: list[tuple[float, ...]],
+                        b: list[tuple[float, ...]],
+                        distance) -> bool:
+    if len(a) != len(b):
+        return False
+    for j in range(len(a)):
+        if distance(a[j], b[j]) > EPSILON:
+            return False
+    return True
+
+def is_vertices_equal(a: VertexType, b: VertexType) -> bool:
+    return distance3(a[0], b[0]) <= EPSILON and \
+           is_attributes_equal(a[1], b[1], distance3) and \
+           is_attributes_equal(a[2], b[2], distance2) and \
+           is_attributes_equal(a[3], b[3], distance4) and \
+           is_attributes_equal(a[4], b[4], distance4) and \
+           is_attributes_equal(a[5], b[5], distance3)
+
+class VertexWelder:
+    '''Collect unique vertices of the exported mesh
+    Vertices are placed into the spatial hash with cells of EPSILON size
+    Two vertices can coincide only if they are in the same or neighbouring cells,
+    so for each new vertex it's enough to check 27 cells instead of all previous vertices
+    '''
+    def __init__(self) -> None:
+        self._vertices: list[VertexType] = []
+        self._cells: dict[tuple[int, int, int], list[int]] = {}
+        # vertices with exactly the same values are found without cells checking
+        self._exact: dict[tuple, int] = {}
+
+    def add_vertex(self, vertex: VertexType) -> int:
+        '''Return the index of the vertex which coincide with the input one
+        If there are no such vertex, then add the input vertex and return it index
+        '''
+        exact_key: tuple = (vertex[0], tuple(vertex[1]), tuple(vertex[2]), tuple(vertex[3]), tuple(vertex[4]), tuple(vertex[5]))
+        index: int = self._exact.get(exact_key, -1)
+        if index != -1:
+            # if some previous vertex is close to this one, then it also close to the found vertex
+            # so, the found vertex is the first coincident one
+            return index
+        position: tuple[float, float, float] = vertex[0]
+        cell_x: int = math.floor(position[0] / EPSILON)
+        cell_y: int = math.floor(position[1] / EPSILON)
+        cell_z: int = math.floor(position[2] / EPSILON)
+        # return the first added vertex among coincident ones
+        for shift in CELL_NEIGHBOURS:
+            cell: Optional[list[int]] = self._cells.get((cell_x + shift[0], cell_y + shift[1], cell_z + shift[2]))
+            if cell is None:
                 continue
-        if is_next:
-            continue
-        # if we pass all checks then value coincide with v
-        # return the index
-        return i
-    return -1
+            for i in cell:
+                if index != -1 and i > index:
+                    break
+                if is_vertices_equal(self._vertices[i], vertex):
+                    index = i
+                    break
+        if index == -1:
+            index = len(self._vertices)
+            self._vertices.append(vertex)
+            self._cells.setdefault((cell_x, cell_y, cell_z), []).append(index)
+            self._exact[exact_key] = index
+        return index
+
+    def get_vertices(self) -> list[VertexType]:
+        '''Return the list with all unique vertices in the order of adding
+        '''
+        return self._vertices
+
+# encoded data of one mesh component:
+#   - triangle indices
+#   - list of attributes, each attribute is a tuple (name, data)
+#   - list of shape deltas
+EncodedPrimitive = tuple[EncodedAccessor, list[tuple[str, EncodedAccessor]], list[EncodedAccessor]]
+
+def encode_mesh_component(mesh: MeshComponent, optimize_mesh_nodes: bool) -> EncodedPrimitive:
+    '''Convert mesh component into binary data of glTF primitive
+    Output contains only plain data, so this function can be called in other process
+    '''
+    mesh_vertices: list[tuple[float, float, float]] = mesh.get_vertices()
+    # plain arrays with vertex and node indices of triangle corners
+    mesh_triangles: memoryview = mesh.get_triangulation_buffer()
+    mesh_triangles_nodes: memoryview = mesh.get_triangle_nodes_buffer()
+    
+    # store in separate list all vertices we should export
+    # if node in the mesh have the same position and attributes, then it's the same vertex
+    # but if at least one attribute is different, then create the new vertex
+    welder: VertexWelder = VertexWelder()
+    # vertices, which are not used in triangles, have zero attributes
+    empty_vertex: VertexType = ((0.0, 0.0, 0.0),
+                                [(0.0, 0.0, 0.0)] * mesh.get_normals_count(),
+                                [(0.0, 0.0)] * mesh.get_uvs_count(),
+                                [(0.0, 0.0, 0.0, 0.0)] * mesh.get_colors_count(),
+                                [(0.0, 0.0, 0.0, 0.0)] * mesh.get_tangents_count(),
+                                [(0.0, 0.0, 0.0)] * mesh.get_shapes_count())
+    vertices: list[VertexType] = welder.get_vertices() if optimize_mesh_nodes else [empty_vertex] * len(mesh_vertices)
+    # here we will store actual triangles for export
+    # with indices of vertices from the previous array
+    # three values for each triangle
+    triangles: array = array("I")
+    for triangle_index in range(len(mesh_triangles) // 3):
+        # for each triangle corner form new vertex
+        for i in range(3):
+            v_index = mesh_triangles[3 * triangle_index + i]
+            n_index = mesh_triangles_nodes[3 * triangle_index + i]
+            vertex: VertexType = (mesh_vertices[v_index],
+                                  mesh.get_node_normals(n_index),
+                                  mesh.get_node_uvs(n_index),
+                                  mesh.get_node_colors(n_index),
+                                  mesh.get_node_tangents(n_index),
+                                  mesh.get_vertex_shapes(v_index))
+            if optimize_mesh_nodes:
+                # welder returns the index of the existing vertex or add the new one
+                triangles.append(welder.add_vertex(vertex))
+            else:
+                vertices[v_index] = vertex
+                triangles.append(v_index)
+    
+    indices: EncodedAccessor = encode_triangle_indices(triangles,
+                                                       tiny_gltf.TINYGLTF_COMPONENT_TYPE_UNSIGNED_INT,
+                                                       tiny_gltf.TINYGLTF_TYPE_SCALAR)
+    # before encode positions and other attributes
+    # we should convert it to plain arrays, min and max values are calculated when the array is encoded
+    attributes: list[tuple[str, EncodedAccessor]] = []
+    attributes.append(("POSITION", encode_float(array("d", [c for vertex in vertices for c in vertex[0]]),
+                                                tiny_gltf.TINYGLTF_COMPONENT_TYPE_FLOAT,
+                                                tiny_gltf.TINYGLTF_TYPE_VEC3,
+                                                True)))
+    # glTF supports only one normals attribute
+    if mesh.get_normals_count() > 0:
+        attributes.append(("NORMAL", encode_float(array("d", [c for vertex in vertices for c in vertex[1][0]]),
+                                                  tiny_gltf.TINYGLTF_COMPONENT_TYPE_FLOAT,
+                                                  tiny_gltf.TINYGLTF_TYPE_VEC3,
+                                                  True)))
+    for uv_index in range(mesh.get_uvs_count()):
+        attributes.append(("TEXCOORD_" + str(uv_index), encode_float(array("d", [c for vertex in vertices for c in vertex[2][uv_index]]),
+                                                                     tiny_gltf.TINYGLTF_COMPONENT_TYPE_FLOAT,
+                                                                     tiny_gltf.TINYGLTF_TYPE_VEC2,
+                                                                     True)))
+    for color_index in range(mesh.get_colors_count()):
+        attributes.append(("COLOR_" + str(color_index), encode_float(array("d", [c for vertex in vertices for c in vertex[3][color_index]]),
+                                                                     tiny_gltf.TINYGLTF_COMPONENT_TYPE_FLOAT,
+                                                                     tiny_gltf.TINYGLTF_TYPE_VEC4,
+                                                                     True)))
+    # only one tangent attribute
+    if mesh.get_tangents_count() > 0:
+        attributes.append(("TANGENT", encode_float(array("d", [c for vertex in vertices for c in vertex[4][0]]),
+                                                   tiny_gltf.TINYGLTF_COMPONENT_TYPE_FLOAT,
+                                                   tiny_gltf.TINYGLTF_TYPE_VEC4,
+                                                   True)))
+    # finally, shapes
+    targets: list[EncodedAccessor] = []
+    for shape_index in range(mesh.get_shapes_count()):
+        targets.append(encode_float(array("d", [c for vertex in vertices for c in vertex[5][shape_index]]),
+                                    tiny_gltf.TINYGLTF_COMPONENT_TYPE_FLOAT,
+                                    tiny_gltf.TINYGLTF_TYPE_VEC3,
+                                    True))
+    return (indices, attributes, targets)
 
-def export_mesh(gltf_model_buffers_data: list[int],
+def encode_mesh_components(meshes: list[MeshComponent],
+                           optimize_mesh_nodes: bool,
+                           workers: int) -> dict[int, EncodedPrimitive]:
+    '''Encode mesh components in parallel processes
+    Return the dictionary with key = id of the mesh component object, value = encoded data
+    If processes can not be started, then return empty dictionary, and meshes will be encoded at export time
+    '''
+    if workers <= 1 or len(meshes) <= 1:
+        return {}
+    try:
+        with ProcessPoolExecutor(max_workers=min(workers, len(meshes))) as executor:
+            encoded: list[EncodedPrimitive] = list(executor.map(encode_mesh_component,
+                                                                meshes,
+                                                                [optimize_mesh_nodes] * len(meshes),
+                                                                chunksize=max(1, len(meshes) // (4 * workers))))
+    except (OSError, BrokenProcessPool):
+        return {}
+    return {id(mesh): data for mesh, data in zip(meshes, encoded)}
+
+def get_mesh_fingerprint(mesh: MeshComponent) -> bytes:
+    '''Return the hash of all geometric data of the mesh component
+    Mesh components with the same fingerprint are exported to the same data
+    The material of the mesh is not used in the hash
+    '''
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(repr((mesh.get_vertex_count(), mesh.is_attributes_per_vertex())).encode())
+    hasher.update(array("I", mesh.get_polygons_sizes()))
+    hasher.update(mesh.get_vertices_buffer())
+    hasher.update(mesh.get_polygons_buffer())
+    layers: list[tuple[int, Callable[[int], Optional[memoryview]]]] = [(mesh.get_normals_count(), mesh.get_normals_buffer),
+                                                                  (mesh.get_uvs_count(), mesh.get_uvs_buffer),
+                                                                  (mesh.get_colors_count(), mesh.get_colors_buffer),
+                                                                  (mesh.get_tangents_count(), mesh.get_tangents_buffer),
+                                                                  (mesh.get_shapes_count(), mesh.get_shape_buffer)]
+    for count, get_layer in layers:
+        # write the number of layers, so data of different attributes can not be mixed
+        hasher.update(count.to_bytes(4, "little"))
+        for index in range(count):
+            layer: Optional[memoryview] = get_layer(index)
+            if layer is not None:
+                hasher.update(len(layer).to_bytes(8, "little"))
+                hasher.update(layer)
+    return hasher.digest()
+
+def get_object_meshes_key(object: Object, fingerprints: dict[int, bytes]) -> tuple[tuple[bytes, int], ...]:
+    '''Return the key of all mesh components of the object: fingerprints of meshes and ids of materials
+    Objects with the same key can use the same glTF mesh
+    Fingerprints are cached by the id of the mesh component, so each component is hashed only once
+    '''
+    key: list[tuple[bytes, int]] = []
+    for mesh in object.get_mesh_components():
+        fingerprint: Optional[bytes] = fingerprints.get(id(mesh))
+        if fingerprint is None:
+            fingerprint = get_mesh_fingerprint(mesh)
+            fingerprints[id(mesh)] = fingerprint
+        key.append((fingerprint, mesh.get_material().get_id()))
+    return tuple(key)
+
+def export_mesh(buffer_writer: BufferWriter,
                 gltf_model_buffer_views: list[tiny_gltf.BufferView],
                 gltf_model_accessors: list[tiny_gltf.Accessor],
                 gltf_model_meshes: list[tiny_gltf.Mesh],
@@ -95,7 +262,18 @@ def export_mesh(gltf_model_buffers_data: list[int],
 	            materials_map: dict[int, int],
                 # TODO: implement export skin and use envelope_meshes
 	            envelope_meshes: list[Object],
-                optimize_mesh_nodes: bool) -> None:
+                optimize_mesh_nodes: bool,
+                encoded_meshes: dict[int | bytes, EncodedPrimitive],
+                mesh_instances: Optional[dict[tuple[tuple[bytes, int], ...], int]],
+                fingerprints: dict[int, bytes]) -> None:
+    # if mesh instancing is used, then objects with the same meshes refer to the same glTF mesh
+    meshes_key: tuple[tuple[bytes, int], ...] = ()
+    if mesh_instances is not None:
+        meshes_key = get_object_meshes_key(object, fingerprints)
+        if meshes_key in mesh_instances:
+            gltf_node.mesh = mesh_instances[meshes_key]
+            return None
+
     gltf_mesh = tiny_gltf.Mesh()
     gltf_mesh_primitives: list[tiny_gltf.Primitive] = []
     for mesh in object.get_mesh_components():
@@ -108,43 +286,11 @@ def export_mesh(gltf_model_buffers_data: list[int],
             # if mesh component contains this material, then it is not defined
             # so, nothing to export
             pass
-        mesh_vertices: list[tuple[float, float, float]] = mesh.get_vertices()
-        mesh_triangles: list[tuple[int, int, int]] = mesh.get_triangulation()
-        
-        # store in separate list all vertices we should export
-        # if node in the mesh have the same position and attributes, then it's the same vertex
-        # but if at least one attribute is different, then create the new vertex
-        vertices: list[VertexType] = [] if optimize_mesh_nodes else [((0.0, 0.0, 0.0),
-                                                                      [], [], [], [], [])] * len(mesh_vertices)
-        # here we will store actual triangles for export
-        # with indices of vertices from the previous array
-        triangles: list[tuple[int, int, int]] = []
-        for triangle_index, triangle_vertices in enumerate(mesh_triangles):
-            triangle_nodes = mesh.get_triangle_nodes(triangle_index)
-            triangle_array: list[int] = []
-            # for each triangle corner form new vertex
-            for i in range(3):
-                v_index = triangle_vertices[i]
-                n_index = triangle_nodes[i]
-                vertex: VertexType = (mesh_vertices[v_index],
-                                      mesh.get_node_normals(n_index),
-                                      mesh.get_node_uvs(n_index),
-                                      mesh.get_node_colors(n_index),
-                                      mesh.get_node_tangents(n_index),
-                                      mesh.get_vertex_shapes(v_index))
-                if optimize_mesh_nodes:
-                    # check is this vertex is new
-                    index: int = get_index_from_vertex_array(vertices, vertex)
-                    if index == -1:
-                        # this is new vertex, add it to the array
-                        index = len(vertices)
-                        vertices.append(vertex)
-                    # now index has the proper value
-                    triangle_array.append(index)
-                else:
-                    vertices[v_index] = vertex
-                    triangle_array.append(v_index)
-            triangles.append((triangle_array[0], triangle_array[1], triangle_array[2]))
+        # use data, encoded before export, or encode the mesh right now
+        # with instancing encoded data is stored by fingerprints, they are already calculated for the meshes key
+        encoded: Optional[EncodedPrimitive] = encoded_meshes.get(id(mesh) if mesh_instances is None else fingerprints[id(mesh)])
+        if encoded is None:
+            encoded = encode_mesh_component(mesh, optimize_mesh_nodes)
         # next we should write mesh data into gltf mesh primitive
         gltf_primitive.mode = tiny_gltf.TINYGLTF_MODE_TRIANGLES
         if material_id in materials_map:
@@ -152,171 +298,29 @@ def export_mesh(gltf_model_buffers_data: list[int],
         gltf_mesh_primitives.append(gltf_primitive)
         # write to the buffer
         # triangle indices
-        indices: int = add_triangle_indices_to_buffer(gltf_model_buffers_data,
-                                                      gltf_model_buffer_views,
-                                                      gltf_model_accessors,
-                                                      triangles,
-                                                      tiny_gltf.TINYGLTF_COMPONENT_TYPE_UNSIGNED_INT,
-                                                      tiny_gltf.TINYGLTF_TYPE_SCALAR)
-        gltf_primitive.indices = indices
-        # before write positions and other attributes
-        # we should convert it to plain arrays and calculate min and max values
-        # store in arrays actual bytes representations
-        buffer_positions: list[int] = []
-        buffer_normals: list[list[int]] = [[] for _ in range(mesh.get_normals_count())]  # the number of arrays in the number of different normal attributes
-        buffer_uvs: list[list[int]] = [[] for _ in range(mesh.get_uvs_count())]
-        buffer_colors: list[list[int]] = [[] for _ in range(mesh.get_colors_count())]
-        buffer_tangents: list[list[int]] = [[] for _ in range(mesh.get_tangents_count())]
-        buffer_shapes: list[list[int]] = [[] for _ in range(mesh.get_shapes_count())]
-        flt_max: float = sys.float_info.max
-        flt_min: float = -sys.float_info.max
-        min_positions: list[float] = [flt_max] * 3
-        max_positions: list[float] = [flt_min] * 3
-        # in these arrays we store min/max values for all attributes of the same type
-        # first three values - for the first attribute and so on
-        min_normals: list[float] = [flt_max] * 3 * mesh.get_normals_count()
-        max_normals: list[float] = [flt_min] * 3 * mesh.get_normals_count()
-        min_uvs: list[float] = [flt_max] * 2 * mesh.get_uvs_count()
-        max_uvs: list[float] = [flt_min] * 2 * mesh.get_uvs_count()
-        min_colors: list[float] = [flt_max] * 4 * mesh.get_colors_count()
-        max_colors: list[float] = [flt_min] * 4 * mesh.get_colors_count()
-        min_tangents: list[float] = [flt_max] * 4 * mesh.get_tangents_count()
-        max_tangents: list[float] = [flt_min] * 4 * mesh.get_tangents_count()
-        min_shapes: list[float] = [flt_max] * 3 * mesh.get_shapes_count()
-        max_shapes: list[float] = [flt_min] * 3 * mesh.get_shapes_count()
-        # iterate throw output vertices
-        for vertex in vertices:
-            # copy positions
-            for i in range(3):
-                v_coord: float = vertex[0][i]
-                if v_coord < min_positions[i]:
-                    min_positions[i] = v_coord
-                if v_coord > max_positions[i]:
-                    max_positions[i] = v_coord
-                buffer_positions.extend(struct.pack("f", v_coord))
-            # normals
-            for i, n in enumerate(vertex[1]):
-                for j in range(3):
-                    n_coord: float = n[j]
-                    if n_coord < min_normals[3 * i + j]:
-                        min_normals[3 * i + j] = n_coord
-                    if n_coord > max_normals[3 * i + j]:
-                        max_normals[3 * i + j] = n_coord
-                    buffer_normals[i].extend(struct.pack("f", n_coord))
-            # uvs
-            for i, uv in enumerate(vertex[2]):
-                for j in range(2):
-                    uv_coord: float = uv[j]
-                    if uv_coord < min_uvs[2 * i + j]:
-                        min_uvs[2 * i + j] = uv_coord
-                    if uv_coord > max_uvs[2 * i + j]:
-                        max_uvs[2 * i + j] = uv_coord
-                    buffer_uvs[i].extend(struct.pack("f", uv_coord))
-            # colors
-            for i, c in enumerate(vertex[3]):
-                for j in range(4):
-                    c_coord: float = c[j]
-                    if c_coord < min_colors[4 * i + j]:
-                        min_colors[4 * i + j] = c_coord
-                    if c_coord > max_colors[4 * i + j]:
-                        max_colors[4 * i + j] = c_coord
-                    buffer_colors[i].extend(struct.pack("f", c_coord))
-            # tangents
-            for i, t in enumerate(vertex[4]):
-                for j in range(4):
-                    t_coord: float = t[j]
-                    if t_coord < min_tangents[4 * i + j]:
-                        min_tangents[4 * i + j] = t_coord
-                    if t_coord > max_tangents[4 * i + j]:
-                        max_tangents[4 * i + j] = t_coord
-                    buffer_tangents[i].extend(struct.pack("f", t_coord))
-            # shapes
-            for i, s in enumerate(vertex[5]):
-                for j in range(3):
-                    s_coord: float = s[j]
-                    if s_coord < min_shapes[3 * i + j]:
-                        min_shapes[3 * i + j] = s_coord
-                    if s_coord > max_shapes[3 * i + j]:
-                        max_shapes[3 * i + j] = s_coord
-                    buffer_shapes[i].extend(struct.pack("f", s_coord))
-        # now we are ready to write data to the buffer
+        gltf_primitive.indices = add_encoded_to_buffer(buffer_writer,
+                                                       gltf_model_buffer_views,
+                                                       gltf_model_accessors,
+                                                       encoded[0],
+                                                       True,
+                                                       False)
         gltf_primitive_attributes: dict[str, int] = {}
-        gltf_primitive_attributes["POSITION"] = add_data_to_buffer(gltf_model_buffers_data,
-                                                                   gltf_model_buffer_views,
-                                                                   gltf_model_accessors,
-                                                                   buffer_positions,
-                                                                   len(vertices),
-                                                                   False,
-                                                                   False,
-                                                                   tiny_gltf.TINYGLTF_COMPONENT_TYPE_FLOAT,
-                                                                   tiny_gltf.TINYGLTF_TYPE_VEC3,
-                                                                   min_positions,
-                                                                   max_positions)
-        # glTF supports only one normals attribute
-        if mesh.get_normals_count() > 0:
-            gltf_primitive_attributes["NORMAL"] = add_data_to_buffer(gltf_model_buffers_data,
-                                                                     gltf_model_buffer_views,
-                                                                     gltf_model_accessors,
-                                                                     buffer_normals[0],
-                                                                     len(vertices),
-                                                                     False,
-                                                                     False,
-                                                                     tiny_gltf.TINYGLTF_COMPONENT_TYPE_FLOAT,
-                                                                     tiny_gltf.TINYGLTF_TYPE_VEC3,
-                                                                     [min_normals[0], min_normals[1], min_normals[2]],
-                                                                     [max_normals[0], max_normals[1], max_normals[2]])
-        for uv_index in range(mesh.get_uvs_count()):
-            gltf_primitive_attributes["TEXCOORD_" + str(uv_index)] = add_data_to_buffer(gltf_model_buffers_data,
-                                                                     gltf_model_buffer_views,
-                                                                     gltf_model_accessors,
-                                                                     buffer_uvs[uv_index],
-                                                                     len(vertices),
-                                                                     False,
-                                                                     False,
-                                                                     tiny_gltf.TINYGLTF_COMPONENT_TYPE_FLOAT,
-                                                                     tiny_gltf.TINYGLTF_TYPE_VEC2,
-                                                                     [min_uvs[2 * uv_index], min_uvs[2 * uv_index + 1]],
-                                                                     [max_uvs[2 * uv_index], max_uvs[2 * uv_index + 1]])
-        for color_index in range(mesh.get_colors_count()):
-            gltf_primitive_attributes["COLOR_" + str(color_index)] = add_data_to_buffer(gltf_model_buffers_data,
-                                                                     gltf_model_buffer_views,
-                                                                     gltf_model_accessors,
-                                                                     buffer_colors[color_index],
-                                                                     len(vertices),
-                                                                     False,
-                                                                     False,
-                                                                     tiny_gltf.TINYGLTF_COMPONENT_TYPE_FLOAT,
-                                                                     tiny_gltf.TINYGLTF_TYPE_VEC4,
-                                                                     [min_colors[4 * color_index], min_colors[4 * color_index + 1], min_colors[4 * color_index + 2], min_colors[4 * color_index + 3]],
-                                                                     [max_colors[4 * color_index], max_colors[4 * color_index + 1], max_colors[4 * color_index + 2], max_colors[4 * color_index + 3]])
-        # only one tangent attribute
-        if mesh.get_tangents_count() > 0:
-            gltf_primitive_attributes["TANGENT"] = add_data_to_buffer(gltf_model_buffers_data,
-                                                                     gltf_model_buffer_views,
-                                                                     gltf_model_accessors,
-                                                                     buffer_tangents[0],
-                                                                     len(vertices),
-                                                                     False,
-                                                                     False,
-                                                                     tiny_gltf.TINYGLTF_COMPONENT_TYPE_FLOAT,
-                                                                     tiny_gltf.TINYGLTF_TYPE_VEC4,
-                                                                     [min_tangents[0], min_tangents[1], min_tangents[2], min_tangents[3]],
-                                                                     [max_tangents[0], max_tangents[1], max_tangents[2], max_tangents[3]])
-        # finally, shapes
-        # but shapes should be stored on vector of targets dictionary
-        gltf_primitive_targets: list[dict[str, int]] = [{} for _ in range(mesh.get_shapes_count())]
-        for shape_index in range(mesh.get_shapes_count()):
-            gltf_primitive_targets[shape_index]["POSITION"] = add_data_to_buffer(gltf_model_buffers_data,
-                                                                     gltf_model_buffer_views,
-                                                                     gltf_model_accessors,
-                                                                     buffer_shapes[shape_index],
-                                                                     len(vertices),
-                                                                     False,
-                                                                     False,
-                                                                     tiny_gltf.TINYGLTF_COMPONENT_TYPE_FLOAT,
-                                                                     tiny_gltf.TINYGLTF_TYPE_VEC3,
-                                                                     [min_shapes[shape_index * 3], min_shapes[shape_index * 3 + 1], min_shapes[shape_index * 3 + 2]],
-                                                                     [max_shapes[shape_index * 3], max_shapes[shape_index * 3 + 1], max_shapes[shape_index * 3 + 2]])
+        for attribute_name, attribute_data in encoded[1]:
+            gltf_primitive_attributes[attribute_name] = add_encoded_to_buffer(buffer_writer,
+                                                                              gltf_model_buffer_views,
+                                                                              gltf_model_accessors,
+                                                                              attribute_data,
+                                                                              False,
+                                                                              False)
+        # shapes should be stored on vector of targets dictionary
+        gltf_primitive_targets: list[dict[str, int]] = []
+        for target_data in encoded[2]:
+            gltf_primitive_targets.append({"POSITION": add_encoded_to_buffer(buffer_writer,
+                                                                             gltf_model_buffer_views,
+                                                                             gltf_model_accessors,
+                                                                             target_data,
+                                                                             False,
+                                                                             False)})
         
         gltf_primitive.attributes = gltf_primitive_attributes
         gltf_primitive.targets = gltf_primitive_targets
@@ -324,3 +328,5 @@ def export_mesh(gltf_model_buffers_data: list[int],
     gltf_mesh.primitives = gltf_mesh_primitives
     gltf_node.mesh = len(gltf_model_meshes)
     gltf_model_meshes.append(gltf_mesh)
+    if mesh_instances is not None:
+        mesh_instances[meshes_key] = gltf_node.mesh
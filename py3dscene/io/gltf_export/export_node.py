@@ -1,17 +1,22 @@
 from typing import Optional
 from py3dscene.bin import tiny_gltf
+from py3dscene.io.gltf_export.export_buffer import BufferWriter
 from py3dscene.io.gltf_export.export_transform import export_transform
+from py3dscene.io.gltf_export.export_mesh import EncodedPrimitive
 from py3dscene.io.gltf_export.export_mesh import export_mesh
 from py3dscene.object import Object
 
 def export_node(object: Object,
-                gltf_model_buffers_data: list[int],
+                buffer_writer: BufferWriter,
                 gltf_model_buffer_views: list[tiny_gltf.BufferView],
                 gltf_model_accessors: list[tiny_gltf.Accessor],
                 gltf_model_meshes: list[tiny_gltf.Mesh],
                 materials_map: dict[int, int],
 	            envelope_meshes: list[Object],
-                optimize_mesh_nodes: bool) -> Optional[tiny_gltf.Node]:
+                optimize_mesh_nodes: bool,
+                encoded_meshes: dict[int | bytes, EncodedPrimitive],
+                mesh_instances: Optional[dict[tuple[tuple[bytes, int], ...], int]],
+                fingerprints: dict[int, bytes]) -> Optional[tiny_gltf.Node]:
     new_node = tiny_gltf.Node()
     new_node.name = object.get_name()
 
@@ -23,7 +28,7 @@ def export_node(object: Object,
                      object.get_scale())
     
     if object.get_mesh_components_count() > 0:
-        export_mesh(gltf_model_buffers_data,
+        export_mesh(buffer_writer,
                     gltf_model_buffer_views,
                     gltf_model_accessors,
                     gltf_model_meshes,
@@ -31,6 +36,9 @@ def export_node(object: Object,
                     object,
                     materials_map,
                     envelope_meshes,
-                    optimize_mesh_nodes)
+                    optimize_mesh_nodes,
+                    encoded_meshes,
+                    mesh_instances,
+                    fingerprints)
 
     return new_node
\ No newline at end of file
@@ -1,11 +1,28 @@
 from typing import Optional
 from py3dscene.bin import tiny_gltf
+from py3dscene.io.gltf_export.export_buffer import BufferWriter
 from py3dscene.io.gltf_export.export_camera import export_camera
 from py3dscene.io.gltf_export.export_light import export_light
+from py3dscene.io.gltf_export.export_mesh import EncodedPrimitive
 from py3dscene.io.gltf_export.export_node import export_node
 from py3dscene.object import Object
+from py3dscene.mesh import MeshComponent
 
-def export_iterate(gltf_model_buffers_data: list[int],
+def collect_mesh_components(object: Object,
+                            meshes: list[MeshComponent],
+                            visited_objects: set[int]) -> None:
+    '''Collect mesh components of the object and all its children in the same order as they are exported
+    '''
+    object_id: int = object.get_id()
+    if object_id in visited_objects:
+        return None
+    visited_objects.add(object_id)
+    if not object.is_camera() and not object.is_light():
+        meshes.extend(object.get_mesh_components())
+    for child in object.get_children():
+        collect_mesh_components(child, meshes, visited_objects)
+
+def export_iterate(buffer_writer: BufferWriter,
                    gltf_model_buffer_views: list[tiny_gltf.BufferView],
                    gltf_model_accessors: list[tiny_gltf.Accessor],
                    gltf_model_nodes: list[tiny_gltf.Node],
@@ -17,7 +34,10 @@ def export_iterate(gltf_model_buffers_data: list[int],
 	               materials_map: dict[int, int],
 	               envelope_meshes: list[Object],
 	               object_to_node: dict[int, int],
-                   optimize_mesh_nodes: bool) -> int:
+                   optimize_mesh_nodes: bool,
+                   encoded_meshes: dict[int | bytes, EncodedPrimitive],
+                   mesh_instances: Optional[dict[tuple[tuple[bytes, int], ...], int]],
+                   fingerprints: dict[int, bytes]) -> int:
     node_index: int = -1
     gltf_node: Optional[tiny_gltf.Node] = None
     object_id: int = object.get_id()
@@ -34,13 +54,16 @@ def export_iterate(gltf_model_buffers_data: list[int],
             gltf_node = export_light(light, object, gltf_model_lights)
     else:
         gltf_node = export_node(object,
-                                gltf_model_buffers_data,
+                                buffer_writer,
                                 gltf_model_buffer_views,
                                 gltf_model_accessors,
                                 gltf_model_meshes,
                                 materials_map,
                                 envelope_meshes,
-                                optimize_mesh_nodes)
+                                optimize_mesh_nodes,
+                                encoded_meshes,
+                                mesh_instances,
+                                fingerprints)
 
     if gltf_node:
         exported_objects.add(object_id)
@@ -50,7 +73,7 @@ def export_iterate(gltf_model_buffers_data: list[int],
 
         gltf_node_children: list[int] = []
         for child in object.get_children():
-            child_index = export_iterate(gltf_model_buffers_data,
+            child_index = export_iterate(buffer_writer,
                                          gltf_model_buffer_views,
                                          gltf_model_accessors,
                                          gltf_model_nodes,
@@ -62,7 +85,10 @@ def export_iterate(gltf_model_buffers_data: list[int],
                                          materials_map,
                                          envelope_meshes,
                                          object_to_node,
-                                         optimize_mesh_nodes)
+                                         optimize_mesh_nodes,
+                                         encoded_meshes,
+                                         mesh_instances,
+                                         fingerprints)
             if child_index >= 0:
                 gltf_node_children.append(child_index)
         
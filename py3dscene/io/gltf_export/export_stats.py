@@ -0,0 +1,89 @@
+class ExportStatistics:
+    '''Store statistics of the export process
+    '''
+    def __init__(self) -> None:
+        '''Create empty statistics. No parameters required
+        '''
+        # the number of key frames and the size of animation accessors (times and values) in bytes
+        # input values are for all key frames of the scene animations, output values are for actually written key frames
+        self._animation_input_keyframes: int = 0
+        self._animation_output_keyframes: int = 0
+        self._animation_input_bytes: int = 0
+        self._animation_output_bytes: int = 0
+        # the number of time accessors, which are replaced by already written ones, and the size of their data
+        self._shared_time_accessors: int = 0
+        self._shared_time_bytes: int = 0
+        # the number of accessors, which are replaced by identical accessors, and the size of their data
+        self._deduplicated_accessors: int = 0
+        self._deduplicated_bytes: int = 0
+
+    def add_animation_channel(self, input_keyframes: int, output_keyframes: int, input_bytes: int, output_bytes: int) -> None:
+        '''Add the data of one exported animation channel
+        '''
+        self._animation_input_keyframes += input_keyframes
+        self._animation_output_keyframes += output_keyframes
+        self._animation_input_bytes += input_bytes
+        self._animation_output_bytes += output_bytes
+
+    def add_shared_time_accessor(self, data_bytes: int) -> None:
+        '''Add the time accessor, which is not written, because the same accessor already exists
+        '''
+        self._shared_time_accessors += 1
+        self._shared_time_bytes += data_bytes
+
+    def add_deduplicated_data(self, accessors: int, data_bytes: int) -> None:
+        '''Add accessors, which are not written, because identical accessors already exist
+        '''
+        self._deduplicated_accessors += accessors
+        self._deduplicated_bytes += data_bytes
+
+    def get_animation_input_keyframes(self) -> int:
+        '''Return the number of key frames in all animations of the scene
+        '''
+        return self._animation_input_keyframes
+
+    def get_animation_output_keyframes(self) -> int:
+        '''Return the number of key frames, written to the output file
+        '''
+        return self._animation_output_keyframes
+
+    def get_animation_input_bytes(self) -> int:
+        '''Return the size (in bytes) of animation accessors for all key frames of the scene
+        '''
+        return self._animation_input_bytes
+
+    def get_animation_output_bytes(self) -> int:
+        '''Return the size (in bytes) of animation accessors, written to the output file
+        '''
+        return self._animation_output_bytes
+
+    def get_animation_saved_bytes(self) -> int:
+        '''Return the number of bytes, saved by key frames reduction
+        '''
+        return self._animation_input_bytes - self._animation_output_bytes
+
+    def get_shared_time_accessors(self) -> int:
+        '''Return the number of animation time accessors, which are replaced by identical accessors
+        '''
+        return self._shared_time_accessors
+
+    def get_shared_time_bytes(self) -> int:
+        '''Return the number of bytes, saved by sharing of animation time accessors
+        '''
+        return self._shared_time_bytes
+
+    def get_deduplicated_accessors(self) -> int:
+        '''Return the number of accessors, which are replaced by identical accessors
+        '''
+        return self._deduplicated_accessors
+
+    def get_deduplicated_bytes(self) -> int:
+        '''Return the number of bytes, saved by deduplication of buffer data
+        '''
+        return self._deduplicated_bytes
+
+    def __str__(self) -> str:
+        return "\n".join([f"Animation key frames: {self._animation_input_keyframes} -> {self._animation_output_keyframes}",
+                          f"Animation bytes: {self._animation_input_bytes} -> {self._animation_output_bytes}",
+                          f"Shared time accessors: {self._shared_time_accessors} ({self._shared_time_bytes} bytes)",
+                          f"Deduplicated accessors: {self._deduplicated_accessors} ({self._deduplicated_bytes} bytes)"])
@@ -1,9 +1,10 @@
-import struct
+import sys
+from array import array
 from py3dscene.bin import tiny_gltf
 
 def component_type_to_format(type: int) -> str:
     if type == tiny_gltf.TINYGLTF_COMPONENT_TYPE_BYTE:
-        return "c"
+        return "b"
     elif type == tiny_gltf.TINYGLTF_COMPONENT_TYPE_UNSIGNED_BYTE:
         return "B"
     elif type == tiny_gltf.TINYGLTF_COMPONENT_TYPE_SHORT:
@@ -20,80 +21,130 @@ def component_type_to_format(type: int) -> str:
         return "d"
     return "i"
 
-def read_float_buffer_view(buffer_view: tiny_gltf.BufferView, 
-                           model_buffers_data: list[list[int]],
+def component_type_to_normalize_scale(type: int) -> float:
+    '''Return the value, which should be used to convert normalized integer component to float
+    For float components return 1.0
+    '''
+    if type == tiny_gltf.TINYGLTF_COMPONENT_TYPE_UNSIGNED_BYTE:
+        return 255.0
+    elif type == tiny_gltf.TINYGLTF_COMPONENT_TYPE_UNSIGNED_SHORT:
+        return 65535.0
+    elif type == tiny_gltf.TINYGLTF_COMPONENT_TYPE_BYTE:
+        return 127.0
+    elif type == tiny_gltf.TINYGLTF_COMPONENT_TYPE_SHORT:
+        return 32767.0
+    return 1.0
+
+def get_buffer_bytes(buffer_data: memoryview | bytes | bytearray | list[int]) -> memoryview:
+    '''Return byte view of the buffer data
+    Old bindings return buffer data as a list of integers, in this case the data is packed into bytes once
+    '''
+    if isinstance(buffer_data, list):
+        return memoryview(bytes(buffer_data))
+    return memoryview(buffer_data).cast("B")
+
+def read_buffer_view_array(buffer_view: tiny_gltf.BufferView,
+                           model_buffers_data: list[memoryview],
                            component_type: int,
                            byte_offset: int,
                            components: int,
-                           count: int,
-                           decode_normalized: bool) -> list[float]:
-    buffer_data: list[int] = model_buffers_data[buffer_view.buffer]
+                           count: int) -> array:
+    '''Read values from the buffer view into typed array without conversion
+    The type of the array corresponds to the component type
+    Values of all components are stored in the plain array, so the length of the array is components * count
+    '''
+    buffer_data: memoryview = get_buffer_bytes(model_buffers_data[buffer_view.buffer])
+    array_format: str = component_type_to_format(component_type)
     component_size: int = tiny_gltf.get_component_size_in_bytes(component_type)
-    byte_stride: int = components * component_size if buffer_view.byte_stride == 0 else buffer_view.byte_stride
-    index_stride: int = byte_stride // component_size
+    element_size: int = components * component_size
+    byte_stride: int = element_size if buffer_view.byte_stride == 0 else buffer_view.byte_stride
+    buffer_start: int = buffer_view.byte_offset + byte_offset
 
-    to_return: list[float] = [0.0] * (components * count)
-    for i in range(count):
-        for c in range(components):
-            buffer_start = buffer_view.byte_offset + byte_offset + (i * index_stride + c) * component_size
-            buffer_part = buffer_data[buffer_start:buffer_start + component_size]
-            value: float = float(struct.unpack(component_type_to_format(component_type), bytearray(buffer_part))[0])
+    to_return: array = array(array_format)
+    if count <= 0:
+        return to_return
+    if byte_stride == element_size:
+        # data is tightly packed, copy it by one call
+        to_return.frombytes(buffer_data[buffer_start:buffer_start + count * element_size])
+    else:
+        # data is interleaved with other attributes
+        buffer_end: int = buffer_start + (count - 1) * byte_stride + element_size
+        if byte_stride % component_size == 0:
+            # select each component by strided slice of the typed view
+            index_stride: int = byte_stride // component_size
+            typed_data: memoryview = buffer_data[buffer_start:buffer_end].cast(array_format)
+            to_return.frombytes(bytes(count * element_size))
+            for c in range(components):
+                to_return[c::components] = array(array_format, typed_data[c::index_stride].tobytes())
+        else:
+            to_return.frombytes(b"".join([buffer_data[s:s + element_size] for s in range(buffer_start, buffer_end, byte_stride)]))
+    # glTF stores data in little-endian order
+    if sys.byteorder == "big":
+        to_return.byteswap()
+    return to_return
 
-            if component_type == tiny_gltf.TINYGLTF_COMPONENT_TYPE_FLOAT:
-                to_return[components * i + c] = value
-            elif component_type == tiny_gltf.TINYGLTF_COMPONENT_TYPE_UNSIGNED_BYTE:
-                to_return[components * i + c] = value / 255.0 if decode_normalized else value
-            elif component_type == tiny_gltf.TINYGLTF_COMPONENT_TYPE_UNSIGNED_SHORT:
-                to_return[components * i + c] = value / 65535.0 if decode_normalized else value
-            elif component_type == tiny_gltf.TINYGLTF_COMPONENT_TYPE_UNSIGNED_INT:
-                to_return[components * i + c] = value
-            elif component_type == tiny_gltf.TINYGLTF_COMPONENT_TYPE_BYTE:
-                to_return[components * i + c] = value / 127.0 if decode_normalized else value
-            elif component_type == tiny_gltf.TINYGLTF_COMPONENT_TYPE_SHORT:
-                to_return[components * i + c] = value / 32767.0 if decode_normalized else value
-            elif component_type == tiny_gltf.TINYGLTF_COMPONENT_TYPE_INT:
-                to_return[components * i + c] = value
-            elif component_type == tiny_gltf.TINYGLTF_COMPONENT_TYPE_DOUBLE:
-                to_return[components * i + c] = value
+def read_float_buffer_view_array(buffer_view: tiny_gltf.BufferView,
+                                 model_buffers_data: list[memoryview],
+                                 component_type: int,
+                                 byte_offset: int,
+                                 components: int,
+                                 count: int,
+                                 decode_normalized: bool) -> array:
+    '''Read values from the buffer view into float array
+    For float components return array("f") with raw values, for other types - array("d")
+    If decode_normalized is True, then integer components are converted into [0, 1] (or [-1, 1]) range
+    '''
+    values: array = read_buffer_view_array(buffer_view, model_buffers_data, component_type, byte_offset, components, count)
+    if values.typecode == "f" or values.typecode == "d":
+        return values
+    scale: float = component_type_to_normalize_scale(component_type) if decode_normalized else 1.0
+    if scale == 1.0:
+        return array("d", values)
+    return array("d", map(scale.__rtruediv__, values))
 
-    return to_return
+def read_float_buffer_view(buffer_view: tiny_gltf.BufferView,
+                           model_buffers_data: list[memoryview],
+                           component_type: int,
+                           byte_offset: int,
+                           components: int,
+                           count: int,
+                           decode_normalized: bool) -> list[float]:
+    return read_float_buffer_view_array(buffer_view, model_buffers_data, component_type, byte_offset, components, count, decode_normalized).tolist()
 
-def get_float_buffer(model: tiny_gltf.Model,
-                     accessor: tiny_gltf.Accessor,
-                     model_buffers_data: list[list[int]],
-                     decode_normalized: bool=False) -> list[float]:
+def get_float_array(model: tiny_gltf.Model,
+                    accessor: tiny_gltf.Accessor,
+                    model_buffers_data: list[memoryview],
+                    decode_normalized: bool=False) -> array:
     components: int = tiny_gltf.get_num_components_in_type(accessor.type)
     component_type: int = accessor.component_type
     buffer_view: tiny_gltf.BufferView = model.buffer_views[accessor.buffer_view]
 
-    return read_float_buffer_view(buffer_view, model_buffers_data, component_type, accessor.byte_offset, components, accessor.count, decode_normalized)
+    return read_float_buffer_view_array(buffer_view, model_buffers_data, component_type, accessor.byte_offset, components, accessor.count, decode_normalized)
+
+def get_float_buffer(model: tiny_gltf.Model,
+                     accessor: tiny_gltf.Accessor,
+                     model_buffers_data: list[memoryview],
+                     decode_normalized: bool=False) -> list[float]:
+    return get_float_array(model, accessor, model_buffers_data, decode_normalized).tolist()
 
 def read_integer_buffer_view(buffer_view: tiny_gltf.BufferView,
-                             model_buffers_data: list[list[int]],
+                             model_buffers_data: list[memoryview],
                              component_type: int,
                              byte_offset: int,
                              components: int,
                              count: int) -> list[int]:
-    buffer_data: list[int] = model_buffers_data[buffer_view.buffer]
-    component_size: int = tiny_gltf.get_component_size_in_bytes(component_type)
-    byte_stride: int = components * component_size if buffer_view.byte_stride == 0 else buffer_view.byte_stride
-    index_stride: int = byte_stride // component_size
-    to_return: list[int] = [0] * (components * count)
+    return read_buffer_view_array(buffer_view, model_buffers_data, component_type, byte_offset, components, count).tolist()
 
-    for i in range(count):
-        for c in range(components):
-            buffer_start: int = buffer_view.byte_offset + byte_offset + (i * index_stride + c) * component_size
-            buffer_part = buffer_data[buffer_start:buffer_start + component_size]
-            value: int = struct.unpack(component_type_to_format(component_type), bytearray(buffer_part))[0]
-            to_return[components * i + c] = value
+def get_integer_array(model: tiny_gltf.Model,
+                      accessor: tiny_gltf.Accessor,
+                      model_buffers_data: list[memoryview]) -> array:
+    components: int = tiny_gltf.get_num_components_in_type(accessor.type)
+    component_type: int = accessor.component_type
 
-    return to_return
+    buffer_view: tiny_gltf.BufferView = model.buffer_views[accessor.buffer_view]
+    return read_buffer_view_array(buffer_view, model_buffers_data, component_type, accessor.byte_offset, components, accessor.count)
 
 def get_integer_buffer(model: tiny_gltf.Model,
                        accessor: tiny_gltf.Accessor,
-                       model_buffers_data: list[list[int]]) -> list[int]:
-    components: int = tiny_gltf.get_num_components_in_type(accessor.type)
-    component_type: int = accessor.component_type
-    
-    buffer_view: tiny_gltf.BufferView = model.buffer_views[accessor.buffer_view]
-    return read_integer_buffer_view(buffer_view, model_buffers_data, component_type, accessor.byte_offset, components, accessor.count)
+                       model_buffers_data: list[memoryview]) -> list[int]:
+    return get_integer_array(model, accessor, model_buffers_data).tolist()
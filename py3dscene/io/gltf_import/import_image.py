@@ -1,8 +1,22 @@
 import os
+from typing import Optional
 from py3dscene.bin import tiny_gltf
 
+def get_image_extension(mime_type: str) -> str:
+    if mime_type == "image/jpeg":
+        return ".jpg"
+    elif mime_type == "image/bmp":
+        return ".bmp"
+    elif mime_type == "image/gif":
+        return ".gif"
+    return ".png"
+
 def import_images(gltf_model: tiny_gltf.Model,
-                  file_path: str) -> dict[int, str]:
+                  file_path: str,
+                  model_buffers_data: Optional[list[memoryview]]=None) -> dict[int, str]:
+    '''Save embedded images into files and return the map from image index to the path of the image file
+    If the image is not decoded by the loader, then it's saved as is from the buffer (model_buffers_data should be defined)
+    '''
     file_path_norm: str = file_path.replace("/", "\\")
     images_map: dict[int, str] = {}
     images_count: int = len(gltf_model.images)
@@ -33,9 +47,20 @@ def import_images(gltf_model: tiny_gltf.Model,
             # create directory if it does not exists
             os.makedirs(image_folder, exist_ok=True)
             image_path = image_folder + image_name + ".png"
+            if len(gltf_image.image) == 0 and model_buffers_data is not None and gltf_image.buffer_view >= 0:
+                # pixels are not decoded, but we can save encoded image data
+                image_path = image_folder + image_name + get_image_extension(gltf_image.mime_type)
+                if not os.path.isfile(image_path):
+                    image_view: tiny_gltf.BufferView = gltf_model.buffer_views[gltf_image.buffer_view]
+                    with open(image_path, "wb") as image_file:
+                        image_file.write(model_buffers_data[image_view.buffer][image_view.byte_offset:image_view.byte_offset + image_view.byte_length])
             # skip if the file already exists
-            if not os.path.isfile(image_path):
-                is_write: bool = tiny_gltf.write_png(image_path, image_width, image_height, image_components, gltf_image.image)
+            elif not os.path.isfile(image_path):
+                try:
+                    is_write: bool = tiny_gltf.write_png(image_path, image_width, image_height, image_components, gltf_image.image)
+                except ValueError:
+                    # pixels do not match the image size
+                    is_write = False
                 if not is_write:
                     # fail to write the texture
                     image_path = ""
@@ -0,0 +1,296 @@
+import os
+import json
+import mmap
+import base64
+import struct
+from typing import Any
+from typing import Callable
+from typing import Optional
+from urllib.parse import unquote
+from py3dscene.bin import tiny_gltf
+
+'''Read glTF files without tiny_gltf loader
+Only json part of the file is parsed, binary buffers are mapped into the memory
+So, the data is read from the disk only when it is actually used
+
+Objects of the json are wrapped into JsonObject, which has the same properties as tiny_gltf classes
+This allows to use the same import functions for both loaders
+'''
+
+GLB_MAGIC: bytes = b"glTF"
+GLB_CHUNK_JSON: int = 0x4E4F534A
+GLB_CHUNK_BIN: int = 0x004E4942
+
+def accessor_type_to_int(type: str) -> int:
+    if type == "VEC2":
+        return tiny_gltf.TINYGLTF_TYPE_VEC2
+    elif type == "VEC3":
+        return tiny_gltf.TINYGLTF_TYPE_VEC3
+    elif type == "VEC4":
+        return tiny_gltf.TINYGLTF_TYPE_VEC4
+    elif type == "MAT2":
+        return tiny_gltf.TINYGLTF_TYPE_MAT2
+    elif type == "MAT3":
+        return tiny_gltf.TINYGLTF_TYPE_MAT3
+    elif type == "MAT4":
+        return tiny_gltf.TINYGLTF_TYPE_MAT4
+    return tiny_gltf.TINYGLTF_TYPE_SCALAR
+
+# for each type of json object define its properties
+# key - the name of the property (as in tiny_gltf)
+# value - tuple with
+#   - path to the value in json object, parts are separated by point
+#   - default value, if json does not contains the property
+#   - the name of the type of the value, if the value is json object or list of json objects (empty string for other values)
+#   - function to convert json value (or None)
+JSON_PROPERTIES: dict[str, dict[str, tuple[str, Any, str, Optional[Callable[[Any], Any]]]]] = {
+    "Model": {
+        "default_scene": ("scene", -1, "", None),
+        "scenes": ("scenes", [], "Scene", None),
+        "nodes": ("nodes", [], "Node", None),
+        "meshes": ("meshes", [], "Mesh", None),
+        "accessors": ("accessors", [], "Accessor", None),
+        "buffer_views": ("bufferViews", [], "BufferView", None),
+        "materials": ("materials", [], "Material", None),
+        "images": ("images", [], "Image", None),
+        "cameras": ("cameras", [], "Camera", None),
+        "lights": ("extensions.KHR_lights_punctual.lights", [], "Light", None),
+        "skins": ("skins", [], "Skin", None),
+        "animations": ("animations", [], "Animation", None)},
+    "Scene": {
+        "name": ("name", "", "", None),
+        "nodes": ("nodes", [], "", None)},
+    "Node": {
+        "name": ("name", "", "", None),
+        "camera": ("camera", -1, "", None),
+        "mesh": ("mesh", -1, "", None),
+        "skin": ("skin", -1, "", None),
+        "light": ("extensions.KHR_lights_punctual.light", -1, "", None),
+        "children": ("children", [], "", None),
+        "matrix": ("matrix", [], "", None),
+        "translation": ("translation", [], "", None),
+        "rotation": ("rotation", [], "", None),
+        "scale": ("scale", [], "", None)},
+    "Mesh": {
+        "name": ("name", "", "", None),
+        "primitives": ("primitives", [], "Primitive", None)},
+    "Primitive": {
+        "attributes": ("attributes", {}, "", None),
+        "indices": ("indices", -1, "", None),
+        "material": ("material", -1, "", None),
+        "mode": ("mode", tiny_gltf.TINYGLTF_MODE_TRIANGLES, "", None),
+        "targets": ("targets", [], "", None)},
+    "Accessor": {
+        "buffer_view": ("bufferView", -1, "", None),
+        "byte_offset": ("byteOffset", 0, "", None),
+        "component_type": ("componentType", -1, "", None),
+        "normalized": ("normalized", False, "", None),
+        "count": ("count", 0, "", None),
+        "type": ("type", "SCALAR", "", accessor_type_to_int),
+        "min_values": ("min", [], "", None),
+        "max_values": ("max", [], "", None),
+        "sparse": ("sparse", {}, "AccessorSparse", None)},
+    "AccessorSparse": {
+        "is_sparse": ("count", 0, "", lambda count: count > 0),
+        "count": ("count", 0, "", None),
+        "indices": ("indices", {}, "AccessorSparseIndices", None),
+        "values": ("values", {}, "AccessorSparseValues", None)},
+    "AccessorSparseIndices": {
+        "buffer_view": ("bufferView", -1, "", None),
+        "byte_offset": ("byteOffset", 0, "", None),
+        "component_type": ("componentType", -1, "", None)},
+    "AccessorSparseValues": {
+        "buffer_view": ("bufferView", -1, "", None),
+        "byte_offset": ("byteOffset", 0, "", None)},
+    "BufferView": {
+        "buffer": ("buffer", -1, "", None),
+        "byte_offset": ("byteOffset", 0, "", None),
+        "byte_length": ("byteLength", 0, "", None),
+        "byte_stride": ("byteStride", 0, "", None),
+        "target": ("target", 0, "", None)},
+    "Material": {
+        "name": ("name", "", "", None),
+        "alpha_mode": ("alphaMode", "OPAQUE", "", None),
+        "alpha_cutoff": ("alphaCutoff", 0.5, "", None),
+        "double_sided": ("doubleSided", False, "", None),
+        "emissive_factor": ("emissiveFactor", [0.0, 0.0, 0.0], "", None),
+        "pbr_metallic_roughness": ("pbrMetallicRoughness", {}, "PbrMetallicRoughness", None),
+        "emissive_texture": ("emissiveTexture", {}, "TextureInfo", None),
+        "normal_texture": ("normalTexture", {}, "NormalTextureInfo", None),
+        "occlusion_texture": ("occlusionTexture", {}, "OcclusionTextureInfo", None)},
+    "PbrMetallicRoughness": {
+        "base_color_factor": ("baseColorFactor", [1.0, 1.0, 1.0, 1.0], "", None),
+        "metallic_factor": ("metallicFactor", 1.0, "", None),
+        "roughness_factor": ("roughnessFactor", 1.0, "", None),
+        "base_color_texture": ("baseColorTexture", {}, "TextureInfo", None),
+        "metallic_roughness_texture": ("metallicRoughnessTexture", {}, "TextureInfo", None)},
+    "TextureInfo": {
+        "index": ("index", -1, "", None),
+        "tex_coord": ("texCoord", 0, "", None)},
+    "NormalTextureInfo": {
+        "index": ("index", -1, "", None),
+        "tex_coord": ("texCoord", 0, "", None),
+        "scale": ("scale", 1.0, "", None)},
+    "OcclusionTextureInfo": {
+        "index": ("index", -1, "", None),
+        "tex_coord": ("texCoord", 0, "", None),
+        "strength": ("strength", 1.0, "", None)},
+    "Image": {
+        "name": ("name", "", "", None),
+        "uri": ("uri", "", "", None),
+        "mime_type": ("mimeType", "", "", None),
+        "buffer_view": ("bufferView", -1, "", None),
+        # pixels of embedded images are not decoded
+        "width": ("width", -1, "", None),
+        "height": ("height", -1, "", None),
+        "component": ("component", -1, "", None),
+        "bits": ("bits", -1, "", None),
+        "pixel_type": ("pixelType", -1, "", None),
+        "image": ("image", b"", "", None)},
+    "Camera": {
+        "name": ("name", "", "", None),
+        "type": ("type", "", "", None),
+        "perspective": ("perspective", {}, "PerspectiveCamera", None),
+        "orthographic": ("orthographic", {}, "OrthographicCamera", None)},
+    "PerspectiveCamera": {
+        "aspect_ratio": ("aspectRatio", 0.0, "", None),
+        "yfov": ("yfov", 0.0, "", None),
+        "zfar": ("zfar", 0.0, "", None),
+        "znear": ("znear", 0.0, "", None)},
+    "OrthographicCamera": {
+        "xmag": ("xmag", 0.0, "", None),
+        "ymag": ("ymag", 0.0, "", None),
+        "zfar": ("zfar", 0.0, "", None),
+        "znear": ("znear", 0.0, "", None)},
+    "Light": {
+        "name": ("name", "", "", None),
+        "color": ("color", [], "", None),
+        "intensity": ("intensity", 1.0, "", None),
+        "type": ("type", "", "", None),
+        "range": ("range", 0.0, "", None),
+        "spot": ("spot", {}, "SpotLight", None)},
+    "SpotLight": {
+        "inner_cone_angle": ("innerConeAngle", 0.0, "", None),
+        "outer_cone_angle": ("outerConeAngle", 0.7853981634, "", None)},
+    "Skin": {
+        "name": ("name", "", "", None),
+        "inverse_bind_matrices": ("inverseBindMatrices", -1, "", None),
+        "skeleton": ("skeleton", -1, "", None),
+        "joints": ("joints", [], "", None)},
+    "Animation": {
+        "name": ("name", "", "", None),
+        "channels": ("channels", [], "AnimationChannel", None),
+        "samplers": ("samplers", [], "AnimationSampler", None)},
+    "AnimationChannel": {
+        "sampler": ("sampler", -1, "", None),
+        "target_node": ("target.node", -1, "", None),
+        "target_path": ("target.path", "", "", None)},
+    "AnimationSampler": {
+        "input": ("input", -1, "", None),
+        "output": ("output", -1, "", None),
+        "interpolation": ("interpolation", "LINEAR", "", None)}
+}
+
+class JsonObject:
+    '''Read-only view of the object from glTF json
+    Properties are available by the same names as in tiny_gltf classes
+    If the json does not contains the property, then it returns default value
+    '''
+    def __init__(self, data: dict[str, Any], type_name: str) -> None:
+        self._data: dict[str, Any] = data
+        self._type_name: str = type_name
+
+    def __getattr__(self, name: str) -> Any:
+        # called only for properties, which are not requested yet
+        properties: dict[str, tuple[str, Any, str, Optional[Callable[[Any], Any]]]] = JSON_PROPERTIES[self._type_name]
+        if name not in properties:
+            raise AttributeError(f"{self._type_name} has no property {name}")
+        path, default, value_type, convert = properties[name]
+        value: Any = self._data
+        for key in path.split("."):
+            if isinstance(value, dict) and key in value:
+                value = value[key]
+            else:
+                value = default
+                break
+        if convert is not None:
+            value = convert(value)
+        if len(value_type) > 0:
+            value = [JsonObject(v, value_type) for v in value] if isinstance(value, list) else JsonObject(value, value_type)
+        # store the value, so the next time it will be returned without this function
+        setattr(self, name, value)
+        return value
+
+def decode_data_uri(uri: str) -> Optional[bytes]:
+    '''Return bytes of the data uri (data:[<mime type>];base64,<data>)
+    If uri is not a data uri, then return None
+    '''
+    if not uri.startswith("data:"):
+        return None
+    comma: int = uri.find(",")
+    if comma < 0 or not uri[:comma].endswith(";base64"):
+        return None
+    return base64.b64decode(uri[comma + 1:])
+
+def map_file(file_path: str) -> memoryview:
+    '''Return read-only view of the file content
+    The file is mapped into the memory, so the data is read from the disk by request
+    '''
+    if not os.path.isfile(file_path) or os.path.getsize(file_path) == 0:
+        return memoryview(b"")
+    with open(file_path, "rb") as file:
+        file_map: mmap.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(file_map)
+
+def load_gltf_json(file_path: str) -> tuple[JsonObject, list[memoryview]]:
+    '''Read json of the glTF (or glb) file and map binary buffers into the memory
+    Return the model object and the list with data of all buffers
+
+    Images, embedded as data uri, are moved into additional buffers, so all embedded images are defined by buffer views
+    '''
+    file_data: memoryview = map_file(file_path)
+    json_data: dict[str, Any] = {}
+    bin_chunk: memoryview = memoryview(b"")
+    if file_data[:4] == GLB_MAGIC:
+        # binary file contains the header and chunks
+        _, _, file_length = struct.unpack_from("<III", file_data, 0)
+        offset: int = 12
+        while offset + 8 <= min(file_length, len(file_data)):
+            chunk_length, chunk_type = struct.unpack_from("<II", file_data, offset)
+            chunk: memoryview = file_data[offset + 8:offset + 8 + chunk_length]
+            if chunk_type == GLB_CHUNK_JSON:
+                json_data = json.loads(bytes(chunk))
+            elif chunk_type == GLB_CHUNK_BIN and len(bin_chunk) == 0:
+                bin_chunk = chunk
+            offset += 8 + chunk_length
+    elif len(file_data) > 0:
+        json_data = json.loads(bytes(file_data))
+        file_data.release()
+    if len(json_data) == 0:
+        raise ValueError(f"Fail to read glTF from {file_path}")
+
+    # external files are relative to the folder of the glTF file
+    last_slash: int = max(file_path.rfind("/"), file_path.rfind("\\"))
+    folder_path: str = file_path[:last_slash] + "/" if last_slash >= 0 else ""
+    model_buffers_data: list[memoryview] = []
+    for buffer in json_data.get("buffers", []):
+        uri: str = buffer.get("uri", "")
+        if len(uri) == 0:
+            # the buffer is stored in the binary chunk of the glb file
+            model_buffers_data.append(bin_chunk)
+        else:
+            uri_data: Optional[bytes] = decode_data_uri(uri)
+            model_buffers_data.append(memoryview(uri_data) if uri_data is not None else map_file(folder_path + unquote(uri)))
+
+    for image in json_data.get("images", []):
+        image_data: Optional[bytes] = decode_data_uri(image.get("uri", ""))
+        if image_data is not None:
+            # store image data in the new buffer and refer to it by the buffer view
+            buffer_views: list[dict[str, Any]] = json_data.setdefault("bufferViews", [])
+            buffer_views.append({"buffer": len(model_buffers_data), "byteLength": len(image_data)})
+            model_buffers_data.append(memoryview(image_data))
+            image["bufferView"] = len(buffer_views) - 1
+            image["mimeType"] = image["uri"][5:image["uri"].find(";")]
+            del image["uri"]
+
+    return JsonObject(json_data, "Model"), model_buffers_data
@@ -1,40 +1,34 @@
-import struct
+from array import array
+from functools import partial
+from itertools import chain
+from itertools import compress
+from operator import ne
+from typing import Optional
 from py3dscene.bin import tiny_gltf
-from py3dscene.io.gltf_import.import_buffer import component_type_to_format
-from py3dscene.io.gltf_import.import_buffer import get_float_buffer
-from py3dscene.io.gltf_import.import_buffer import get_integer_buffer
-from py3dscene.io.gltf_import.import_buffer import read_float_buffer_view
-from py3dscene.io.gltf_import.import_buffer import read_integer_buffer_view
+from py3dscene.io.gltf_import.import_buffer import get_float_array
+from py3dscene.io.gltf_import.import_buffer import get_integer_array
+from py3dscene.io.gltf_import.import_buffer import read_float_buffer_view_array
+from py3dscene.io.gltf_import.import_buffer import read_buffer_view_array
+from py3dscene.io.gltf_import.import_json import JsonObject
+from py3dscene.io.gltf_import.import_json import load_gltf_json
 from py3dscene.object import Object
 from py3dscene.material import PBRMaterial
 from py3dscene.mesh import MeshComponent
+from py3dscene.mesh import LazyMeshComponent
+from py3dscene.mesh import create_mesh_from_buffers
 
 def get_polygon_indices(model: tiny_gltf.Model,
                         primitive: tiny_gltf.Primitive,
-                        model_buffers_data: list[list[int]],
-                        first_index: int) -> list[int]:
+                        model_buffers_data: list[memoryview],
+                        first_index: int) -> array:
     if primitive.indices >= 0:
         polygon_accessor: tiny_gltf.Accessor = model.accessors[primitive.indices]
-        component_type: int = polygon_accessor.component_type
-        to_return: list[int] = [0] * polygon_accessor.count
-
-        buffer_view: tiny_gltf.BufferView = model.buffer_views[polygon_accessor.buffer_view]
-        buffer_data: list[int] = model_buffers_data[buffer_view.buffer]
-
-        count: int = polygon_accessor.count
-
-        component_size: int = tiny_gltf.get_component_size_in_bytes(component_type)
-        byte_stride: int = component_size if buffer_view.byte_stride == 0 else buffer_view.byte_stride
-        index_stride: int = byte_stride // component_size
-
-        for i in range(count):
-            buffer_start = buffer_view.byte_offset + polygon_accessor.byte_offset + i * index_stride * component_size
-            buffer_part = buffer_data[buffer_start:buffer_start + component_size]
-            to_return[i] = struct.unpack(component_type_to_format(component_type), bytearray(buffer_part))[0] + first_index
-        
-        return to_return
+        indices: array = get_integer_array(model, polygon_accessor, model_buffers_data)
+        if first_index == 0:
+            return indices
+        return array("q", map(first_index.__add__, indices))
     else:
-        return []
+        return array("q")
 
 def attribute_length(name: str) -> int:
     if name == "NORMAL" or name.find("TEXCOORD") == 0:
@@ -45,168 +39,211 @@ def attribute_length(name: str) -> int:
         return 0
 
 def add_shape_target(gltf_model: tiny_gltf.Model,
-                     model_buffers_data: list[list[int]],
+                     model_buffers_data: list[memoryview],
                      gltf_shape: dict[str, int],
                      shape_name: str,
                      mesh: MeshComponent) -> None:
     if shape_name in gltf_shape:
         acc_index: int = gltf_shape[shape_name]
         shape_accessor: tiny_gltf.Accessor = gltf_model.accessors[acc_index]
-        shape_values: list[float] = []
+        shape_values: array = array("d")
         if shape_accessor.sparse.is_sparse:
-            values: list[float] = read_float_buffer_view(
-                gltf_model,
+            values: array = read_float_buffer_view_array(
                 gltf_model.buffer_views[shape_accessor.sparse.values.buffer_view],
+                model_buffers_data,
                 shape_accessor.component_type,
                 shape_accessor.sparse.values.byte_offset,
                 tiny_gltf.get_num_components_in_type(shape_accessor.type),
                 shape_accessor.sparse.count,
                 False)
 
-            indices: list[int] = read_integer_buffer_view(
-                gltf_model,
+            indices: array = read_buffer_view_array(
                 gltf_model.buffer_views[shape_accessor.sparse.indices.buffer_view],
+                model_buffers_data,
                 shape_accessor.sparse.indices.component_type,
                 shape_accessor.sparse.indices.byte_offset,
                 1,
                 shape_accessor.sparse.count)
 
-            shape_values = [0.0] * (3 * mesh.get_vertex_count())
+            shape_values = array("d", bytes(3 * 8 * mesh.get_vertex_count()))
             for i in range(len(indices)):
                 index: int = indices[i]
                 shape_values[3 * index] = values[3 * i]
                 shape_values[3 * index + 1] = values[3 * i + 1]
                 shape_values[3 * index + 2] = values[3 * i + 2]
         else:
-            shape_values = get_float_buffer(gltf_model, shape_accessor, model_buffers_data)
-        mesh.add_shape([(shape_values[3 * i], shape_values[3 * i + 1], shape_values[3 * i + 2]) for i in range(len(shape_values) // 3)])
+            shape_values = get_float_array(gltf_model, shape_accessor, model_buffers_data)
+        mesh.add_shape_buffer(shape_values)
+
+def get_valid_triangles(triangles: array) -> array:
+    '''Return the array with triangle indices without degenerate triangles
+    The triangle is degenerate if it contains the same vertex index several times
+    '''
+    a: array = triangles[0::3]
+    b: array = triangles[1::3]
+    c: array = triangles[2::3]
+    # form the mask with one value for each triangle
+    mask: list[bool] = [ab and bc and ac for ab, bc, ac in zip(map(ne, a, b), map(ne, b, c), map(ne, a, c))]
+    if all(mask):
+        return triangles
+    return array(triangles.typecode, chain.from_iterable(compress(zip(a, b, c), mask)))
+
+def gather_attribute(values: array,
+                     components: int,
+                     output_components: int,
+                     indices: Optional[array]) -> array:
+    '''Return plain array with attribute values for each index
+    If indices is None, then values are returned in the original order
+    If the attribute contains less components than output_components, then missed components are filled by 1.0
+    '''
+    count: int = len(indices) if indices is not None else len(values) // components
+    to_return: array = array("d", [1.0]) * (output_components * count)
+    for c in range(min(components, output_components)):
+        component_values: array = array("d", values[c::components])
+        to_return[c::output_components] = component_values if indices is None else array("d", map(component_values.__getitem__, indices))
+    return to_return
+
+def is_primitive_valid(gltf_model: tiny_gltf.Model, gltf_primitive: tiny_gltf.Primitive) -> bool:
+    '''Return True if the primitive contains positions and indices of at least one triangle
+    Only accessors are checked, the data is not decoded, so the primitive still can contain only degenerate triangles
+    '''
+    attributes: dict[str, int] = gltf_primitive.attributes
+    if "POSITION" not in attributes or gltf_primitive.indices < 0:
+        return False
+    return gltf_model.accessors[attributes["POSITION"]].count > 0 and gltf_model.accessors[gltf_primitive.indices].count >= 3
+
+def import_primitive(gltf_model: tiny_gltf.Model,
+                     gltf_primitive: tiny_gltf.Primitive,
+                     model_buffers_data: list[memoryview],
+                     materials_map: dict[int, PBRMaterial],
+                     attributes_per_vertex: bool) -> Optional[MeshComponent]:
+    '''Decode mesh primitive and return the mesh component
+    If the primitive does not contains valid triangles, then return None
+    '''
+    if not is_primitive_valid(gltf_model, gltf_primitive):
+        return None
+    position_attr_index: int = gltf_primitive.attributes["POSITION"]
+    position_accessor: tiny_gltf.Accessor = gltf_model.accessors[position_attr_index]
+    positions: array = get_float_array(gltf_model, position_accessor, model_buffers_data)
+    if len(positions) == 0:
+        return None
+
+    triangles: array = get_polygon_indices(gltf_model, gltf_primitive, model_buffers_data, 0)
+    if len(triangles) == 0:
+        return None
+    del triangles[3 * (len(triangles) // 3):]
+    # remove triangles with coincident vertices
+    triangles = get_valid_triangles(triangles)
+    if len(triangles) == 0:
+        return None
+
+    # create the mesh
+    # glTF store attributes for each vertex
+    # if attributes_per_vertex is True, then keep this layout
+    # in other case copy attribute value from the vertex to each polygon node
+    mesh: MeshComponent = create_mesh_from_buffers(positions, triangles, None, attributes_per_vertex)
+    nodes_vertices: Optional[array] = None if attributes_per_vertex else triangles
+
+    material_index: int = gltf_primitive.material
+    if material_index in materials_map:
+        material: PBRMaterial = materials_map[material_index]
+        mesh.set_material(material)
+
+    skin_joints: list[int] = []
+    skin_weights: list[float] = []
+
+    for attribute_name, attribute_acc in gltf_primitive.attributes.items():
+        accessor: tiny_gltf.Accessor = gltf_model.accessors[attribute_acc]
+        if attribute_name == "POSITION":
+            continue
+
+        if attribute_name == "NORMAL":
+            normals: array = get_float_array(gltf_model, accessor, model_buffers_data)
+            mesh.add_normals_buffer(gather_attribute(normals, 3, 3, nodes_vertices))
+        elif attribute_name.find("TEXCOORD") == 0:
+            uvs: array = get_float_array(gltf_model, accessor, model_buffers_data)
+            mesh.add_uvs_buffer(gather_attribute(uvs, 2, 2, nodes_vertices))
+        elif attribute_name.find("COLOR") == 0:
+            # integer colors are always normalized
+            colors: array = get_float_array(gltf_model, accessor, model_buffers_data, True)
+            components: int = tiny_gltf.get_num_components_in_type(accessor.type)
+            mesh.add_colors_buffer(gather_attribute(colors, components, 4, nodes_vertices))
+        elif attribute_name.find("JOINTS") == 0:
+            joints: array = get_integer_array(gltf_model, accessor, model_buffers_data)
+            skin_joints.extend(joints)
+        elif attribute_name.find("WEIGHTS") == 0:
+            weights: array = get_float_array(gltf_model, accessor, model_buffers_data)
+            skin_weights.extend(weights)
+        elif attribute_name == "TANGENT":
+            tangents: array = get_float_array(gltf_model, accessor, model_buffers_data)
+            mesh.add_tangents_buffer(gather_attribute(tangents, 4, 4, nodes_vertices))
+    # finish iterate throw attributes
+    # variables skin_joints and skin_weights contains data for subobject skinning
+    # TODO: implement skinning import
+    
+    # next iterate throw shape deforms
+    for shape_index in range(len(gltf_primitive.targets)):
+        gltf_shape: dict[str, int] = gltf_primitive.targets[shape_index]
+        add_shape_target(gltf_model, model_buffers_data, gltf_shape, "POSITION", mesh)
+    
+    return mesh
+
+def decode_mesh(gltf_model: tiny_gltf.Model,
+                gltf_mesh: tiny_gltf.Mesh,
+                model_buffers_data: list[memoryview],
+                materials_map: dict[int, PBRMaterial],
+                attributes_per_vertex: bool) -> list[Optional[MeshComponent]]:
+    '''Decode all primitives of the mesh
+    Return the list with one mesh component for each primitive (None for primitives without valid triangles)
+    '''
+    return [import_primitive(gltf_model, gltf_mesh.primitives[i], model_buffers_data, materials_map, attributes_per_vertex) for i in range(len(gltf_mesh.primitives))]
+
+# the model, loaded in the worker process for parallel decoding
+worker_model: list[tuple[JsonObject, list[memoryview]]] = []
+
+def init_mesh_worker(file_path: str) -> None:
+    '''Load the model in the worker process
+    Only json is parsed and buffers are mapped into the memory, so it's fast
+    '''
+    worker_model.clear()
+    worker_model.append(load_gltf_json(file_path))
+
+def decode_mesh_worker(mesh_index: int, attributes_per_vertex: bool) -> list[Optional[MeshComponent]]:
+    '''Decode the mesh with a given index in the worker process
+    Materials are not assigned to output meshes
+    '''
+    gltf_model, model_buffers_data = worker_model[0]
+    return decode_mesh(gltf_model, gltf_model.meshes[mesh_index], model_buffers_data, {}, attributes_per_vertex)
 
 def import_object_mesh(gltf_model: tiny_gltf.Model,
                        gltf_mesh: tiny_gltf.Mesh,
-                       model_buffers_data: list[list[int]],
+                       model_buffers_data: list[memoryview],
                        object: Object,
                        materials_map: dict[int, PBRMaterial],
-                       envelop_map: dict[int, list[float]]) -> None:
-    for primitive_index in range(len(gltf_mesh.primitives)):
-        gltf_primitive: tiny_gltf.Primitive = gltf_mesh.primitives[primitive_index]
-        position_attr_index: int = gltf_primitive.attributes["POSITION"]
-        position_accessor: tiny_gltf.Accessor = gltf_model.accessors[position_attr_index]
-        positions: list[float] = get_float_buffer(gltf_model, position_accessor, model_buffers_data)
-        if len(positions) == 0:
-            continue
-
-        triangles: list[int] = get_polygon_indices(gltf_model, gltf_primitive, model_buffers_data, 0)
-        vertex_count: int = len(positions) // 3
-        triangles_count: int = len(triangles) // 3
-        samples_count: int = len(triangles)
-        trivial_triangles: list[int] = []
-        for t in range(triangles_count):
-            a: int = triangles[3 * t]
-            b: int = triangles[3 * t + 1]
-            c: int = triangles[3 * t + 2]
-            if a == b or a == c or b == c:
-                trivial_triangles.append(t)
-        trivial_triangles_count: int = len(trivial_triangles)
-
-        if len(triangles) == 0:
-            continue
-
-        if triangles_count <= trivial_triangles_count:
-            continue
-        
-        vertices: list[tuple[float, float, float]] = []
-        for v_index in range(vertex_count):
-            vertices.append((positions[3 * v_index], positions[3 * v_index + 1], positions[3 * v_index + 2]))
-        polygons: list[tuple[int, ...]] = []
-        for t_index in range(triangles_count):
-            if t_index not in trivial_triangles:
-                polygons.append((triangles[3 * t_index], triangles[3 * t_index + 1], triangles[3 * t_index + 2]))
-        # create the mesh
-        mesh: MeshComponent = MeshComponent(vertices, polygons)
-
-        material_index: int = gltf_primitive.material
-        if material_index in materials_map:
-            material: PBRMaterial = materials_map[material_index]
-            mesh.set_material(material)
-
-        skin_joints: list[int] = []
-        skin_weights: list[float] = []
-            
-        for attribute_name, attribute_acc in gltf_primitive.attributes.items():
-            accessor: tiny_gltf.Accessor = gltf_model.accessors[attribute_acc]
-            if attribute_name == "POSITION":
+                       envelop_map: dict[int, list[float]],
+                       attributes_per_vertex: bool=False,
+                       lazy: bool=False) -> list[MeshComponent]:
+    '''Import all primitives of the mesh and add them to the object
+    Return the list with added mesh components
+    '''
+    meshes: list[MeshComponent] = []
+    if lazy:
+        for primitive_index in range(len(gltf_mesh.primitives)):
+            gltf_primitive: tiny_gltf.Primitive = gltf_mesh.primitives[primitive_index]
+            # primitives without positions or indices are skipped as in the eager import
+            # but degenerate triangles can be found only after decoding, so such mesh becomes empty after loading
+            if not is_primitive_valid(gltf_model, gltf_primitive):
                 continue
-
-            triangle_index: int = 0
-            v: int = 0
-
-            if attribute_name == "NORMAL":
-                normals: list[float] = get_float_buffer(gltf_model, accessor, model_buffers_data)
-                normals_attr: list[tuple[float, float, float]] = []
-                for i in range(samples_count):
-                    triangle_index = i // 3
-                    if triangle_index in trivial_triangles:
-                        continue
-
-                    v = triangles[i]
-                    normals_attr.append((normals[3 * v], normals[3 * v + 1], normals[3 * v + 2]))
-                mesh.add_normals(normals_attr)
-            elif attribute_name.find("TEXCOORD") == 0:
-                uvs: list[float] = get_float_buffer(gltf_model, accessor, model_buffers_data)
-                uvs_attr: list[tuple[float, float]] = []
-                for i in range(samples_count):
-                    triangle_index = i // 3
-                    if triangle_index in trivial_triangles:
-                        continue
-
-                    v = triangles[i]
-                    uvs_attr.append((uvs[2 * v], uvs[2 * v + 1]))
-                mesh.add_uvs(uvs_attr)
-            elif attribute_name.find("COLOR") == 0:
-                colors: list[float] = get_float_buffer(gltf_model, accessor, model_buffers_data)
-                colors_attr_plain: list[float] = []
-                components: int = tiny_gltf.get_num_components_in_type(accessor.type)
-                colors_type: int = accessor.component_type
-                for i in range(samples_count):
-                    triangle_index = i // 3
-                    if triangle_index in trivial_triangles:
-                        continue
-                    v = triangles[i]
-                    for c in range(components):
-                        if colors_type == 5121:
-                            colors_attr_plain.append(colors[components * v + c] / 255.0)
-                        elif colors_type == 5123:
-                            colors_attr_plain.append(colors[components * v + c] / 65535.0)
-                        else:
-                            colors_attr_plain.append(colors[components * v + c])
-                    for c in range(components, 4):
-                        colors_attr_plain.append(1.0)
-                mesh.add_colors([(colors_attr_plain[4 * i], colors_attr_plain[4 * i + 1], colors_attr_plain[4 * i + 2], colors_attr_plain[4 * i + 3]) for i in range(len(colors_attr_plain) // 4)])
-            elif attribute_name.find("JOINTS") == 0:
-                joints: list[int] = get_integer_buffer(gltf_model, accessor, model_buffers_data)
-                skin_joints.extend(joints)
-            elif attribute_name.find("WEIGHTS") == 0:
-                weights: list[float] = get_float_buffer(gltf_model, accessor, model_buffers_data)
-                skin_weights.extend(weights)
-            elif attribute_name == "TANGENT":
-                tangents: list[float] = get_float_buffer(gltf_model, accessor, model_buffers_data)
-                tangents_attr: list[tuple[float, float, float, float]] = []
-                for i in range(samples_count):
-                    triangle_index = i // 3
-                    if triangle_index in trivial_triangles:
-                        continue
-
-                    v = triangles[i]
-                    tangents_attr.append((tangents[4 * v], tangents[4 * v + 1], tangents[4 * v + 2], tangents[4 * v + 3]))
-                mesh.add_tangents(tangents_attr)
-        # finish iterate throw attributes
-        # variables skin_joints and skin_weights contains data for subobject skinning
-        # TODO: implement skinning import
-        
-        # next iterate throw shape deforms
-        for shape_index in range(len(gltf_primitive.targets)):
-            gltf_shape: dict[str, int] = gltf_primitive.targets[shape_index]
-            add_shape_target(gltf_model, model_buffers_data, gltf_shape, "POSITION", mesh)
-        
-        # add mesh component to the object
+            # data of the primitive is decoded when the mesh is requested for the first time
+            # but material is assigned immediately
+            lazy_mesh: LazyMeshComponent = LazyMeshComponent(partial(import_primitive, gltf_model, gltf_primitive, model_buffers_data, materials_map, attributes_per_vertex))
+            if gltf_primitive.material in materials_map:
+                lazy_mesh.set_material(materials_map[gltf_primitive.material])
+            meshes.append(lazy_mesh)
+    else:
+        for mesh in decode_mesh(gltf_model, gltf_mesh, model_buffers_data, materials_map, attributes_per_vertex):
+            if mesh is not None:
+                meshes.append(mesh)
+    for mesh in meshes:
         object.add_mesh_component(mesh)
+    return meshes
@@ -1,23 +1,29 @@
 from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from py3dscene.bin import tiny_gltf
 from py3dscene.scene import Scene
 from py3dscene.object import Object
 from py3dscene.material import PBRMaterial
+from py3dscene.mesh import MeshComponent
 
 from py3dscene.io.gltf_import.import_transform import import_transform
 from py3dscene.io.gltf_import.import_mesh import import_object_mesh
+from py3dscene.io.gltf_import.import_mesh import init_mesh_worker
+from py3dscene.io.gltf_import.import_mesh import decode_mesh_worker
 from py3dscene.io.gltf_import.import_camera import import_object_camera
 from py3dscene.io.gltf_import.import_light import import_object_light
 
 def process_node(gltf_model: tiny_gltf.Model,
                  gltf_node: tiny_gltf.Node,
-                 model_buffers_data: list[list[int]],
                  gltf_node_index: int,
                  scene: Scene,
                  parent: Optional[Object],
-                 materials_map: dict[int, PBRMaterial],
                  nodes_map: dict[int, Object],
-                 envelopes: list[tuple[int, Object, dict[int, list[float]]]]) -> None:
+                 mesh_jobs: list[tuple[Object, int]]) -> None:
+    '''Create scene object for the glTF node and all its children
+    Meshes are not decoded here, for each node with a mesh we add to mesh_jobs the tuple (object, node index)
+    '''
     local_tfm = import_transform(gltf_node)
     object_name = gltf_node.name
     # create new object
@@ -31,12 +37,8 @@ def process_node(gltf_model: tiny_gltf.Model,
     
     if gltf_node.mesh >= 0 and gltf_node.mesh < len(gltf_model.meshes):
         # current node contains a mesh component
-        gltf_mesh: tiny_gltf.Mesh = gltf_model.meshes[gltf_node.mesh]
-        envelop_map: dict[int, list[float]] = {}
-        import_object_mesh(gltf_model, gltf_mesh, model_buffers_data, object, materials_map, envelop_map)
-
-        if gltf_node.skin > 0 and len(envelop_map.keys()) > 0:
-            envelopes.append((gltf_node.skin, object, envelop_map))
+        # it will be imported after all nodes
+        mesh_jobs.append((object, gltf_node_index))
     elif gltf_node.camera >= 0 and gltf_node.camera < len(gltf_model.cameras):
         # current node is a camera
         gltf_camera: tiny_gltf.Camera = gltf_model.cameras[gltf_node.camera]
@@ -51,10 +53,62 @@ def process_node(gltf_model: tiny_gltf.Model,
     for i in range(len(gltf_node.children)):
         process_node(gltf_model,
                      gltf_model.nodes[gltf_node.children[i]],
-                     model_buffers_data,
                      gltf_node.children[i],
                      scene,
                      object,
-                     materials_map,
                      nodes_map,
-                     envelopes)
+                     mesh_jobs)
+
+def import_meshes(gltf_model: tiny_gltf.Model,
+                  model_buffers_data: list[memoryview],
+                  file_path: str,
+                  mesh_jobs: list[tuple[Object, int]],
+                  materials_map: dict[int, PBRMaterial],
+                  envelopes: list[tuple[int, Object, dict[int, list[float]]]],
+                  attributes_per_vertex: bool,
+                  lazy: bool,
+                  workers: int) -> None:
+    '''Import meshes for all collected objects
+    If workers > 1, then meshes are decoded in parallel processes, each process read the file by itself
+    For lazy import workers are ignored, meshes are decoded at the first request
+    Mesh components are added to objects in the same order as jobs
+    '''
+    # each glTF mesh is decoded only once
+    # objects with the same glTF mesh get copies of mesh components, which share data arrays
+    meshes_cache: dict[int, list[MeshComponent]] = {}
+    decoded_meshes: Optional[dict[int, list[Optional[MeshComponent]]]] = None
+    mesh_indices: list[int] = list(dict.fromkeys(gltf_model.nodes[node_index].mesh for _, node_index in mesh_jobs))
+    if workers > 1 and not lazy and len(mesh_indices) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=min(workers, len(mesh_indices)),
+                                     initializer=init_mesh_worker,
+                                     initargs=(file_path,)) as executor:
+                decoded_meshes = dict(zip(mesh_indices, executor.map(decode_mesh_worker, mesh_indices, [attributes_per_vertex] * len(mesh_indices))))
+        except (OSError, BrokenProcessPool):
+            # it's not possible to use processes, so decode meshes in the main process
+            decoded_meshes = None
+
+    for object, node_index in mesh_jobs:
+        gltf_node: tiny_gltf.Node = gltf_model.nodes[node_index]
+        gltf_mesh: tiny_gltf.Mesh = gltf_model.meshes[gltf_node.mesh]
+        envelop_map: dict[int, list[float]] = {}
+        cached_meshes: Optional[list[MeshComponent]] = meshes_cache.get(gltf_node.mesh)
+        if cached_meshes is not None:
+            for mesh in cached_meshes:
+                object.add_mesh_component(mesh.get_shared_copy())
+        elif decoded_meshes is None:
+            meshes_cache[gltf_node.mesh] = import_object_mesh(gltf_model, gltf_mesh, model_buffers_data, object, materials_map, envelop_map, attributes_per_vertex, lazy)
+        else:
+            # meshes from other processes does not contains materials
+            meshes: list[MeshComponent] = []
+            for primitive_index, decoded_mesh in enumerate(decoded_meshes[gltf_node.mesh]):
+                if decoded_mesh is not None:
+                    material_index: int = gltf_mesh.primitives[primitive_index].material
+                    if material_index in materials_map:
+                        decoded_mesh.set_material(materials_map[material_index])
+                    object.add_mesh_component(decoded_mesh)
+                    meshes.append(decoded_mesh)
+            meshes_cache[gltf_node.mesh] = meshes
+
+        if gltf_node.skin > 0 and len(envelop_map.keys()) > 0:
+            envelopes.append((gltf_node.skin, object, envelop_map))
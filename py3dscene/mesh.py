@@ -1,4 +1,9 @@
+from __future__ import annotations  # remove for Python 3.11
+from array import array
+from typing import Any
+from typing import Callable
 from typing import Optional
+from typing import Sequence
 from py3dscene.material import PBRMaterial
 from py3dscene.material import get_default_material
 
@@ -7,111 +12,229 @@ class MeshComponent:
     '''
     def __init__(self,
                  vertices: list[tuple[float, float, float]],
-                 polygons: list[tuple[int, ...]]) -> None:
+                 polygons: list[tuple[int, ...]],
+                 attributes_per_vertex: bool=False) -> None:
         '''Create mesh object
 
         Parameters:
             vertices - the list with coordinates of vertex positions
             polygons - list with tuples which describe polygons
+            attributes_per_vertex - if True, then normals, uvs, colors and tangents are stored for each vertex (as in glTF)
+                and the value of the attribute for a polygon node is the value for the corresponding vertex
+                if False, then these attributes are stored for each polygon node
         '''
-        self._vertices: list[tuple[float, float, float]] = [v for v in vertices]
-        self._vertex_count = len(self._vertices)
-        self._polygons: list[tuple[int, ...]] = [tuple(p) for p in polygons]
-        self._polygons_sizes = [len(p) for p in self._polygons]
-        self._polygons_count = len(self._polygons)
-
-        self._material = get_default_material()
+        # vertex positions are stored in the plain array, three coordinates for each vertex
+        self._positions: array = array("d")
+        self._vertex_count: int = 0
+        # the list of tuples is created only by request
+        self._vertices: Optional[list[tuple[float, float, float]]] = None
+        # polygons are stored in the plain array with vertex indices of all polygon nodes
         # nodes are corners of polygons
         # the total number of nodes is the sum of polygon lengths
-        self._nodes_count: int = sum(self._polygons_sizes)
-
-        # each attribute we store as a list with values for each node
-        # first list element is array of attribute values for the first node and so on
-        # each node can contains several values for some attribute (uv, for example)
-        self._normals_count: int = 0
-        self._uvs_count: int = 0
-        self._colors_count: int = 0
-        self._tangent_count: int = 0
-        self._shapes_count: int = 0
-        self._normals: list[list[tuple[float, float, float]]] = [[] for _ in range(self._nodes_count)]
-        self._uvs: list[list[tuple[float, float]]] = [[] for _ in range(self._nodes_count)]
-        self._colors: list[list[tuple[float, float, float, float]]] = [[] for _ in range(self._nodes_count)]
-        self._tangents: list[list[tuple[float, float, float, float]]] = [[] for _ in range(self._nodes_count)]
+        self._polygons_vertices: array = array("I")
+        self._polygons_sizes: list[int] = []
+        self._polygons_count: int = 0
+        self._nodes_count: int = 0
+        self._polygons: Optional[list[tuple[int, ...]]] = None
+        # for exports we need mesh triangulation
+        # it's calculated at the first request and stored until polygons are changed
+        self._triangles: Optional[array] = None
+        self._triangles_to_node: Optional[array] = None
+        self._set_positions([c for v in vertices for c in v])
+        self._set_polygons([v for polygon in polygons for v in polygon], [len(polygon) for polygon in polygons])
+
+        self._material = get_default_material()
+        # each attribute we store as a list of layers (several uvs, for example)
+        # each layer is a plain array with values for all nodes (or all vertices)
+        # first values in the array are components of the attribute for the first node and so on
+        # so, the layer contains nodes_count * components values
+        self._attributes_per_vertex: bool = attributes_per_vertex
+        self._normals: list[array] = []
+        self._uvs: list[array] = []
+        self._colors: list[array] = []
+        self._tangents: list[array] = []
 
         # as shape we store deltas for point positions
-        # mesh can store several shapes, so, for each vertex we store a list with values for different shapes
-        self._shapes: list[list[tuple[float, float, float]]] = [[] for _ in range(self._vertex_count)]
+        # mesh can store several shapes, each shape layer contains vertex_count * 3 values
+        self._shapes: list[array] = []
         # TODO: store also displacements for normals, tangents, uvs and colors
         # how many values these shapes should contains? the same as node count?
 
-        # for exports we need mesh triangulation
-        # we should not only to split polygons into triangles, but also create the map from triangle to polygon node
-        # this will allow to obtain valid node attributes
-        # in _triangles array we store vertex indices for each triangle
-        self._triangles: list[tuple[int, int, int]] = []
+    def _set_positions(self, positions: Sequence[float]) -> None:
+        self._positions = array("d", positions)
+        self._vertex_count = len(self._positions) // 3
+        del self._positions[3 * self._vertex_count:]
+        self._vertices = None
+
+    def _set_polygons(self, polygons_vertices: Sequence[int], polygons_sizes: list[int]) -> None:
+        self._polygons_vertices = array("I", polygons_vertices)
+        self._polygons_sizes = list(polygons_sizes)
+        self._polygons_count = len(polygons_sizes)
+        self._nodes_count = len(self._polygons_vertices)
+        self._polygons = None
+        self._triangles = None
+        self._triangles_to_node = None
+
+    def _is_triangles(self) -> bool:
+        '''Return True if all polygons of the mesh are triangles
+        '''
+        return self._polygons_sizes.count(3) == self._polygons_count
+
+    def _triangulate(self) -> None:
+        '''Calculate triangulation of the mesh
+        We should not only to split polygons into triangles, but also create the map from triangle to polygon node
+        this will allow to obtain valid node attributes
+        '''
+        # in _triangles array we store vertex indices for each triangle (three values per triangle)
         # _triangles_to_node array contains node indices for each triangle
-        self._triangles_to_node: list[tuple[int, int, int]] = []
+        if self._is_triangles():
+            # all polygons are triangles, so triangle nodes are all nodes in the natural order
+            self._triangles_to_node = array("I", range(self._nodes_count))
+            return
+
+        # for each polygon (a, b, c, d ,...) with the first node s
+        # we create several triangles (a, b, c), (a, c, d), ...
+        # with nodes (s, s + 1, s + 2), (s, s + 2, s + 3), ...
+        size: int = self._polygons_sizes[0]
+        if self._polygons_sizes.count(size) == self._polygons_count:
+            # all polygons have the same size (quads, for example)
+            # node shifts of triangles are the same for all polygons
+            # so each corner of these triangles is filled for all polygons at once by slices
+            fan: tuple[int, ...] = tuple(shift for i in range(2, size) for shift in (0, i - 1, i))
+            self._triangles_to_node = array("I", [0]) * (len(fan) * self._polygons_count)
+            self._triangles = array("I", [0]) * (len(fan) * self._polygons_count)
+            for corner, shift in enumerate(fan):
+                self._triangles_to_node[corner::len(fan)] = array("I", range(shift, self._nodes_count, size))
+                self._triangles[corner::len(fan)] = self._polygons_vertices[shift::size]
+            return
+
+        nodes: list[int] = []
         size_accum: int = 0
-        for polygon in self._polygons:
-            # for each polygon (a, b, c, d ,...)
-            # we create several triangles (a, b, c), (a, c, d), ...
-            size: int = len(polygon)
+        for size in self._polygons_sizes:
             for i in range(2, size):
-                self._triangles.append((polygon[0], polygon[i - 1], polygon[i]))
-                self._triangles_to_node.append((size_accum, size_accum + i - 1, size_accum + i))
+                nodes.extend((size_accum, size_accum + i - 1, size_accum + i))
             size_accum += size
-    
+        self._triangles_to_node = array("I", nodes)
+        # vertex of each triangle corner is the vertex of the corresponding polygon node
+        self._triangles = array("I", map(self._polygons_vertices.__getitem__, self._triangles_to_node))
+
+    def _get_attribute_count(self) -> int:
+        '''Return the number of values (with several components) in each attribute layer
+        '''
+        return self._vertex_count if self._attributes_per_vertex else self._nodes_count
+
+    def _get_attribute_index(self, node_index: int) -> int:
+        '''Return the index of the attribute value for a given node
+        '''
+        return self._polygons_vertices[node_index] if self._attributes_per_vertex else node_index
+
+    def _get_node_tuples(self, layer: array, components: int) -> list[tuple[float, ...]]:
+        '''Return the list of tuples with attribute values for each polygon node
+        '''
+        if self._attributes_per_vertex:
+            return [tuple(layer[components * v:components * v + components]) for v in self._polygons_vertices]
+        layer_iter = iter(layer)
+        return list(zip(*([layer_iter] * components)))
+
+    def set_polygons(self, polygons: list[tuple[int, ...]]) -> None:
+        '''Define new polygons of the mesh
+        Node attributes are defined for polygon corners, so all of them are removed if the number of nodes is changed
+        '''
+        nodes_count: int = self._nodes_count
+        self._set_polygons([v for polygon in polygons for v in polygon], [len(polygon) for polygon in polygons])
+        if nodes_count != self._nodes_count and not self._attributes_per_vertex:
+            self._normals = []
+            self._uvs = []
+            self._colors = []
+            self._tangents = []
+
     def set_material(self, material: PBRMaterial) -> None:
         '''Define material fo the mesh component
         '''
         self._material = material
     
+    def _create_layer(self, values: Sequence[float], components: int, count: int) -> array:
+        '''Return plain array with exactly count * components values
+        If the input is shorter, then missed values are zeros
+        '''
+        size: int = components * count
+        layer: array = array("d", values[:size] if len(values) > size else values)
+        if len(layer) < size:
+            layer.frombytes(bytes(layer.itemsize * (size - len(layer))))
+        return layer
+
     def add_normals(self, normals: list[tuple[float, float, float]]) -> None:
         '''Add normals attribute to the mesh component
         '''
-        for n in range(min(len(normals), self._nodes_count)):
-            self._normals[n].append(normals[n])
-        for non_n in range(len(normals), self._nodes_count):
-            self._normals[non_n].append((0.0, 0.0, 0.0))
-        self._normals_count += 1
+        self.add_normals_buffer([c for n in normals[:self._get_attribute_count()] for c in n])
+
+    def add_normals_buffer(self, normals: Sequence[float]) -> None:
+        '''Add normals attribute to the mesh component from the plain array
+        The array should contains 3 values for each polygon node (or for each vertex, if attributes are stored per vertex)
+        '''
+        self._normals.append(self._create_layer(normals, 3, self._get_attribute_count()))
 
     def add_uvs(self, uvs: list[tuple[float, float]]) -> None:
         '''Add uvs attributes to the mesh components
         '''
-        for n in range(min(len(uvs), self._nodes_count)):
-            self._uvs[n].append(uvs[n])
-        for non_n in range(len(uvs), self._nodes_count):
-            self._uvs[non_n].append((0.0, 0.0))
-        self._uvs_count += 1
+        self.add_uvs_buffer([c for uv in uvs[:self._get_attribute_count()] for c in uv])
+
+    def add_uvs_buffer(self, uvs: Sequence[float]) -> None:
+        '''Add uvs attribute to the mesh component from the plain array
+        The array should contains 2 values for each polygon node (or for each vertex, if attributes are stored per vertex)
+        '''
+        self._uvs.append(self._create_layer(uvs, 2, self._get_attribute_count()))
 
     def add_colors(self, colors: list[tuple[float, float, float, float]]) -> None:
         '''Add vertex colors attribute to the mesh component
         '''
-        for n in range(min(len(colors), self._nodes_count)):
-            self._colors[n].append(colors[n])
-        for non_n in range(len(colors), self._nodes_count):
-            self._colors[non_n].append((0.0, 0.0, 0.0, 0.0))
-        self._colors_count += 1
+        self.add_colors_buffer([c for color in colors[:self._get_attribute_count()] for c in color])
+
+    def add_colors_buffer(self, colors: Sequence[float]) -> None:
+        '''Add vertex colors attribute to the mesh component from the plain array
+        The array should contains 4 values for each polygon node (or for each vertex, if attributes are stored per vertex)
+        '''
+        self._colors.append(self._create_layer(colors, 4, self._get_attribute_count()))
 
     def add_tangents(self, tangents: list[tuple[float, float, float, float]]) -> None:
         '''Add tangents attribute to the mesh component
         '''
-        for n in range(min(len(tangents), self._nodes_count)):
-            self._tangents[n].append(tangents[n])
-        for non_n in range(len(tangents), self._nodes_count):
-            self._tangents[non_n].append((0.0, 0.0, 0.0, 0.0))
-        self._tangent_count += 1
+        self.add_tangents_buffer([c for t in tangents[:self._get_attribute_count()] for c in t])
+
+    def add_tangents_buffer(self, tangents: Sequence[float]) -> None:
+        '''Add tangents attribute to the mesh component from the plain array
+        The array should contains 4 values for each polygon node (or for each vertex, if attributes are stored per vertex)
+        '''
+        self._tangents.append(self._create_layer(tangents, 4, self._get_attribute_count()))
 
     def add_shape(self, values: list[tuple[float, float, float]]) -> None:
         '''Add shape deform attribute to the mesh component
         This deformation define displacement of the mesh vertices
         Input array store delta vectors of the displacement
         '''
-        for v in range(min(len(values), self._vertex_count)):
-            self._shapes[v].append(values[v])
-        for non_v in range(len(values), self._vertex_count):
-            self._shapes[non_v].append((0.0, 0.0, 0.0))
-        self._shapes_count += 1
+        self.add_shape_buffer([c for v in values[:self._vertex_count] for c in v])
+
+    def add_shape_buffer(self, values: Sequence[float]) -> None:
+        '''Add shape deform attribute to the mesh component from the plain array
+        The array should contains 3 values (delta vector) for each mesh vertex
+        '''
+        self._shapes.append(self._create_layer(values, 3, self._vertex_count))
+
+    def get_shared_copy(self) -> MeshComponent:
+        '''Return the new mesh component, which shares all data arrays with this component
+        Methods of the mesh component replace arrays instead of changing them,
+        so changes of one component (new polygons or attributes, for example) do not affect other components
+        Getters return read-only views of arrays and copies of lists, so shared data also can not be changed through them
+        '''
+        mesh: MeshComponent = type(self).__new__(type(self))
+        mesh.__dict__.update(self.__dict__)
+        # lists of attribute layers are copied, so new layers are added only to one component
+        mesh._normals = list(self._normals)
+        mesh._uvs = list(self._uvs)
+        mesh._colors = list(self._colors)
+        mesh._tangents = list(self._tangents)
+        mesh._shapes = list(self._shapes)
+        return mesh
 
     def get_vertex_count(self) -> int:
         '''Return the number of vertices of the mesh
@@ -121,17 +244,49 @@ class MeshComponent:
     def get_vertices(self) -> list[tuple[float, float, float]]:
         '''Return the list with vertex positions
         '''
-        return self._vertices
+        if self._vertices is None:
+            positions_iter = iter(self._positions)
+            self._vertices = list(zip(positions_iter, positions_iter, positions_iter))
+        return list(self._vertices)
+
+    def get_vertices_buffer(self) -> memoryview:
+        '''Return read-only view of the plain array with vertex positions
+        The array contains 3 values for each vertex
+        '''
+        return memoryview(self._positions).toreadonly()
     
     def get_polygons(self) -> list[tuple[int, ...]]:
         '''Return the list with polygon indices
         '''
-        return self._polygons
+        if self._polygons is None:
+            self._polygons = []
+            size_accum: int = 0
+            for size in self._polygons_sizes:
+                self._polygons.append(tuple(self._polygons_vertices[size_accum:size_accum + size]))
+                size_accum += size
+        return list(self._polygons)
+
+    def get_polygons_buffer(self) -> memoryview:
+        '''Return read-only view of the plain array with vertex indices of all polygon nodes
+        Use polygon sizes to split it into separate polygons
+        '''
+        return memoryview(self._polygons_vertices).toreadonly()
+
+    def get_nodes_count(self) -> int:
+        '''Return the number of polygon nodes in the mesh
+        '''
+        return self._nodes_count
+
+    def is_attributes_per_vertex(self) -> bool:
+        '''Return True if normals, uvs, colors and tangents are stored for each vertex
+        and False if these attributes are stored for each polygon node
+        '''
+        return self._attributes_per_vertex
     
     def get_polygons_sizes(self) -> list[int]:
         '''Return the list with polygon sizes
         '''
-        return self._polygons_sizes
+        return list(self._polygons_sizes)
     
     def get_polygon_size(self, index: int) -> int:
         '''Return the size of the polygon with specific index
@@ -151,96 +306,257 @@ class MeshComponent:
     def get_normals_count(self) -> int:
         '''Return the number of normals attributes in the mesh component
         '''
-        return self._normals_count
+        return len(self._normals)
 
     def get_normals(self, index: int=0) -> Optional[list[tuple[float, float, float]]]:
         '''Return array with normals attributes with specific index
         Each mesh can contains several normals attributes
         '''
-        if len(self._normals[0]) > index:
-            return [v[index] for v in self._normals]
+        if index < len(self._normals):
+            return self._get_node_tuples(self._normals[index], 3)  # type: ignore
         else:
             return None
+
+    def get_normals_buffer(self, index: int=0) -> Optional[memoryview]:
+        '''Return read-only view of the plain array with normals attributes with specific index
+        The array contains 3 values for each polygon node (or for each vertex, if attributes are stored per vertex)
+        '''
+        return memoryview(self._normals[index]).toreadonly() if index < len(self._normals) else None
     
     def get_uvs_count(self) -> int:
         '''Return the number of uvs attributes in the mesh component
         '''
-        return self._uvs_count
+        return len(self._uvs)
     
     def get_uvs(self, index: int=0) -> Optional[list[tuple[float, float]]]:
         '''Return array with uvs attributes with specific index
         Each mesh can contains several uvs attributes
         '''
-        if len(self._uvs[0]) > index:
-            return [v[index] for v in self._uvs]
+        if index < len(self._uvs):
+            return self._get_node_tuples(self._uvs[index], 2)  # type: ignore
         else:
             return None
+
+    def get_uvs_buffer(self, index: int=0) -> Optional[memoryview]:
+        '''Return read-only view of the plain array with uvs attributes with specific index
+        The array contains 2 values for each polygon node (or for each vertex, if attributes are stored per vertex)
+        '''
+        return memoryview(self._uvs[index]).toreadonly() if index < len(self._uvs) else None
     
     def get_colors_count(self) -> int:
         '''Return the number of colors attributes in the mesh component
         '''
-        return self._colors_count
+        return len(self._colors)
     
     def get_colors(self, index: int=0) -> Optional[list[tuple[float, float, float, float]]]:
         '''Return array with vertex colors  attributes with specific index
         Each mesh can contains several vertex colors attributes
         '''
-        if len(self._colors[0]) > index:
-            return [v[index] for v in self._colors]
+        if index < len(self._colors):
+            return self._get_node_tuples(self._colors[index], 4)  # type: ignore
         else:
             return None
+
+    def get_colors_buffer(self, index: int=0) -> Optional[memoryview]:
+        '''Return read-only view of the plain array with vertex colors attributes with specific index
+        The array contains 4 values for each polygon node (or for each vertex, if attributes are stored per vertex)
+        '''
+        return memoryview(self._colors[index]).toreadonly() if index < len(self._colors) else None
     
     def get_tangents_count(self) -> int:
         '''Return the number of tangents attributes in the mesh component
         '''
-        return self._tangent_count
+        return len(self._tangents)
     
     def get_tangents(self, index: int=0) -> Optional[list[tuple[float, float, float, float]]]:
         '''Return array with tangents attributes with specific index
         Each mesh can contains several tangents attributes
         '''
-        if len(self._tangents[0]) > index:
-            return [v[index] for v in self._tangents]
+        if index < len(self._tangents):
+            return self._get_node_tuples(self._tangents[index], 4)  # type: ignore
         else:
             return None
+
+    def get_tangents_buffer(self, index: int=0) -> Optional[memoryview]:
+        '''Return read-only view of the plain array with tangents attributes with specific index
+        The array contains 4 values for each polygon node (or for each vertex, if attributes are stored per vertex)
+        '''
+        return memoryview(self._tangents[index]).toreadonly() if index < len(self._tangents) else None
     
     def get_shapes_count(self) -> int:
-        return self._shapes_count
+        return len(self._shapes)
+
+    def get_shape_buffer(self, index: int=0) -> Optional[memoryview]:
+        '''Return read-only view of the plain array with shape deltas with specific index
+        The array contains 3 values for each mesh vertex
+        '''
+        return memoryview(self._shapes[index]).toreadonly() if index < len(self._shapes) else None
     
+    def get_triangles_count(self) -> int:
+        '''Return the number of triangles in the mesh triangulation
+        '''
+        return len(self._get_triangles()) // 3
+
     def get_triangulation(self) -> list[tuple[int, int, int]]:
         '''Return array of 3-tuples with vertex indices for triangles
         '''
-        return self._triangles
-    
+        triangles_iter = iter(self._get_triangles())
+        return list(zip(triangles_iter, triangles_iter, triangles_iter))
+
+    def _get_triangles(self) -> array:
+        '''Return plain array with vertex indices of triangles, calculate it at the first call
+        '''
+        if self._triangles is None:
+            if self._is_triangles():
+                # polygons are already triangles, so use polygon nodes as is
+                self._triangles = self._polygons_vertices
+            else:
+                self._triangulate()
+        return self._triangles  # type: ignore
+
+    def get_triangulation_buffer(self) -> memoryview:
+        '''Return read-only view of the plain array with vertex indices of triangles
+        Each triangle is defined by three values
+        '''
+        return memoryview(self._get_triangles()).toreadonly()
+
+    def _get_triangles_to_node(self) -> array:
+        '''Return plain array with node indices of triangles, calculate it at the first call
+        '''
+        if self._triangles_to_node is None:
+            self._triangulate()
+        return self._triangles_to_node  # type: ignore
+
     def get_triangle_nodes(self, index: int) -> tuple[int, int, int]:
         '''Return node indices for a given triangle (with input index)
         '''
-        return self._triangles_to_node[index]
+        triangles_nodes: array = self._get_triangles_to_node()
+        return (triangles_nodes[3 * index], triangles_nodes[3 * index + 1], triangles_nodes[3 * index + 2])
+
+    def get_triangle_nodes_buffer(self) -> memoryview:
+        '''Return read-only view of the plain array with node indices of triangles
+        Each triangle is defined by three values
+        '''
+        return memoryview(self._get_triangles_to_node()).toreadonly()
     
     def get_node_normals(self, node_index: int) -> list[tuple[float, float, float]]:
         '''Return all normals for a given node
         '''
-        return self._normals[node_index]
+        index: int = self._get_attribute_index(node_index)
+        return [(layer[3 * index], layer[3 * index + 1], layer[3 * index + 2]) for layer in self._normals]
     
     def get_node_uvs(self, node_index: int) -> list[tuple[float, float]]:
         '''Return all uvs for a given node
         '''
-        return self._uvs[node_index]
+        index: int = self._get_attribute_index(node_index)
+        return [(layer[2 * index], layer[2 * index + 1]) for layer in self._uvs]
     
     def get_node_colors(self, node_index: int) -> list[tuple[float, float, float, float]]:
         '''Return all colors for a given node
         '''
-        return self._colors[node_index]
+        index: int = self._get_attribute_index(node_index)
+        return [(layer[4 * index], layer[4 * index + 1], layer[4 * index + 2], layer[4 * index + 3]) for layer in self._colors]
     
     def get_node_tangents(self, node_index: int) -> list[tuple[float, float, float, float]]:
         '''Return all tangents for a given node
         '''
-        return self._tangents[node_index]
+        index: int = self._get_attribute_index(node_index)
+        return [(layer[4 * index], layer[4 * index + 1], layer[4 * index + 2], layer[4 * index + 3]) for layer in self._tangents]
     
     def get_vertex_shapes(self, index: int) -> list[tuple[float, float, float]]:
         '''Return array with shape deform deltas for a given vertex
         '''
-        return self._shapes[index]
+        return [(layer[3 * index], layer[3 * index + 1], layer[3 * index + 2]) for layer in self._shapes]
     
     def __str__(self) -> str:
         return f"Mesh {self._vertex_count} vertices, {self._polygons_count} polygons, material {self._material}"
+
+class LazyMeshComponent(MeshComponent):
+    '''Mesh component, which data is loaded at the first request
+    It's used to defer decoding of big meshes until they are actually needed
+    If the loader returns None (for example, all triangles of the glTF primitive are degenerate),
+    then the mesh becomes empty after loading
+    '''
+    def __init__(self, loader: Callable[[], Optional[MeshComponent]]) -> None:
+        '''Create mesh component without data
+
+        Parameters:
+            loader - function, which returns the mesh component with actual data
+                if it returns None, then the mesh is empty
+        '''
+        # fields of the mesh are not created here, they are copied from the loaded mesh
+        self._loader: Optional[Callable[[], Optional[MeshComponent]]] = loader
+
+    def _load(self) -> None:
+        '''Load the data and copy fields of the loaded mesh into this component
+        The material, assigned before loading, is not changed
+        '''
+        loader: Optional[Callable[[], Optional[MeshComponent]]] = self.__dict__.get("_loader")
+        if loader is None:
+            return None
+        mesh: Optional[MeshComponent] = loader()
+        self.__dict__["_loader"] = None
+        if mesh is None:
+            mesh = MeshComponent([], [])
+        for key, value in mesh.__dict__.items():
+            if key not in self.__dict__:
+                self.__dict__[key] = value
+
+    def __getattr__(self, name: str) -> Any:
+        # called only for fields, which are not defined yet, so it's time to load the data
+        if self.__dict__.get("_loader") is None or name.startswith("__"):
+            raise AttributeError(name)
+        self._load()
+        return getattr(self, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # the material can be assigned without loading
+        # but all other fields are written only after loading, so the loaded data does not override them
+        if name != "_loader" and name != "_material":
+            self._load()
+        super().__setattr__(name, value)
+
+    def __getstate__(self) -> dict[str, Any]:
+        # the loader can not be pickled, so load the data before passing the mesh to other process
+        self._load()
+        return self.__dict__
+
+    def get_shared_copy(self) -> MeshComponent:
+        '''Return the new mesh component, which shares all data arrays with this component
+        If the data is not loaded yet, then the copy is also lazy, and the data is loaded only once for all copies
+        '''
+        if self.is_loaded():
+            return super().get_shared_copy()
+        mesh: LazyMeshComponent = LazyMeshComponent(self._get_loaded_copy)
+        if "_material" in self.__dict__:
+            mesh.set_material(self._material)
+        return mesh
+
+    def _get_loaded_copy(self) -> MeshComponent:
+        '''Load the data and return the copy of the component
+        It's used as the loader for lazy copies
+        '''
+        self._load()
+        return super().get_shared_copy()
+
+    def is_loaded(self) -> bool:
+        '''Return True if the data of the mesh is already loaded
+        '''
+        return self._loader is None
+
+def create_mesh_from_buffers(positions: Sequence[float],
+                             polygons_vertices: Sequence[int],
+                             polygons_sizes: Optional[list[int]]=None,
+                             attributes_per_vertex: bool=False) -> MeshComponent:
+    '''Create mesh component from plain arrays
+
+    Parameters:
+        positions - plain array with 3 coordinates for each vertex
+        polygons_vertices - plain array with vertex indices of all polygon nodes
+        polygons_sizes - the list with polygon sizes, if it's None, then all polygons are triangles
+        attributes_per_vertex - define how normals, uvs, colors and tangents are stored in the mesh
+    '''
+    mesh: MeshComponent = MeshComponent([], [], attributes_per_vertex)
+    mesh._set_positions(positions)
+    mesh._set_polygons(polygons_vertices, polygons_sizes if polygons_sizes is not None else [3] * (len(polygons_vertices) // 3))
+    return mesh
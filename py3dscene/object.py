@@ -1,29 +1,32 @@
 from __future__ import annotations  # remove for Python 3.11
 from typing import Optional
+from typing import TYPE_CHECKING
 from py3dscene.transform import Transform
 from py3dscene.transform import get_identity
-from py3dscene.transform import tfm_to_translation
-from py3dscene.transform import tfm_to_rotation
-from py3dscene.transform import tfm_to_scale
+from py3dscene.transform import tfm_to_srt
 from py3dscene.transform import get_srt_matrix
-from py3dscene.transform import get_scale_matrix
 from py3dscene.transform import multiply
+from py3dscene.transform import buffer_to_transforms
+from py3dscene.transform_batch import srt_to_transforms_buffer
 from py3dscene.camera import CameraComponent
 from py3dscene.light import LightComponent
 from py3dscene.mesh import MeshComponent
 from py3dscene.animation import Animation
+if TYPE_CHECKING:
+    from py3dscene.scene import Scene
 
 class Object:
     '''Class for store object inside a 3d-scene
     '''
     id_pointer: int = 0
 
-    def __init__(self, name: str="", id: Optional[int]=None) -> None:
+    def __init__(self, name: str="", id: Optional[int]=None, scene: Optional[Scene]=None) -> None:
         '''Create object. It does not recommended to create objects manually, instead it's better to use the scene object method
 
         Parameters:
             name - the name of the objects
             id - preferred id of the object
+            scene - the scene, which contains the object
         '''
         self._name: str = name if len(name) > 0 else "unnamed"
         self._children: list[Object] = []
@@ -33,13 +36,22 @@ class Object:
             Object.id_pointer += 1
         else:
             self._id = id
+        # the scene, which contains the object
+        # it's defined only for objects, created by scene methods, and used for updating scene indexes
+        self._scene: Optional[Scene] = scene
+        # parent object, None for root objects
+        self._parent: Optional[Object] = None
         # for each object store transform as matrix
-        self._transform: Transform = get_identity()
+        # it's None if translation, rotation or scale are changed and the matrix should be composed again
+        self._transform: Optional[Transform] = get_identity()
         # and also as separate translation, rotation quaternion and scale
         self._translation: tuple[float, float, float] = (0.0, 0.0, 0.0)
         # quaternion stored in format (x, y, z, w) = w + i * x + j * y + k * z
         self._rotation: tuple[float, float, float, float] = (0.0, 0.0, 0.0, 1.0)
         self._scale: tuple[float, float, float] = (1.0, 1.0, 1.0)
+        # cached world transform, None if it should be recalculated
+        # if the cache is None, then caches of all children are also None
+        self._world_transform: Optional[Transform] = None
 
         # each object can store several components
         self._camera: Optional[CameraComponent] = None
@@ -58,8 +70,11 @@ class Object:
         If id is not defines, then use the global counter
         It's does not recommended to mix custom and automatic ids: use either only custom id's for all object all automatic ones
         '''
-        new_object: Object = Object(name, id)
+        new_object: Object = Object(name, id, self._scene)
+        new_object._parent = self
         self._children.append(new_object)
+        if self._scene is not None:
+            self._scene._add_object_to_index(new_object)
         return new_object
     
     def set_local_tfm(self, tfm: Transform) -> None:
@@ -67,31 +82,53 @@ class Object:
         '''
         self._transform = tfm
         # also extract translation, rotation and scale from this matrix
-        self._translation = tfm_to_translation(tfm)
-        self._scale = tfm_to_scale(tfm)
-        # for rotation we should previously rescale transform 
-        inv_scale_tfm = get_scale_matrix(1.0 / self._scale[0], 1.0 / self._scale[1], 1.0 / self._scale[2])
-        rescale_tfm = multiply(tfm, inv_scale_tfm)
-        # extract rotation from scaled matrix
-        self._rotation = tfm_to_rotation(rescale_tfm)
+        self._translation, self._rotation, self._scale = tfm_to_srt(tfm)
+        self._invalidate_world_transform()
     
     def set_local_translation(self, x: float, y: float, z: float) -> None:
         '''Define position of the object
         '''
         self._translation = (x, y, z)
-        self._transform = get_srt_matrix(self._translation, self._rotation, self._scale)
+        self._transform = None
+        self._invalidate_world_transform()
 
     def set_local_rotation(self, x: float, y: float, z: float, w: float) -> None:
         '''Define rotation of the object
         '''
         self._rotation = (x, y, z, w)
-        self._transform = get_srt_matrix(self._translation, self._rotation, self._scale)
+        self._transform = None
+        self._invalidate_world_transform()
 
     def set_local_scale(self, x: float, y: float, z: float) -> None:
         '''Define scale of the object
         '''
         self._scale = (x, y, z)
-        self._transform = get_srt_matrix(self._translation, self._rotation, self._scale)
+        self._transform = None
+        self._invalidate_world_transform()
+
+    def set_local_srt(self,
+                      translation: tuple[float, float, float],
+                      rotation: tuple[float, float, float, float],
+                      scale: tuple[float, float, float]) -> None:
+        '''Define position, rotation and scale of the object at once
+        Transformation matrix is composed only when it's requested
+        '''
+        self._translation = translation
+        self._rotation = rotation
+        self._scale = scale
+        self._transform = None
+        self._invalidate_world_transform()
+
+    def _invalidate_world_transform(self) -> None:
+        '''Clear cached world transforms of the object and all its children
+        Children of the object without cache also have no cache, so such subtrees are skipped
+        '''
+        stack: list[Object] = [self]
+        while len(stack) > 0:
+            obj: Object = stack.pop()
+            if obj._world_transform is not None:
+                obj._world_transform = None
+                stack.extend(obj._children)
     
     def set_camera_component(self, camera: CameraComponent) -> None:
         '''Add camera component to the object
@@ -137,8 +174,42 @@ class Object:
     def get_transform(self) -> Transform:
         '''Return transformation matrix of the object
         '''
+        if self._transform is None:
+            self._transform = get_srt_matrix(self._translation, self._rotation, self._scale)
         return self._transform
 
+    def get_world_transform(self) -> Transform:
+        '''Return transformation matrix of the object in the world space
+        The matrix is cached and recalculated only after changes of local transforms of the object or its parents
+        '''
+        if self._world_transform is not None:
+            return self._world_transform
+        # collect all parents without cache, from the object to the root
+        chain: list[Object] = []
+        obj: Optional[Object] = self
+        while obj is not None and obj._world_transform is None:
+            chain.append(obj)
+            obj = obj._parent
+        # and calculate world transforms from the top to the object
+        for obj in reversed(chain):
+            parent: Optional[Object] = obj._parent
+            obj._world_transform = obj.get_transform() if parent is None else multiply(parent._world_transform, obj.get_transform())  # type: ignore
+        return self._world_transform  # type: ignore
+
+    @staticmethod
+    def _compose_transforms(objects: list[Object]) -> None:
+        '''Compose changed local matrices of several objects at once
+        It's used by the scene before calculation of world transforms for many objects
+        '''
+        changed: list[Object] = [obj for obj in objects if obj._transform is None]
+        if len(changed) == 0:
+            return None
+        tfms: list[Transform] = buffer_to_transforms(srt_to_transforms_buffer([v for obj in changed for v in obj._translation],
+                                                                             [v for obj in changed for v in obj._rotation],
+                                                                             [v for obj in changed for v in obj._scale]))
+        for obj, tfm in zip(changed, tfms):
+            obj._transform = tfm
+
     def get_translation(self) -> tuple[float, float, float]:
         '''Return translation of the object
         '''
@@ -230,6 +301,12 @@ class Object:
                 return v
         return None
     
+    def get_parent(self) -> Optional[Object]:
+        '''Return parent object
+        For objects in the root level of the scene return None
+        '''
+        return self._parent
+
     def get_subobjects_count(self) -> int:
         return len(self._children)
     
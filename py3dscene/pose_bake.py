@@ -0,0 +1,156 @@
+from array import array
+from typing import Optional
+from typing import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from py3dscene.object import Object
+from py3dscene.animation import Animation
+from py3dscene.transform import transforms_to_buffer
+from py3dscene.transform_batch import multiply_buffers
+from py3dscene.transform_batch import srt_to_transforms_buffer
+
+'''Functions for baking world transforms of animated objects at many frames
+At first the scene hierarchy is converted to the rig: the plain list of objects, required for baking
+Then the rig is evaluated for all frames at once, so it can be also evaluated in other processes
+'''
+
+# description of one object in the rig:
+#   - index of the parent item in the rig, -1 if the transform of the item is already in the world space
+#   - static transform of the object as plain array with 16 values
+#   - translation, rotation and scale of the object, used for channels without animation
+#   - translation, rotation and scale animations (or None)
+#   - True if world transforms of the object should be returned
+RigItem = tuple[int,
+                array,
+                tuple[float, float, float],
+                tuple[float, float, float, float],
+                tuple[float, float, float],
+                Optional[Animation],
+                Optional[Animation],
+                Optional[Animation],
+                bool]
+
+def is_animated(object: Object) -> bool:
+    '''Return True if the object contains at least one non-empty animation
+    '''
+    for anim in (object.get_translation_animation(), object.get_rotation_animation(), object.get_scale_animation()):
+        if anim is not None and anim.get_keyframes_count() > 0:
+            return True
+    return False
+
+def build_rig(roots: list[Object]) -> tuple[list[int], list[RigItem]]:
+    '''Collect objects, which world transforms depend on animations, and all their parents
+    Return ids of objects with baked transforms and the rig
+    Baked transforms are returned for animated objects and all children of animated objects
+    '''
+    # all objects in the order from parents to children
+    objects: list[Object] = []
+    parents: list[int] = []
+    stack: list[tuple[Object, int]] = [(obj, -1) for obj in reversed(roots)]
+    while len(stack) > 0:
+        obj, parent = stack.pop()
+        index: int = len(objects)
+        objects.append(obj)
+        parents.append(parent)
+        stack.extend((child, index) for child in reversed(obj.get_children()))
+
+    animated: list[bool] = [is_animated(obj) for obj in objects]
+    # object is moving if it or one of its parents is animated
+    moving: list[bool] = list(animated)
+    for i in range(len(objects)):
+        if parents[i] != -1 and moving[parents[i]]:
+            moving[i] = True
+    # object is required if it's moving or it's a parent of the moving object
+    required: list[bool] = list(moving)
+    for i in reversed(range(len(objects))):
+        if required[i] and parents[i] != -1:
+            required[parents[i]] = True
+
+    ids: list[int] = []
+    rig: list[RigItem] = []
+    rig_indices: dict[int, int] = {}
+    for i, obj in enumerate(objects):
+        if not required[i]:
+            continue
+        rig_indices[i] = len(rig)
+        if moving[i]:
+            parent: int = rig_indices[parents[i]] if parents[i] != -1 else -1
+            tfm: array = transforms_to_buffer([obj.get_transform()])
+            ids.append(obj.get_id())
+        else:
+            # all parents are static, so use cached world transform
+            parent = -1
+            tfm = transforms_to_buffer([obj.get_world_transform()])
+        rig.append((parent,
+                    tfm,
+                    obj.get_translation(),
+                    obj.get_rotation(),
+                    obj.get_scale(),
+                    obj.get_translation_animation(),
+                    obj.get_rotation_animation(),
+                    obj.get_scale_animation(),
+                    moving[i]))
+    return ids, rig
+
+def evaluate_channel(animation: Optional[Animation], value: Sequence[float], frames: Sequence[float], fps: float) -> array:
+    '''Return plain array with values of the animation channel at given frames
+    If there are no animation, then the value is repeated for each frame
+    '''
+    if animation is not None and animation.get_keyframes_count() > 0:
+        return animation.evaluate(frames, fps)
+    return array("d", value) * len(frames)
+
+def bake_rig(rig: list[RigItem], frames: Sequence[float], fps: float) -> array:
+    '''Calculate world transforms of rig objects at given frames
+    Return plain array with 16 * len(frames) values for each returned object of the rig
+    Transforms of one object are stored one after another in the order of frames
+    '''
+    frames_count: int = len(frames)
+    # world transforms of each item, static items contains only 16 values
+    worlds: list[array] = []
+    output: array = array("d")
+    for parent, tfm, translation, rotation, scale, t_anim, r_anim, s_anim, is_output in rig:
+        world: array = tfm
+        if any(anim is not None and anim.get_keyframes_count() > 0 for anim in (t_anim, r_anim, s_anim)):
+            world = srt_to_transforms_buffer(evaluate_channel(t_anim, translation, frames, fps),
+                                             evaluate_channel(r_anim, rotation, frames, fps),
+                                             evaluate_channel(s_anim, scale, frames, fps))
+        if parent != -1:
+            parent_world: array = worlds[parent]
+            if len(parent_world) == 16 and len(world) == 16:
+                world = multiply_buffers(parent_world, world)
+            else:
+                world = multiply_buffers(parent_world if len(parent_world) > 16 else parent_world * frames_count,
+                                         world if len(world) > 16 else world * frames_count)
+        worlds.append(world)
+        if is_output:
+            output.extend(world if len(world) > 16 else world * frames_count)
+    return output
+
+def bake_poses(roots: list[Object], frames: Sequence[float], fps: float, workers: int) -> tuple[list[int], array]:
+    '''Calculate world transforms of moving objects at given frames
+    If workers > 1, then frames are split into parts and each part is calculated in a separate process
+    If processes can not be started, then all frames are calculated in the current process
+    '''
+    ids, rig = build_rig(roots)
+    frames = array("d", frames)
+    if len(ids) == 0:
+        return ids, array("d")
+    if workers > 1 and len(frames) > 1:
+        # split frames into several parts for each process
+        parts_count: int = min(len(frames), 4 * workers)
+        bounds: list[int] = [len(frames) * i // parts_count for i in range(parts_count + 1)]
+        parts: list[array] = [frames[bounds[i]:bounds[i + 1]] for i in range(parts_count)]
+        try:
+            with ProcessPoolExecutor(max_workers=min(workers, parts_count)) as executor:
+                baked_parts: list[array] = list(executor.map(bake_rig, [rig] * parts_count, parts, [fps] * parts_count))
+        except (OSError, BrokenProcessPool):
+            return ids, bake_rig(rig, frames, fps)
+        # each part contains transforms for all objects, so combine parts for each object
+        output: array = array("d")
+        for i in range(len(ids)):
+            for part, baked in zip(parts, baked_parts):
+                size: int = 16 * len(part)
+                output.extend(baked[i * size:(i + 1) * size])
+        return ids, output
+    return ids, bake_rig(rig, frames, fps)
@@ -1,6 +1,10 @@
+from array import array
 from typing import Optional
+from typing import Sequence
 from py3dscene.material import PBRMaterial
 from py3dscene.object import Object
+from py3dscene.transform import Transform
+from py3dscene.pose_bake import bake_poses
 
 class Scene:
     '''Main class for store 3d-scene data
@@ -10,6 +14,20 @@ class Scene:
         '''
         self._materials: list[PBRMaterial] = []
         self._objects: list[Object] = []
+        # indexes for fast search of objects and materials
+        # key - id, value - object (or material)
+        self._objects_map: dict[int, Object] = {}
+        self._materials_map: dict[int, PBRMaterial] = {}
+        # key - name, value - the list of all objects with this name
+        self._names_map: dict[str, list[Object]] = {}
+
+    def _add_object_to_index(self, object: Object) -> None:
+        '''Add object to scene indexes
+        It's called every time when the new object is created in the scene
+        '''
+        # if several objects have the same id, then return the first of them
+        self._objects_map.setdefault(object.get_id(), object)
+        self._names_map.setdefault(object.get_name(), []).append(object)
 
     def create_material(self, name: str="", id: Optional[int]=None) -> PBRMaterial:
         '''Create and return material
@@ -18,6 +36,7 @@ class Scene:
         '''
         material: PBRMaterial = PBRMaterial(name, id)
         self._materials.append(material)
+        self._materials_map.setdefault(material.get_id(), material)
         return material
 
     def get_all_materials(self) -> list[PBRMaterial]:
@@ -25,29 +44,85 @@ class Scene:
         '''
         return self._materials
     
-    def get_material(self, id: int) -> PBRMaterial:
+    def get_material(self, id: int) -> Optional[PBRMaterial]:
         '''Return material with a given id
+        If there are no such material return None
         '''
-        return self._materials[id]
+        return self._materials_map.get(id)
     
     def create_object(self, name: str="", id: Optional[int]=None) -> Object:
         '''Create and return new object. This object parented to the root of the scene
         It's possible to define the custom id for the new object
         '''
-        new_object = Object(name, id)
+        new_object = Object(name, id, self)
         self._objects.append(new_object)
+        self._add_object_to_index(new_object)
         return new_object
     
     def get_object_by_id(self, id: int) -> Optional[Object]:
         '''Return object with a given id
         If there are no such object return None
         '''
-        for obj in self._objects:
-            v: Optional[Object] = obj.get_object_by_id(id)
-            if v:
-                return v
-        return None
+        return self._objects_map.get(id)
+
+    def get_objects_by_name(self, name: str) -> list[Object]:
+        '''Return the list with all objects with a given name
+        If there are no such objects return empty list
+        '''
+        return list(self._names_map.get(name, []))
     
+    def get_world_transforms(self) -> dict[int, Transform]:
+        '''Calculate world transforms of all objects in the scene by one pass from the roots to leafs
+        Return the dictionary with key = object id, value = world transform matrix
+        Calculated matrices are also cached in objects
+        '''
+        # collect all objects, parents are always before children in the list
+        objects: list[Object] = []
+        stack: list[Object] = list(reversed(self._objects))
+        while len(stack) > 0:
+            obj: Object = stack.pop()
+            objects.append(obj)
+            stack.extend(reversed(obj.get_children()))
+        # compose all changed local matrices at once
+        Object._compose_transforms(objects)
+
+        # next calculate world matrices, the parent of each object is already calculated
+        world_transforms: dict[int, Transform] = {}
+        for obj in objects:
+            world_transforms.setdefault(obj.get_id(), obj.get_world_transform())
+        return world_transforms
+
+    def set_local_transforms(self, ids: Sequence[int], srt: Sequence[float]) -> None:
+        '''Define local transforms of several objects at once
+        Parameters:
+            ids - ids of objects
+            srt - plain array with 10 values for each object: translation (3 values), rotation quaternion (4 values) and scale (3 values)
+        Objects with unknown ids are skipped
+        Transformation matrices are composed only when they are requested
+        Raise ValueError if the number of values does not correspond to the number of ids, no objects are changed in this case
+        '''
+        if len(srt) != 10 * len(ids):
+            raise ValueError(f"Expected {10 * len(ids)} values for {len(ids)} objects, but got {len(srt)}")
+        for i, id in enumerate(ids):
+            obj: Optional[Object] = self._objects_map.get(id)
+            if obj is not None:
+                shift: int = 10 * i
+                obj.set_local_srt((srt[shift], srt[shift + 1], srt[shift + 2]),
+                                  (srt[shift + 3], srt[shift + 4], srt[shift + 5], srt[shift + 6]),
+                                  (srt[shift + 7], srt[shift + 8], srt[shift + 9]))
+
+    def bake_poses(self, frames: Sequence[float], fps: float=30.0, workers: int=1) -> tuple[list[int], array]:
+        '''Calculate world transforms of all moving objects at given frames
+        Moving objects are animated objects and all their children
+        Return the list with ids of moving objects and plain array with transforms
+        The array contains 16 * len(frames) values for each object from the list: matrices of the object for each frame
+        Parameters:
+            frames - frames, where animations are evaluated
+            fps - the number of frames per second, used for cubic animation curves
+            workers - the number of processes for calculation, use it for very long ranges of frames
+        '''
+        return bake_poses(self._objects, frames, fps, workers)
+
     def get_objects_count(self) -> int:
         '''Return the number of objects in the root level of the scene
         '''
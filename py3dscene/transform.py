@@ -1,4 +1,6 @@
 import math
+from array import array
+from typing import Sequence
 
 Transform = tuple[tuple[float, float, float, float], tuple[float, float, float, float], tuple[float, float, float, float], tuple[float, float, float, float]]
 
@@ -12,6 +14,20 @@ In this form transformed coordinates of the point (x, y, z) can be found:
 Coordinates are columns
 '''
 
+def transforms_to_buffer(tfms: Sequence[Transform]) -> array:
+    '''Convert the list of transforms into plain array with 16 values for each matrix
+    This array can be used in functions from py3dscene.transform_batch
+    '''
+    return array("d", [v for tfm in tfms for row in tfm for v in row])
+
+def buffer_to_transforms(buffer: Sequence[float]) -> list[Transform]:
+    '''Convert plain array with 16 values for each matrix into the list of transforms
+    '''
+    return [((buffer[i], buffer[i + 1], buffer[i + 2], buffer[i + 3]),
+             (buffer[i + 4], buffer[i + 5], buffer[i + 6], buffer[i + 7]),
+             (buffer[i + 8], buffer[i + 9], buffer[i + 10], buffer[i + 11]),
+             (buffer[i + 12], buffer[i + 13], buffer[i + 14], buffer[i + 15])) for i in range(0, 16 * (len(buffer) // 16), 16)]
+
 def length(x: float, y: float, z: float) -> float:
     '''Return the length of the vector (x, y, z)
     '''
@@ -59,26 +75,36 @@ def get_srt_matrix(translation: tuple[float, float, float],
     '''Return matrix for the transformation with given translation, rotation and scale
     Calculate it in the order T * R * S (from right to left)
     '''
-    translation_tfm: Transform = get_translation_matrix(*translation)
-    rotation_tfm: Transform = get_rotation_matrix(*rotation)
-    scale_tfm: Transform = get_scale_matrix(*scale)
-    return multiply(translation_tfm, multiply(rotation_tfm, scale_tfm))
+    tx, ty, tz = translation
+    x, y, z, w = rotation
+    sx, sy, sz = scale
+    # the product is calculated directly: columns of the rotation matrix multiplied by the scale
+    return (((-1.0 + 2.0 * (w**2 + x**2)) * sx, 2.0 * (x * y - w * z) * sy, 2.0 * (x * z + w * y) * sz, tx),
+            (2.0 * (x * y + w * z) * sx, (-1.0 + 2.0 * (w**2 + y**2)) * sy, 2.0 * (y * z - w * x) * sz, ty),
+            (2.0 * (x * z - w * y) * sx, 2.0 * (y * z + w * x) * sy, (-1.0 + 2.0 * (w**2 + z**2)) * sz, tz),
+            (0.0, 0.0, 0.0, 1.0))
 
 def multiply(a: Transform, b: Transform) -> Transform:
     '''Return A * B
     '''
-    result = [[0.0, 0.0, 0.0, 0.0],
-              [0.0, 0.0, 0.0, 0.0],
-              [0.0, 0.0, 0.0, 0.0],
-              [0.0, 0.0, 0.0, 0.0]]
-    for i in range(4):
-        for j in range(4):
-            for s in range(4):
-                result[i][j] += a[i][s] * b[s][j]
-    return ((result[0][0], result[0][1], result[0][2], result[0][3]),
-            (result[1][0], result[1][1], result[1][2], result[1][3]),
-            (result[2][0], result[2][1], result[2][2], result[2][3]),
-            (result[3][0], result[3][1], result[3][2], result[3][3]))
+    (a00, a01, a02, a03), (a10, a11, a12, a13), (a20, a21, a22, a23), (a30, a31, a32, a33) = a
+    (b00, b01, b02, b03), (b10, b11, b12, b13), (b20, b21, b22, b23), (b30, b31, b32, b33) = b
+    return ((a00 * b00 + a01 * b10 + a02 * b20 + a03 * b30,
+             a00 * b01 + a01 * b11 + a02 * b21 + a03 * b31,
+             a00 * b02 + a01 * b12 + a02 * b22 + a03 * b32,
+             a00 * b03 + a01 * b13 + a02 * b23 + a03 * b33),
+            (a10 * b00 + a11 * b10 + a12 * b20 + a13 * b30,
+             a10 * b01 + a11 * b11 + a12 * b21 + a13 * b31,
+             a10 * b02 + a11 * b12 + a12 * b22 + a13 * b32,
+             a10 * b03 + a11 * b13 + a12 * b23 + a13 * b33),
+            (a20 * b00 + a21 * b10 + a22 * b20 + a23 * b30,
+             a20 * b01 + a21 * b11 + a22 * b21 + a23 * b31,
+             a20 * b02 + a21 * b12 + a22 * b22 + a23 * b32,
+             a20 * b03 + a21 * b13 + a22 * b23 + a23 * b33),
+            (a30 * b00 + a31 * b10 + a32 * b20 + a33 * b30,
+             a30 * b01 + a31 * b11 + a32 * b21 + a33 * b31,
+             a30 * b02 + a31 * b12 + a32 * b22 + a33 * b32,
+             a30 * b03 + a31 * b13 + a32 * b23 + a33 * b33))
 
 def tfm_to_translation(tfm: Transform) -> tuple[float, float, float]:
     '''Extract translation from transform matrix
@@ -108,3 +134,18 @@ def tfm_to_scale(tfm: Transform) -> tuple[float, float, float]:
     return (length(tfm[0][0], tfm[1][0], tfm[2][0]),
             length(tfm[0][1], tfm[1][1], tfm[2][1]),
             length(tfm[0][2], tfm[1][2], tfm[2][2]))
+
+def tfm_to_srt(tfm: Transform) -> tuple[tuple[float, float, float], tuple[float, float, float, float], tuple[float, float, float]]:
+    '''Extract translation, rotation quaternion and scale from transform matrix
+    Rotation is extracted from the matrix without scale
+    '''
+    scale: tuple[float, float, float] = tfm_to_scale(tfm)
+    # for rotation we should previously rescale transform
+    ix: float = 1.0 / scale[0]
+    iy: float = 1.0 / scale[1]
+    iz: float = 1.0 / scale[2]
+    rescale_tfm: Transform = ((tfm[0][0] * ix, tfm[0][1] * iy, tfm[0][2] * iz, tfm[0][3]),
+                              (tfm[1][0] * ix, tfm[1][1] * iy, tfm[1][2] * iz, tfm[1][3]),
+                              (tfm[2][0] * ix, tfm[2][1] * iy, tfm[2][2] * iz, tfm[2][3]),
+                              (0.0, 0.0, 0.0, 1.0))
+    return (tfm_to_translation(tfm), tfm_to_rotation(rescale_tfm), scale)
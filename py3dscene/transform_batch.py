@@ -0,0 +1,117 @@
+import math
+from array import array
+from typing import Sequence
+
+'''Functions for processing several transforms at once
+All data is stored in plain arrays of doubles:
+    - transform matrix is 16 values, rows of the matrix one after another (the same order as in the tuple form)
+    - translation and scale are 3 values
+    - rotation quaternion is 4 values in the format (x, y, z, w)
+So, the stack of N transforms is the array with 16 * N values
+
+For one transform results are the same as of tuple functions from py3dscene.transform
+these functions have own scalar implementations, because calls of batch functions for one matrix are slow
+'''
+
+def multiply_buffers(a: Sequence[float], b: Sequence[float]) -> array:
+    '''Return the array with products A_i * B_i for each pair of matrices from two stacks
+    '''
+    output: array = array("d")
+    for shift in range(0, 16 * (min(len(a), len(b)) // 16), 16):
+        a00, a01, a02, a03, a10, a11, a12, a13, a20, a21, a22, a23, a30, a31, a32, a33 = a[shift:shift + 16]
+        b00, b01, b02, b03, b10, b11, b12, b13, b20, b21, b22, b23, b30, b31, b32, b33 = b[shift:shift + 16]
+        output.extend((a00 * b00 + a01 * b10 + a02 * b20 + a03 * b30,
+                       a00 * b01 + a01 * b11 + a02 * b21 + a03 * b31,
+                       a00 * b02 + a01 * b12 + a02 * b22 + a03 * b32,
+                       a00 * b03 + a01 * b13 + a02 * b23 + a03 * b33,
+                       a10 * b00 + a11 * b10 + a12 * b20 + a13 * b30,
+                       a10 * b01 + a11 * b11 + a12 * b21 + a13 * b31,
+                       a10 * b02 + a11 * b12 + a12 * b22 + a13 * b32,
+                       a10 * b03 + a11 * b13 + a12 * b23 + a13 * b33,
+                       a20 * b00 + a21 * b10 + a22 * b20 + a23 * b30,
+                       a20 * b01 + a21 * b11 + a22 * b21 + a23 * b31,
+                       a20 * b02 + a21 * b12 + a22 * b22 + a23 * b32,
+                       a20 * b03 + a21 * b13 + a22 * b23 + a23 * b33,
+                       a30 * b00 + a31 * b10 + a32 * b20 + a33 * b30,
+                       a30 * b01 + a31 * b11 + a32 * b21 + a33 * b31,
+                       a30 * b02 + a31 * b12 + a32 * b22 + a33 * b32,
+                       a30 * b03 + a31 * b13 + a32 * b23 + a33 * b33))
+    return output
+
+def quaternions_to_transforms_buffer(rotations: Sequence[float]) -> array:
+    '''Return the stack of rotation matrices for the array of quaternions
+    '''
+    output: array = array("d")
+    for i in range(len(rotations) // 4):
+        x, y, z, w = rotations[4 * i:4 * i + 4]
+        output.extend((-1.0 + 2.0 * (w**2 + x**2), 2.0 * (x * y - w * z), 2.0 * (x * z + w * y), 0.0,
+                       2.0 * (x * y + w * z), -1.0 + 2.0 * (w**2 + y**2), 2.0 * (y * z - w * x), 0.0,
+                       2.0 * (x * z - w * y), 2.0 * (y * z + w * x), -1.0 + 2.0 * (w**2 + z**2), 0.0,
+                       0.0, 0.0, 0.0, 1.0))
+    return output
+
+def srt_to_transforms_buffer(translations: Sequence[float],
+                             rotations: Sequence[float],
+                             scales: Sequence[float]) -> array:
+    '''Return the stack of matrices T * R * S for arrays of translations, rotations and scales
+    The product is calculated directly, without multiplication of matrices
+    '''
+    count: int = min(len(translations) // 3, len(rotations) // 4, len(scales) // 3)
+    output: array = array("d")
+    for i in range(count):
+        tx, ty, tz = translations[3 * i:3 * i + 3]
+        x, y, z, w = rotations[4 * i:4 * i + 4]
+        sx, sy, sz = scales[3 * i:3 * i + 3]
+        # columns of the rotation matrix multiplied by the scale
+        output.extend(((-1.0 + 2.0 * (w**2 + x**2)) * sx, 2.0 * (x * y - w * z) * sy, 2.0 * (x * z + w * y) * sz, tx,
+                       2.0 * (x * y + w * z) * sx, (-1.0 + 2.0 * (w**2 + y**2)) * sy, 2.0 * (y * z - w * x) * sz, ty,
+                       2.0 * (x * z - w * y) * sx, 2.0 * (y * z + w * x) * sy, (-1.0 + 2.0 * (w**2 + z**2)) * sz, tz,
+                       0.0, 0.0, 0.0, 1.0))
+    return output
+
+def transforms_to_quaternions_buffer(tfms: Sequence[float]) -> array:
+    '''Return the array of quaternions for the stack of rotation matrices
+    '''
+    output: array = array("d")
+    for i in range(len(tfms) // 16):
+        m00, m01, m02, _, m10, m11, m12, _, m20, m21, m22, _ = tfms[16 * i:16 * i + 12]
+        trace = m00 + m11 + m22
+        if trace > 0.0:
+            k = 0.5 / math.sqrt(1.0 + trace)
+            q = (k * (m21 - m12), k * (m02 - m20), k * (m10 - m01), 0.25 / k)
+        elif (m00 > m11) and (m00 > m22):
+            k = 0.5 / math.sqrt(1.0 + m00 - m11 - m22)
+            q = (0.25 / k, k * (m01 + m10), k * (m02 + m20), k * (m21 - m12))
+        elif m11 > m22:
+            k = 0.5 / math.sqrt(1.0 + m11 - m00 - m22)
+            q = (k * (m01 + m10), 0.25 / k, k * (m12 + m21), k * (m02 - m20))
+        else:
+            k = 0.5 / math.sqrt(1.0 + m22 - m00 - m11)
+            q = (k * (m02 + m20), k * (m12 + m21), 0.25 / k, k * (m10 - m01))
+        output.extend(q)
+    return output
+
+def transforms_to_srt_buffers(tfms: Sequence[float]) -> tuple[array, array, array]:
+    '''Decompose the stack of matrices into arrays of translations, rotations and scales
+    Rotation is extracted from the matrix with removed scale
+    '''
+    count: int = len(tfms) // 16
+    translations: array = array("d")
+    scales: array = array("d")
+    unscaled: array = array("d")
+    for i in range(count):
+        shift: int = 16 * i
+        m00, m01, m02, m03, m10, m11, m12, m13, m20, m21, m22, m23 = tfms[shift:shift + 12]
+        sx = math.sqrt(m00**2 + m10**2 + m20**2)
+        sy = math.sqrt(m01**2 + m11**2 + m21**2)
+        sz = math.sqrt(m02**2 + m12**2 + m22**2)
+        translations.extend((m03, m13, m23))
+        scales.extend((sx, sy, sz))
+        ix = 1.0 / sx
+        iy = 1.0 / sy
+        iz = 1.0 / sz
+        unscaled.extend((m00 * ix, m01 * iy, m02 * iz, m03,
+                         m10 * ix, m11 * iy, m12 * iz, m13,
+                         m20 * ix, m21 * iy, m22 * iz, m23,
+                         0.0, 0.0, 0.0, 1.0))
+    return translations, transforms_to_quaternions_buffer(unscaled), scales
@@ -0,0 +1,248 @@
+import math
+import unittest
+from py3dscene.animation import Animation
+from py3dscene.animation import AnimationCurveType
+
+def create_linear() -> Animation:
+    animation: Animation = Animation(AnimationCurveType.LINEAR, 3)
+    animation.add_keyframe(0, (0.0, 0.0, 0.0))
+    animation.add_keyframe(10, (10.0, 20.0, -4.0))
+    animation.add_keyframe(20, (10.0, 0.0, 4.0))
+    return animation
+
+def create_step() -> Animation:
+    animation: Animation = Animation(AnimationCurveType.STEP, 3)
+    animation.add_keyframe(0, (0.0, 0.0, 0.0))
+    animation.add_keyframe(10, (1.0, 2.0, 3.0))
+    animation.add_keyframe(20, (4.0, 5.0, 6.0))
+    return animation
+
+def create_cubic() -> Animation:
+    # key frames are 2 seconds apart at 30 fps
+    animation: Animation = Animation(AnimationCurveType.CUBICSPLINE, 3)
+    animation.add_keyframe(0, ((0.0, 0.0, 0.0), (0.0, 0.0, 0.0), (1.0, 0.0, 0.5)))
+    animation.add_keyframe(60, ((2.0, -1.0, 0.0), (1.0, 1.0, 0.0), (0.0, 0.0, 0.0)))
+    return animation
+
+def create_rotation(second: tuple[float, float, float, float]) -> Animation:
+    animation: Animation = Animation(AnimationCurveType.LINEAR, 4)
+    animation.add_keyframe(0, (0.0, 0.0, 0.0, 1.0))
+    animation.add_keyframe(10, second)
+    return animation
+
+class TestAnimationKeyframes(unittest.TestCase):
+    def test_add_keyframe(self) -> None:
+        animation: Animation = Animation(AnimationCurveType.LINEAR, 3)
+        for frame in (10.0, 0.0, 20.0, 5.0, 15.0):
+            animation.add_keyframe(frame, (frame, 0.0, 0.0))
+        self.assertEqual(animation.get_frames(), [0.0, 5.0, 10.0, 15.0, 20.0])
+        self.assertEqual(animation.get_values_buffer().tolist()[::3], [0.0, 5.0, 10.0, 15.0, 20.0])
+        # the new key is placed before the key with the same frame
+        animation.add_keyframe(10.0, (-1.0, 0.0, 0.0))
+        self.assertEqual(animation.get_frames(), [0.0, 5.0, 10.0, 10.0, 15.0, 20.0])
+        self.assertEqual(animation.get_values_buffer().tolist()[::3], [0.0, 5.0, -1.0, 10.0, 15.0, 20.0])
+        # the value with invalid format is ignored
+        animation.add_keyframe(7.0, (1.0, 2.0))  # type: ignore
+        self.assertEqual(animation.get_keyframes_count(), 6)
+
+    def test_add_cubic_keyframe(self) -> None:
+        animation: Animation = Animation(AnimationCurveType.CUBICSPLINE, 3)
+        animation.add_keyframe(10.0, ((1.0, 1.0, 1.0), (2.0, 2.0, 2.0), (3.0, 3.0, 3.0)))
+        animation.add_keyframe(0.0, ((4.0, 4.0, 4.0), (5.0, 5.0, 5.0), (6.0, 6.0, 6.0)))
+        self.assertEqual(animation.get_frames(), [0.0, 10.0])
+        self.assertEqual(animation.get_values_buffer().tolist()[::3], [4.0, 5.0, 6.0, 1.0, 2.0, 3.0])
+        self.assertEqual(animation.get_keyframe(1), (10.0, ((1.0, 1.0, 1.0), (2.0, 2.0, 2.0), (3.0, 3.0, 3.0))))
+
+    def test_set_unsorted_keyframes(self) -> None:
+        frames: list[float] = [20.0, 0.0, 10.0, 0.0, 10.0, 5.0]
+        values: list[float] = [float(i) for i in range(len(frames))]
+        animation: Animation = Animation(AnimationCurveType.STEP, 3)
+        animation.set_keyframes(frames, [v for value in values for v in (value, 2.0 * value, 3.0 * value)])
+        self.assertEqual(animation.get_frames(), [0.0, 0.0, 5.0, 10.0, 10.0, 20.0])
+        # keys with the same frame keep their order
+        self.assertEqual([animation.get_keyframe(i) for i in range(6)],
+                         [(frames[i], (values[i], 2.0 * values[i], 3.0 * values[i])) for i in (1, 3, 5, 2, 4, 0)])
+
+        # bulk loading gives the same clip as adding keys one by one in the order of frames
+        cubic: Animation = Animation(AnimationCurveType.CUBICSPLINE, 3)
+        cubic.set_keyframes(frames, [v for value in values for v in (value, value, value, -value, -value, -value, 0.0, 0.0, value)])
+        expected: Animation = Animation(AnimationCurveType.CUBICSPLINE, 3)
+        # each key is added before keys with the same frame, so keys are added in reversed order
+        for i in reversed(sorted(range(len(frames)), key=frames.__getitem__)):
+            expected.add_keyframe(frames[i], ((values[i], values[i], values[i]), (-values[i], -values[i], -values[i]), (0.0, 0.0, values[i])))
+        self.assertEqual(cubic.get_frames(), expected.get_frames())
+        self.assertEqual(cubic.get_values_buffer(), expected.get_values_buffer())
+
+    def test_set_invalid_keyframes(self) -> None:
+        animation: Animation = create_linear()
+        with self.assertRaises(ValueError):
+            animation.set_keyframes([0.0, 1.0], [0.0, 0.0, 0.0])
+        cubic: Animation = Animation(AnimationCurveType.CUBICSPLINE, 4)
+        with self.assertRaises(ValueError):
+            cubic.set_keyframes([0.0], [0.0, 0.0, 0.0, 1.0])
+        # the clip is not changed
+        self.assertEqual(animation.get_frames(), [0.0, 10.0, 20.0])
+        self.assertEqual(cubic.get_keyframes_count(), 0)
+
+class TestAnimationEvaluate(unittest.TestCase):
+    def assertValuesAlmostEqual(self, a: list[float], b: list[float]) -> None:
+        self.assertEqual(len(a), len(b))
+        for x, y in zip(a, b):
+            self.assertAlmostEqual(x, y)
+
+    def test_key_frames(self) -> None:
+        for animation in (create_linear(), create_step(), create_cubic()):
+            for frame in animation.get_frames():
+                value = animation.get_value_at_frame(frame)
+                # for cubic curve the value is between tangents
+                if animation.get_type() == AnimationCurveType.CUBICSPLINE:
+                    value = value[1]  # type: ignore
+                self.assertEqual(animation.evaluate([frame]).tolist(), list(value))  # type: ignore
+
+    def test_linear(self) -> None:
+        animation: Animation = create_linear()
+        self.assertValuesAlmostEqual(animation.evaluate([5.0]).tolist(), [5.0, 10.0, -2.0])
+        self.assertValuesAlmostEqual(animation.evaluate([15.0]).tolist(), [10.0, 10.0, 0.0])
+
+    def test_step(self) -> None:
+        animation: Animation = create_step()
+        self.assertEqual(animation.evaluate([5.0, 9.99, 10.0, 15.0]).tolist(), [0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0, 2.0, 3.0, 1.0, 2.0, 3.0])
+
+    def test_slerp(self) -> None:
+        s: float = math.sqrt(0.5)
+        expected: list[float] = [0.0, math.sin(math.pi / 8.0), 0.0, math.cos(math.pi / 8.0)]
+        # q and -q define the same rotation, the interpolation should use the shortest path for both
+        for second in ((0.0, s, 0.0, s), (0.0, -s, 0.0, -s)):
+            values: list[float] = create_rotation(second).evaluate([0.0, 2.5, 5.0, 7.5]).tolist()
+            for i in range(4):
+                self.assertAlmostEqual(math.sqrt(sum(v * v for v in values[4 * i:4 * i + 4])), 1.0)
+            self.assertValuesAlmostEqual(values[8:12], expected)
+
+    def test_cubic(self) -> None:
+        animation: Animation = create_cubic()
+        # Hermite basis at t = 0.5: 0.5 * p0 + 0.125 * d * m0 + 0.5 * p1 - 0.125 * d * m1
+        # d = 2 seconds, m0 - out-tangent of the first key, m1 - in-tangent of the second key
+        expected: list[float] = [0.5 * 0.0 + 0.25 * 1.0 + 0.5 * 1.0 - 0.25 * 2.0,
+                                 0.5 * 0.0 + 0.25 * 0.0 + 0.5 * 1.0 - 0.25 * -1.0,
+                                 0.5 * 0.0 + 0.25 * 0.5 + 0.5 * 0.0 - 0.25 * 0.0]
+        self.assertValuesAlmostEqual(animation.evaluate([30.0], 30.0).tolist(), expected)
+        # tangents are defined per second, so with other fps the curve is different
+        self.assertValuesAlmostEqual(animation.evaluate([30.0], 60.0).tolist(), [0.5 + 0.125 - 0.25, 0.5 + 0.125, 0.0625])
+
+    def test_clamp(self) -> None:
+        for animation in (create_linear(), create_step()):
+            values: list[float] = animation.evaluate([-5.0, 25.0]).tolist()
+            self.assertEqual(values[:3], list(animation.get_keyframe(0)[1]))  # type: ignore
+            self.assertEqual(values[3:], list(animation.get_keyframe(2)[1]))  # type: ignore
+        cubic: Animation = create_cubic()
+        self.assertEqual(cubic.evaluate([-1.0, 100.0]).tolist(), [0.0, 0.0, 0.0, 1.0, 1.0, 0.0])
+
+    def test_unsorted_frames(self) -> None:
+        for animation in (create_linear(), create_step(), create_cubic()):
+            frames: list[float] = [15.0, 5.0, 0.0, 20.0, 12.5, -3.0, 19.0, 1.0, 45.0, 7.0]
+            values: list[float] = animation.evaluate(frames).tolist()
+            # each frame is evaluated by a new clip, so the cached segment is not used
+            c: int = animation.get_value_components()
+            for i, frame in enumerate(frames):
+                fresh: Animation = Animation(animation.get_type(), c)
+                fresh.set_keyframes(animation.get_frames(), animation.get_values_buffer())
+                self.assertEqual(values[c * i:c * i + c], fresh.evaluate([frame]).tolist())
+
+    def test_dense_frames(self) -> None:
+        animation: Animation = create_linear()
+        frames: list[float] = [0.5 * i for i in range(-4, 50)]
+        values: list[float] = animation.evaluate(frames).tolist()
+        expected: list[float] = [v for frame in frames for v in animation.evaluate([frame]).tolist()]
+        self.assertEqual(values, expected)
+        # the second call starts from the cached segment
+        self.assertEqual(animation.evaluate(frames).tolist(), values)
+
+    def test_empty(self) -> None:
+        self.assertEqual(len(Animation(AnimationCurveType.LINEAR, 3).evaluate([0.0, 1.0])), 0)
+
+def create_wave(type: AnimationCurveType) -> Animation:
+    # smooth curve with many key frames, most of them can be removed
+    animation: Animation = Animation(type, 3)
+    for i in range(61):
+        value: tuple[float, float, float] = (0.1 * i, math.sin(0.1 * i), 0.0 if i < 30 else 0.05 * (i - 30))
+        if type == AnimationCurveType.CUBICSPLINE:
+            tangent: tuple[float, float, float] = (3.0, 3.0 * math.cos(0.1 * i), 0.0 if i < 30 else 1.5)
+            animation.add_keyframe(i, (tangent, value, tangent))
+        else:
+            animation.add_keyframe(i, value)
+    return animation
+
+def create_turn() -> Animation:
+    # rotation around y axis with variable speed
+    animation: Animation = Animation(AnimationCurveType.LINEAR, 4)
+    for i in range(61):
+        angle: float = 0.5 * (0.05 * i + 0.3 * math.sin(0.1 * i))
+        animation.add_keyframe(i, (0.0, math.sin(angle), 0.0, math.cos(angle)))
+    return animation
+
+class TestAnimationReduce(unittest.TestCase):
+    def assertReproduced(self, animation: Animation, reduced: Animation, tolerance: float, fps: float=30.0) -> None:
+        '''Check that all key frames of the animation are reproduced by the reduced curve
+        '''
+        c: int = animation.get_value_components()
+        frames: list[float] = animation.get_frames()
+        self.assertEqual(reduced.get_frames()[0], frames[0])
+        self.assertEqual(reduced.get_frames()[-1], frames[-1])
+        self.assertLess(reduced.get_keyframes_count(), len(frames))
+        expected: list[float] = animation.evaluate(frames, fps).tolist()
+        values: list[float] = reduced.evaluate(frames, fps).tolist()
+        for i in range(len(frames)):
+            a: list[float] = expected[c * i:c * i + c]
+            b: list[float] = values[c * i:c * i + c]
+            if c == 4:
+                error: float = 2.0 * math.acos(min(abs(sum(x * y for x, y in zip(a, b))), 1.0))
+            else:
+                error = math.sqrt(sum((x - y) ** 2 for x, y in zip(a, b)))
+            self.assertLessEqual(error, tolerance)
+
+    def test_linear(self) -> None:
+        animation: Animation = create_wave(AnimationCurveType.LINEAR)
+        for tolerance in (0.001, 0.01, 0.1):
+            self.assertReproduced(animation, animation.get_reduced(tolerance, 0.0), tolerance)
+
+    def test_cubic(self) -> None:
+        animation: Animation = create_wave(AnimationCurveType.CUBICSPLINE)
+        for tolerance in (0.001, 0.01, 0.1):
+            self.assertReproduced(animation, animation.get_reduced(tolerance, 0.0), tolerance)
+
+    def test_rotation(self) -> None:
+        animation: Animation = create_turn()
+        for angle_tolerance in (0.0001, 0.001, 0.01):
+            # the distance tolerance is not used for rotations
+            self.assertReproduced(animation, animation.get_reduced(0.0, angle_tolerance), angle_tolerance)
+
+    def test_constant(self) -> None:
+        for type in (AnimationCurveType.LINEAR, AnimationCurveType.STEP):
+            animation: Animation = Animation(type, 3)
+            animation.set_keyframes([float(i) for i in range(10)], [1.0, 2.0, 3.0] * 10)
+            reduced: Animation = animation.get_reduced(0.0001, 0.0001)
+            self.assertEqual(reduced.get_frames(), [0.0, 9.0])
+            self.assertEqual(reduced.get_values_buffer().tolist(), [1.0, 2.0, 3.0] * 2)
+        rotation: Animation = Animation(AnimationCurveType.LINEAR, 4)
+        rotation.set_keyframes([float(i) for i in range(10)], [0.0, 0.6, 0.0, 0.8] * 10)
+        self.assertEqual(rotation.get_reduced(0.0001, 0.0001).get_frames(), [0.0, 9.0])
+
+    def test_step(self) -> None:
+        animation: Animation = Animation(AnimationCurveType.STEP, 3)
+        values: list[float] = [0.0, 0.0, 1.0, 1.0, 1.0, 0.0, 0.0, 2.0]
+        animation.set_keyframes([float(i) for i in range(8)], [v for value in values for v in (value, 0.0, 0.0)])
+        reduced: Animation = animation.get_reduced(0.0001, 0.0001)
+        # only keys, where the value is changed, and the last key are kept
+        self.assertEqual(reduced.get_frames(), [0.0, 2.0, 5.0, 7.0])
+        self.assertEqual(reduced.get_values_buffer().tolist()[::3], [0.0, 1.0, 0.0, 2.0])
+        frames: list[float] = [0.5 * i for i in range(16)]
+        self.assertEqual(reduced.evaluate(frames).tolist(), animation.evaluate(frames).tolist())
+
+    def test_short(self) -> None:
+        for count in (0, 1, 2):
+            animation: Animation = Animation(AnimationCurveType.LINEAR, 3)
+            animation.set_keyframes([float(i) for i in range(count)], [1.0, 2.0, 3.0] * count)
+            self.assertEqual(animation.get_reduced(0.0001, 0.0001).get_frames(), animation.get_frames())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,240 @@
+import os
+import json
+import struct
+import tempfile
+import unittest
+from typing import Any
+from typing import Optional
+from unittest import mock
+from py3dscene.scene import Scene
+from py3dscene.object import Object
+from py3dscene.material import PBRMaterial
+from py3dscene.mesh import MeshComponent
+from py3dscene.animation import Animation
+from py3dscene.animation import AnimationCurveType
+from py3dscene.gltf_io import to_gltf
+from py3dscene.gltf_io import from_gltf
+from py3dscene import gltf_io
+from py3dscene.io.gltf_export import export_mesh
+from py3dscene.io.gltf_export.export_mesh import EncodedPrimitive
+from py3dscene.io.gltf_export.export_buffer import BufferWriter
+from py3dscene.io.gltf_export.export_buffer import add_data_to_buffer
+from py3dscene.io.gltf_export.export_stats import ExportStatistics
+
+# mesh components, encoded in the current process
+encode_calls: list[int] = []
+original_encode = export_mesh.encode_mesh_component
+
+def count_encode(mesh: MeshComponent, optimize_mesh_nodes: bool) -> EncodedPrimitive:
+    encode_calls.append(mesh.get_vertex_count())
+    return original_encode(mesh, optimize_mesh_nodes)
+
+def create_quad(material: PBRMaterial) -> MeshComponent:
+    mesh: MeshComponent = MeshComponent([(0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (1.0, 1.0, 0.0), (0.0, 1.0, 0.0)], [(0, 1, 2, 3)])
+    mesh.add_normals([(0.0, 0.0, 1.0)] * 4)
+    mesh.set_material(material)
+    return mesh
+
+def create_triangle(material: PBRMaterial) -> MeshComponent:
+    mesh: MeshComponent = MeshComponent([(0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0)], [(0, 1, 2)])
+    mesh.set_material(material)
+    return mesh
+
+def create_instances_scene() -> Scene:
+    '''Create the scene with objects, which contain equal meshes in different order and with different materials
+    '''
+    scene: Scene = Scene()
+    red: PBRMaterial = scene.create_material("red")
+    blue: PBRMaterial = scene.create_material("blue")
+    first: Object = scene.create_object("first")
+    first.add_mesh_component(create_quad(red))
+    first.add_mesh_component(create_triangle(red))
+    second: Object = scene.create_object("second")
+    second.add_mesh_component(create_triangle(blue))
+    second.add_mesh_component(create_quad(blue))
+    third: Object = scene.create_object("third")
+    third.add_mesh_component(create_quad(red))
+    third.add_mesh_component(create_triangle(red))
+    return scene
+
+def create_animated_scene(frames: list[list[float]]) -> Scene:
+    '''Create the scene with one object for each list of frames, each object has translation and rotation animations
+    '''
+    scene: Scene = Scene()
+    for i, object_frames in enumerate(frames):
+        obj: Object = scene.create_object(f"object{i}")
+        translation: Animation = Animation(AnimationCurveType.LINEAR, 3)
+        translation.set_keyframes(object_frames, [float(i + k) for k in range(3 * len(object_frames))])
+        obj.set_translation_animation(translation)
+        rotation: Animation = Animation(AnimationCurveType.LINEAR, 4)
+        rotation.set_keyframes(object_frames, [0.0, 0.0, 0.0, 1.0] * len(object_frames))
+        obj.set_rotation_animation(rotation)
+    return scene
+
+def read_glb_json(file_path: str) -> dict[str, Any]:
+    '''Return json chunk of the glb file
+    '''
+    with open(file_path, "rb") as file:
+        data: bytes = file.read()
+    json_length: int = struct.unpack_from("<I", data, 12)[0]
+    return json.loads(data[20:20 + json_length])
+
+class TestGltfExport(unittest.TestCase):
+    def setUp(self) -> None:
+        # the exporter splits paths by backslashes, so files are written by relative paths in the temporary folder
+        self._temp_dir: tempfile.TemporaryDirectory = tempfile.TemporaryDirectory()
+        self._current_dir: str = os.getcwd()
+        os.chdir(self._temp_dir.name)
+
+    def tearDown(self) -> None:
+        os.chdir(self._current_dir)
+        self._temp_dir.cleanup()
+
+    def get_path(self, folder: str) -> str:
+        return folder + "\\scene.glb"
+
+    def test_instances_with_workers(self) -> None:
+        scene: Scene = create_instances_scene()
+        to_gltf(scene, self.get_path("serial"), instance_meshes=True)
+        encode_calls.clear()
+        with mock.patch.object(export_mesh, "encode_mesh_component", count_encode):
+            to_gltf(scene, self.get_path("parallel"), instance_meshes=True, workers=2)
+        # each unique data is encoded by workers, so nothing is encoded in the main process
+        self.assertEqual(encode_calls, [])
+        with open(self.get_path("serial"), "rb") as serial_file, open(self.get_path("parallel"), "rb") as parallel_file:
+            self.assertEqual(serial_file.read(), parallel_file.read())
+
+        imported: Scene = from_gltf(self.get_path("parallel"))
+        counts: dict[str, list[int]] = {obj.get_name(): [m.get_vertex_count() for m in obj.get_mesh_components()] for obj in imported.get_root_objects()}
+        self.assertEqual(counts, {"first": [4, 3], "second": [3, 4], "third": [4, 3]})
+
+    def test_reduce_keyframes(self) -> None:
+        scene: Scene = Scene()
+        obj: Object = scene.create_object("object")
+        # constant translation is reduced to the first and the last key frames
+        translation: Animation = Animation(AnimationCurveType.LINEAR, 3)
+        translation.set_keyframes([float(i) for i in range(10)], [1.0, 2.0, 3.0] * 10)
+        obj.set_translation_animation(translation)
+        # step rotation keeps only changes of the value
+        rotation: Animation = Animation(AnimationCurveType.STEP, 4)
+        rotation.set_keyframes([0.0, 5.0, 10.0, 15.0], [0.0, 0.0, 0.0, 1.0] * 2 + [0.0, 1.0, 0.0, 0.0] * 2)
+        obj.set_rotation_animation(rotation)
+
+        statistics: Optional[ExportStatistics] = to_gltf(scene, self.get_path("reduced"), reduce_keyframes=True)
+        assert statistics is not None
+        self.assertEqual(statistics.get_animation_input_keyframes(), 14)
+        self.assertEqual(statistics.get_animation_output_keyframes(), 5)
+        # each key frame contains time and value, 4 bytes per float
+        self.assertEqual(statistics.get_animation_input_bytes(), 4 * (10 * 4 + 4 * 5))
+        self.assertEqual(statistics.get_animation_output_bytes(), 4 * (2 * 4 + 3 * 5))
+
+        imported: Object = from_gltf(self.get_path("reduced")).get_objects_by_name("object")[0]
+        imported_translation: Optional[Animation] = imported.get_translation_animation()
+        imported_rotation: Optional[Animation] = imported.get_rotation_animation()
+        assert imported_translation is not None and imported_rotation is not None
+        self.assertEqual([round(f) for f in imported_translation.get_frames()], [0, 9])
+        self.assertEqual([round(f) for f in imported_rotation.get_frames()], [0, 10, 15])
+
+        # without reduction all key frames are written
+        statistics = to_gltf(scene, self.get_path("full"))
+        assert statistics is not None
+        self.assertEqual(statistics.get_animation_output_keyframes(), 14)
+        self.assertEqual(statistics.get_animation_saved_bytes(), 0)
+
+    def test_failed_buffer_write(self) -> None:
+        scene: Scene = create_instances_scene()
+        self.assertIsNotNone(to_gltf(scene, self.get_path("saved")))
+        # the model is saved, but binary data can not be added to it
+        with mock.patch.object(gltf_io, "write_glb_buffer", lambda file_path, buffer_writer: False):
+            self.assertIsNone(to_gltf(scene, self.get_path("glb")))
+        with mock.patch.object(gltf_io, "write_gltf_buffer", lambda file_path, buffer_writer: False):
+            self.assertIsNone(to_gltf(scene, "gltf\\scene.gltf"))
+
+    def test_shared_time_accessors(self) -> None:
+        scene: Scene = create_animated_scene([[0.0, 5.0, 10.0], [0.0, 5.0, 10.0]])
+        statistics: Optional[ExportStatistics] = to_gltf(scene, self.get_path("shared"), single_animation=True)
+        assert statistics is not None
+        gltf_json: dict[str, Any] = read_glb_json(self.get_path("shared"))
+        self.assertEqual(len(gltf_json["animations"]), 1)
+        samplers: list[dict[str, Any]] = gltf_json["animations"][0]["samplers"]
+        self.assertEqual(len(samplers), 4)
+        # all channels use one time accessor, but own values accessors
+        self.assertEqual(len({sampler["input"] for sampler in samplers}), 1)
+        self.assertEqual(len({sampler["output"] for sampler in samplers}), 4)
+        self.assertEqual(len(gltf_json["accessors"]), 5)
+        self.assertEqual(statistics.get_shared_time_accessors(), 3)
+        self.assertEqual(statistics.get_shared_time_bytes(), 3 * 3 * 4)
+
+        # without single animation each object has own animation and time accessors
+        statistics = to_gltf(scene, self.get_path("separate"))
+        assert statistics is not None
+        gltf_json = read_glb_json(self.get_path("separate"))
+        self.assertEqual(len(gltf_json["animations"]), 2)
+        self.assertEqual(len(gltf_json["accessors"]), 8)
+        self.assertEqual(statistics.get_shared_time_accessors(), 0)
+
+    def test_time_accessors_hash_collision(self) -> None:
+        scene: Scene = create_animated_scene([[0.0, 5.0, 10.0], [0.0, 6.0, 10.0]])
+        with mock.patch("hashlib.blake2b", ConstantHash):
+            statistics: Optional[ExportStatistics] = to_gltf(scene, self.get_path("collision"), single_animation=True)
+        assert statistics is not None
+        # times of objects have the same hash, but other data, so times of the second object are not replaced
+        # only the first accessor is remembered for the hash, so times of the second object are written twice
+        samplers: list[dict[str, Any]] = read_glb_json(self.get_path("collision"))["animations"][0]["samplers"]
+        self.assertEqual(samplers[0]["input"], samplers[1]["input"])
+        self.assertEqual(len({sampler["input"] for sampler in samplers}), 3)
+        self.assertEqual(statistics.get_shared_time_accessors(), 1)
+        imported: Scene = from_gltf(self.get_path("collision"))
+        for name, frames in (("object0", [0, 5, 10]), ("object1", [0, 6, 10])):
+            animation: Optional[Animation] = imported.get_objects_by_name(name)[0].get_rotation_animation()
+            assert animation is not None
+            self.assertEqual([round(f) for f in animation.get_frames()], frames)
+
+class ConstantHash:
+    '''Hash object, which returns the same digest for any data
+    '''
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def update(self, data: Any) -> None:
+        pass
+
+    def digest(self) -> bytes:
+        return bytes(16)
+
+class TestBufferWriter(unittest.TestCase):
+    def add_data(self, buffer_writer: BufferWriter, data: bytes, views: list[Any], accessors: list[Any]) -> int:
+        return add_data_to_buffer(buffer_writer, views, accessors, data, len(data) // 4, False, False, 5126, 65, [], [])
+
+    def test_deduplicate(self) -> None:
+        for use_temp_file in (False, True):
+            buffer_writer: BufferWriter = BufferWriter(use_temp_file, True)
+            views: list[Any] = []
+            accessors: list[Any] = []
+            first: int = self.add_data(buffer_writer, b"\x01" * 8, views, accessors)
+            second: int = self.add_data(buffer_writer, b"\x02" * 8, views, accessors)
+            self.assertEqual(self.add_data(buffer_writer, b"\x01" * 8, views, accessors), first)
+            self.assertEqual(self.add_data(buffer_writer, b"\x02" * 8, views, accessors), second)
+            self.assertEqual(len(accessors), 2)
+            self.assertEqual(buffer_writer.get_shared_accessors(), 2)
+            buffer_writer.close()
+
+    def test_hash_collision(self) -> None:
+        for use_temp_file in (False, True):
+            buffer_writer: BufferWriter = BufferWriter(use_temp_file, True)
+            views: list[Any] = []
+            accessors: list[Any] = []
+            with mock.patch("hashlib.blake2b", ConstantHash):
+                first: int = self.add_data(buffer_writer, b"\x01" * 8, views, accessors)
+                # the same hash, but other data, so the new accessor is created
+                second: int = self.add_data(buffer_writer, b"\x02" * 8, views, accessors)
+                self.assertNotEqual(first, second)
+                self.assertEqual(self.add_data(buffer_writer, b"\x01" * 8, views, accessors), first)
+                self.add_data(buffer_writer, b"\x03" * 4, views, accessors)
+            self.assertEqual(len(accessors), 3)
+            self.assertEqual(buffer_writer.get_length(), 20)
+            self.assertEqual(bytes(buffer_writer.get_data()), b"\x01" * 8 + b"\x02" * 8 + b"\x03" * 4)
+            buffer_writer.close()
+
+if __name__ == "__main__":
+    unittest.main()
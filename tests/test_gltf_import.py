@@ -0,0 +1,198 @@
+import os
+import json
+import base64
+import tempfile
+import unittest
+from array import array
+from typing import Any
+from typing import Optional
+from py3dscene.scene import Scene
+from py3dscene.object import Object
+from py3dscene.mesh import MeshComponent
+from py3dscene.animation import Animation
+from py3dscene.gltf_io import from_gltf
+
+FLOAT: int = 5126
+UNSIGNED_BYTE: int = 5121
+UNSIGNED_SHORT: int = 5123
+
+class GltfBuilder:
+    '''Create glTF json with one buffer, which is embedded as data uri
+    '''
+    def __init__(self) -> None:
+        self._data: bytearray = bytearray()
+        self._json: dict[str, Any] = {"asset": {"version": "2.0"},
+                                      "scene": 0,
+                                      "scenes": [{"nodes": []}],
+                                      "nodes": [],
+                                      "meshes": [],
+                                      "accessors": [],
+                                      "bufferViews": []}
+
+    def add_view(self, values: array) -> int:
+        # views are aligned to 4 bytes
+        self._data.extend(bytes(-len(self._data) % 4))
+        self._json["bufferViews"].append({"buffer": 0, "byteOffset": len(self._data), "byteLength": len(values) * values.itemsize})
+        self._data.extend(values.tobytes())
+        return len(self._json["bufferViews"]) - 1
+
+    def add_accessor(self, values: array, component_type: int, type: str, components: int, normalized: bool=False) -> int:
+        accessor: dict[str, Any] = {"bufferView": self.add_view(values),
+                                    "componentType": component_type,
+                                    "count": len(values) // components,
+                                    "type": type}
+        if normalized:
+            accessor["normalized"] = True
+        if type == "VEC3" and component_type == FLOAT:
+            accessor["min"] = [min(values[c::3]) for c in range(3)]
+            accessor["max"] = [max(values[c::3]) for c in range(3)]
+        self._json["accessors"].append(accessor)
+        return len(self._json["accessors"]) - 1
+
+    def add_sparse_accessor(self, count: int, indices: array, values: array) -> int:
+        '''Add VEC3 float accessor, which contains zeros except values with given indices
+        '''
+        self._json["accessors"].append({"componentType": FLOAT,
+                                        "count": count,
+                                        "type": "VEC3",
+                                        "min": [min(0.0, min(values[c::3])) for c in range(3)],
+                                        "max": [max(0.0, max(values[c::3])) for c in range(3)],
+                                        "sparse": {"count": len(indices),
+                                                   "indices": {"bufferView": self.add_view(indices), "componentType": UNSIGNED_SHORT},
+                                                   "values": {"bufferView": self.add_view(values)}}})
+        return len(self._json["accessors"]) - 1
+
+    def add_mesh(self, primitives: list[dict[str, Any]]) -> int:
+        self._json["meshes"].append({"primitives": primitives})
+        return len(self._json["meshes"]) - 1
+
+    def add_node(self, name: str, mesh: Optional[int]=None) -> int:
+        node: dict[str, Any] = {"name": name}
+        if mesh is not None:
+            node["mesh"] = mesh
+        self._json["nodes"].append(node)
+        self._json["scenes"][0]["nodes"].append(len(self._json["nodes"]) - 1)
+        return len(self._json["nodes"]) - 1
+
+    def add_animation(self, node: int, path: str, times: int, values: int) -> None:
+        animations: list[dict[str, Any]] = self._json.setdefault("animations", [])
+        animations.append({"samplers": [{"input": times, "output": values, "interpolation": "LINEAR"}],
+                           "channels": [{"sampler": 0, "target": {"node": node, "path": path}}]})
+
+    def save(self, file_path: str) -> None:
+        self._json["buffers"] = [{"byteLength": len(self._data),
+                                  "uri": "data:application/octet-stream;base64," + base64.b64encode(self._data).decode("ascii")}]
+        with open(file_path, "w") as file:
+            json.dump(self._json, file)
+
+def add_quad_positions(builder: GltfBuilder) -> int:
+    return builder.add_accessor(array("f", [0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 1.0, 1.0, 0.0, 0.0, 1.0, 0.0]), FLOAT, "VEC3", 3)
+
+def get_mesh_data(mesh: MeshComponent) -> tuple[Any, ...]:
+    return (mesh.get_vertices(),
+            mesh.get_polygons(),
+            [mesh.get_normals(i) for i in range(mesh.get_normals_count())],
+            [mesh.get_uvs(i) for i in range(mesh.get_uvs_count())],
+            [[tuple(round(c, 6) for c in color) for color in mesh.get_colors(i)] for i in range(mesh.get_colors_count())],
+            [mesh.get_vertex_shapes(i) for i in range(mesh.get_vertex_count())])
+
+class TestGltfImport(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir: tempfile.TemporaryDirectory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self._temp_dir.cleanup()
+
+    def get_path(self, name: str) -> str:
+        return os.path.join(self._temp_dir.name, name)
+
+    def test_skip_invalid_primitives(self) -> None:
+        builder: GltfBuilder = GltfBuilder()
+        positions: int = add_quad_positions(builder)
+        valid: dict[str, Any] = {"attributes": {"POSITION": positions},
+                                 "indices": builder.add_accessor(array("H", [0, 1, 2, 0, 2, 3]), UNSIGNED_SHORT, "SCALAR", 1)}
+        without_indices: dict[str, Any] = {"attributes": {"POSITION": positions}}
+        degenerate: dict[str, Any] = {"attributes": {"POSITION": positions},
+                                      "indices": builder.add_accessor(array("H", [0, 1, 1, 2, 2, 3]), UNSIGNED_SHORT, "SCALAR", 1)}
+        builder.add_node("object", builder.add_mesh([valid, without_indices, degenerate]))
+        file_path: str = self.get_path("invalid.gltf")
+        builder.save(file_path)
+
+        scene: Scene = from_gltf(file_path)
+        obj: Object = scene.get_objects_by_name("object")[0]
+        self.assertEqual([m.get_triangles_count() for m in obj.get_mesh_components()], [2])
+
+        # primitive without indices is skipped, but the degenerate one is found only after loading
+        lazy_scene: Scene = from_gltf(file_path, lazy=True)
+        lazy_obj: Object = lazy_scene.get_objects_by_name("object")[0]
+        self.assertEqual([m.get_triangles_count() for m in lazy_obj.get_mesh_components()], [2, 0])
+
+    def test_workers(self) -> None:
+        builder: GltfBuilder = GltfBuilder()
+        positions: int = add_quad_positions(builder)
+        indices: int = builder.add_accessor(array("H", [0, 1, 2, 0, 2, 3]), UNSIGNED_SHORT, "SCALAR", 1)
+        first: dict[str, Any] = {"attributes": {"POSITION": positions,
+                                                "NORMAL": builder.add_accessor(array("f", [0.0, 0.0, 1.0] * 4), FLOAT, "VEC3", 3),
+                                                "TEXCOORD_0": builder.add_accessor(array("f", [0.0, 0.0, 1.0, 0.0, 1.0, 1.0, 0.0, 1.0]), FLOAT, "VEC2", 2),
+                                                "COLOR_0": builder.add_accessor(array("B", [255, 0, 0, 255, 0, 128, 0, 255, 0, 0, 51, 255, 255, 255, 255, 0]), UNSIGNED_BYTE, "VEC4", 4, True)},
+                                 "indices": indices,
+                                 "targets": [{"POSITION": builder.add_sparse_accessor(4, array("H", [1, 3]), array("f", [0.0, 0.0, 0.5, 0.25, 0.0, 0.0]))}]}
+        second: dict[str, Any] = {"attributes": {"POSITION": positions,
+                                                 "COLOR_0": builder.add_accessor(array("H", [65535, 0, 0, 0, 65535, 0, 0, 0, 65535, 13107, 13107, 13107]), UNSIGNED_SHORT, "VEC3", 3, True)},
+                                  "indices": indices}
+        first_mesh: int = builder.add_mesh([first])
+        second_mesh: int = builder.add_mesh([second, first])
+        builder.add_node("first", first_mesh)
+        builder.add_node("second", second_mesh)
+        builder.add_node("instance", first_mesh)
+        file_path: str = self.get_path("workers.gltf")
+        builder.save(file_path)
+
+        scenes: list[Scene] = [from_gltf(file_path), from_gltf(file_path, workers=2), from_gltf(file_path, lazy=True)]
+        data: list[list[Any]] = [[(obj.get_name(), [get_mesh_data(m) for m in obj.get_mesh_components()]) for obj in scene.get_root_objects()] for scene in scenes]
+        self.assertEqual(data[0], data[1])
+        self.assertEqual(data[0], data[2])
+        first_data: tuple[Any, ...] = data[0][0][1][0]
+        self.assertEqual(first_data[4][0][:2], [(1.0, 0.0, 0.0, 1.0), (0.0, round(128 / 255, 6), 0.0, 1.0)])
+        self.assertEqual(first_data[5], [[(0.0, 0.0, 0.0)], [(0.0, 0.0, 0.5)], [(0.0, 0.0, 0.0)], [(0.25, 0.0, 0.0)]])
+
+    def test_shared_meshes(self) -> None:
+        builder: GltfBuilder = GltfBuilder()
+        quad: dict[str, Any] = {"attributes": {"POSITION": add_quad_positions(builder)},
+                                "indices": builder.add_accessor(array("H", [0, 1, 2, 0, 2, 3]), UNSIGNED_SHORT, "SCALAR", 1)}
+        mesh_index: int = builder.add_mesh([quad])
+        builder.add_node("first", mesh_index)
+        builder.add_node("second", mesh_index)
+        file_path: str = self.get_path("shared.gltf")
+        builder.save(file_path)
+
+        for lazy in (False, True):
+            scene: Scene = from_gltf(file_path, lazy=lazy)
+            first: MeshComponent = scene.get_objects_by_name("first")[0].get_mesh_components()[0]
+            second: MeshComponent = scene.get_objects_by_name("second")[0].get_mesh_components()[0]
+            expected: tuple[Any, ...] = get_mesh_data(second)
+            first.get_vertices()[0] = (5.0, 5.0, 5.0)
+            with self.assertRaises(TypeError):
+                first.get_vertices_buffer()[0] = 5.0
+            first.set_polygons([(0, 1, 2)])
+            self.assertEqual(first.get_polygons(), [(0, 1, 2)])
+            self.assertEqual(get_mesh_data(second), expected)
+
+    def test_skip_broken_animation(self) -> None:
+        builder: GltfBuilder = GltfBuilder()
+        node: int = builder.add_node("object")
+        times: int = builder.add_accessor(array("f", [0.0, 1.0, 2.0]), FLOAT, "SCALAR", 1)
+        builder.add_animation(node, "translation", times, builder.add_accessor(array("f", [0.0, 1.0, 2.0] * 3), FLOAT, "VEC3", 3))
+        # there are only two rotations for three key frames
+        builder.add_animation(node, "rotation", times, builder.add_accessor(array("f", [0.0, 0.0, 0.0, 1.0] * 2), FLOAT, "VEC4", 4))
+        file_path: str = self.get_path("animation.gltf")
+        builder.save(file_path)
+
+        obj: Object = from_gltf(file_path, fps=10.0).get_objects_by_name("object")[0]
+        translation: Optional[Animation] = obj.get_translation_animation()
+        assert translation is not None
+        self.assertEqual(translation.get_frames(), [0.0, 10.0, 20.0])
+        self.assertIsNone(obj.get_rotation_animation())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+from typing import Any
+from py3dscene.material import PBRMaterial
+from py3dscene.mesh import MeshComponent
+from py3dscene.mesh import LazyMeshComponent
+from py3dscene.mesh import create_mesh_from_buffers
+
+def create_quad() -> MeshComponent:
+    mesh: MeshComponent = MeshComponent([(0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (1.0, 1.0, 0.0), (0.0, 1.0, 0.0)], [(0, 1, 2, 3)])
+    mesh.add_uvs([(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0)])
+    return mesh
+
+def get_mesh_data(mesh: MeshComponent) -> tuple[Any, ...]:
+    return (mesh.get_vertices(),
+            mesh.get_polygons(),
+            mesh.get_polygons_sizes(),
+            mesh.get_uvs(0),
+            mesh.get_normals(0),
+            mesh.get_triangulation())
+
+class TestSharedCopy(unittest.TestCase):
+    def test_getters_do_not_change_data(self) -> None:
+        mesh: MeshComponent = create_quad()
+        mesh.add_normals([(0.0, 0.0, 1.0)] * 4)
+        mesh.add_shape([(0.0, 0.0, 1.0)] * 4)
+        copy: MeshComponent = mesh.get_shared_copy()
+        expected: tuple[Any, ...] = get_mesh_data(mesh)
+        # lists are copies, so changes of them do not affect meshes
+        copy.get_vertices()[0] = (5.0, 5.0, 5.0)
+        copy.get_polygons()[0] = (3, 2, 1, 0)
+        copy.get_polygons_sizes()[0] = 5
+        # buffers are read-only
+        buffers = [copy.get_vertices_buffer(), copy.get_polygons_buffer(), copy.get_normals_buffer(0), copy.get_uvs_buffer(0),
+                   copy.get_shape_buffer(0), copy.get_triangulation_buffer(), copy.get_triangle_nodes_buffer()]
+        for buffer in buffers:
+            with self.assertRaises(TypeError):
+                buffer[0] = 1
+        self.assertEqual(get_mesh_data(mesh), expected)
+        self.assertEqual(get_mesh_data(copy), expected)
+
+    def test_change_copy(self) -> None:
+        mesh: MeshComponent = create_quad()
+        copy: MeshComponent = mesh.get_shared_copy()
+        other: MeshComponent = mesh.get_shared_copy()
+        expected: tuple[Any, ...] = get_mesh_data(mesh)
+        copy.set_polygons([(0, 1, 2), (0, 2, 3)])
+        copy.add_uvs([(0.5, 0.5)] * 6)
+        copy.set_material(PBRMaterial("material"))
+        self.assertEqual(copy.get_polygons(), [(0, 1, 2), (0, 2, 3)])
+        self.assertEqual(get_mesh_data(mesh), expected)
+        self.assertEqual(get_mesh_data(other), expected)
+        self.assertIsNot(mesh.get_material(), copy.get_material())
+
+    def test_create_from_buffers(self) -> None:
+        mesh: MeshComponent = create_quad()
+        copy: MeshComponent = create_mesh_from_buffers(mesh.get_vertices_buffer(), mesh.get_polygons_buffer(), mesh.get_polygons_sizes())
+        self.assertEqual(copy.get_vertices(), mesh.get_vertices())
+        self.assertEqual(copy.get_polygons(), mesh.get_polygons())
+
+class TestLazyMeshComponent(unittest.TestCase):
+    def test_load_on_read(self) -> None:
+        calls: list[int] = []
+        def loader() -> MeshComponent:
+            calls.append(1)
+            return create_quad()
+        mesh: LazyMeshComponent = LazyMeshComponent(loader)
+        self.assertFalse(mesh.is_loaded())
+        self.assertEqual(mesh.get_vertex_count(), 4)
+        self.assertEqual(mesh.get_polygons(), [(0, 1, 2, 3)])
+        self.assertTrue(mesh.is_loaded())
+        self.assertEqual(len(calls), 1)
+
+    def test_set_material_before_load(self) -> None:
+        material: PBRMaterial = PBRMaterial("material")
+        mesh: LazyMeshComponent = LazyMeshComponent(create_quad)
+        mesh.set_material(material)
+        self.assertFalse(mesh.is_loaded())
+        self.assertEqual(mesh.get_vertex_count(), 4)
+        self.assertIs(mesh.get_material(), material)
+
+    def test_add_layer_before_load(self) -> None:
+        material: PBRMaterial = PBRMaterial("material")
+        mesh: LazyMeshComponent = LazyMeshComponent(create_quad)
+        mesh.set_material(material)
+        mesh.add_uvs_buffer([0.5] * 8)
+        # the data is loaded before the change, so the loaded data does not override it
+        self.assertTrue(mesh.is_loaded())
+        self.assertEqual(mesh.get_vertex_count(), 4)
+        self.assertEqual(mesh.get_uvs_count(), 2)
+        self.assertEqual(mesh.get_uvs(0), [(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0)])
+        self.assertEqual(mesh.get_uvs(1), [(0.5, 0.5)] * 4)
+        self.assertIs(mesh.get_material(), material)
+
+    def test_set_polygons_before_load(self) -> None:
+        mesh: LazyMeshComponent = LazyMeshComponent(create_quad)
+        mesh.set_polygons([(0, 1, 2), (0, 2, 3)])
+        self.assertEqual(mesh.get_vertex_count(), 4)
+        self.assertEqual(mesh.get_polygons(), [(0, 1, 2), (0, 2, 3)])
+        self.assertEqual(mesh.get_triangles_count(), 2)
+        # the number of nodes is changed, so uvs of the loaded mesh are removed
+        self.assertEqual(mesh.get_uvs_count(), 0)
+
+    def test_set_field_before_load(self) -> None:
+        mesh: LazyMeshComponent = LazyMeshComponent(create_quad)
+        mesh._set_positions([0.0, 0.0, 2.0] * 4)
+        self.assertTrue(mesh.is_loaded())
+        self.assertEqual(mesh.get_vertices(), [(0.0, 0.0, 2.0)] * 4)
+        self.assertEqual(mesh.get_polygons(), [(0, 1, 2, 3)])
+        self.assertEqual(mesh.get_uvs_count(), 1)
+
+    def test_empty_loader(self) -> None:
+        mesh: LazyMeshComponent = LazyMeshComponent(lambda: None)
+        self.assertEqual(mesh.get_vertex_count(), 0)
+        self.assertEqual(mesh.get_polygons(), [])
+        self.assertEqual(mesh.get_triangles_count(), 0)
+
+    def test_lazy_copy(self) -> None:
+        calls: list[int] = []
+        def loader() -> MeshComponent:
+            calls.append(1)
+            return create_quad()
+        mesh: LazyMeshComponent = LazyMeshComponent(loader)
+        copy: MeshComponent = mesh.get_shared_copy()
+        self.assertEqual(copy.get_vertex_count(), 4)
+        self.assertEqual(mesh.get_vertex_count(), 4)
+        self.assertEqual(len(calls), 1)
+
+if __name__ == "__main__":
+    unittest.main()
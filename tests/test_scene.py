@@ -0,0 +1,236 @@
+import math
+import unittest
+from array import array
+from typing import Optional
+from py3dscene.scene import Scene
+from py3dscene.object import Object
+from py3dscene.material import PBRMaterial
+from py3dscene.animation import Animation
+from py3dscene.animation import AnimationCurveType
+from py3dscene.transform import Transform
+from py3dscene.transform import transforms_to_buffer
+from py3dscene.transform import get_srt_matrix
+from py3dscene.transform import multiply
+
+def create_animation(type: AnimationCurveType, keys: list[tuple[float, tuple[float, ...]]]) -> Animation:
+    animation: Animation = Animation(type, len(keys[0][1]))
+    for frame, value in keys:
+        animation.add_keyframe(frame, value)  # type: ignore
+    return animation
+
+def get_rotation(angle: float) -> tuple[float, float, float, float]:
+    return (0.0, math.sin(0.5 * angle), 0.0, math.cos(0.5 * angle))
+
+def create_rig_scene() -> Scene:
+    '''Create the scene with static parents of animated objects, animated parents of static objects and static objects
+    '''
+    scene: Scene = Scene()
+    root: Object = scene.create_object("root")
+    root.set_local_srt((1.0, 2.0, 3.0), get_rotation(0.5), (2.0, 2.0, 2.0))
+    arm: Object = root.create_subobject("arm")
+    arm.set_local_srt((0.0, 1.0, 0.0), (0.0, 0.0, 0.0, 1.0), (1.0, 0.5, 1.0))
+    arm.set_rotation_animation(create_animation(AnimationCurveType.LINEAR, [(0.0, get_rotation(0.0)), (10.0, get_rotation(1.5)), (20.0, get_rotation(-1.0))]))
+    hand: Object = arm.create_subobject("hand")
+    hand.set_local_translation(0.0, 2.0, 0.0)
+    finger: Object = hand.create_subobject("finger")
+    finger.set_local_translation(0.5, 0.0, 0.0)
+    finger.set_translation_animation(create_animation(AnimationCurveType.STEP, [(0.0, (0.5, 0.0, 0.0)), (7.0, (0.5, 0.3, 0.0))]))
+    finger.set_scale_animation(create_animation(AnimationCurveType.CUBICSPLINE, [(0.0, ((0.0, 0.0, 0.0), (1.0, 1.0, 1.0), (1.0, 0.0, 0.0))),
+                                                                                  (12.0, ((0.0, 1.0, 0.0), (2.0, 1.0, 1.0), (0.0, 0.0, 0.0)))]))
+    root.create_subobject("static").set_local_translation(5.0, 0.0, 0.0)
+    mover: Object = scene.create_object("mover")
+    mover.set_translation_animation(create_animation(AnimationCurveType.LINEAR, [(0.0, (0.0, 0.0, 0.0)), (20.0, (10.0, 0.0, -5.0))]))
+    mover.create_subobject("passenger").set_local_srt((0.0, 1.0, 0.0), get_rotation(1.0), (1.0, 1.0, 1.0))
+    scene.create_object("ground").set_local_scale(10.0, 1.0, 10.0)
+    return scene
+
+def create_tree_scene() -> Scene:
+    scene: Scene = Scene()
+    root: Object = scene.create_object("root")
+    root.set_local_srt((1.0, 0.0, 0.0), get_rotation(0.3), (2.0, 2.0, 2.0))
+    branch: Object = root.create_subobject("branch")
+    branch.set_local_translation(0.0, 1.0, 0.0)
+    leaf: Object = branch.create_subobject("leaf")
+    leaf.set_local_rotation(*get_rotation(1.2))
+    root.create_subobject("sibling").set_local_scale(1.0, 3.0, 1.0)
+    other: Object = scene.create_object("other")
+    other.set_local_translation(0.0, 0.0, 4.0)
+    other.create_subobject("other_child").set_local_translation(1.0, 1.0, 1.0)
+    return scene
+
+class TestSceneIndex(unittest.TestCase):
+    def test_get_object(self) -> None:
+        scene: Scene = Scene()
+        root: Object = scene.create_object("root", 100)
+        # subobjects are created after the root is added to the scene
+        child: Object = root.create_subobject("child", 101)
+        grandchild: Object = child.create_subobject("grandchild")
+        self.assertIs(scene.get_object_by_id(100), root)
+        self.assertIs(scene.get_object_by_id(101), child)
+        self.assertIs(scene.get_object_by_id(grandchild.get_id()), grandchild)
+        self.assertEqual(scene.get_objects_by_name("grandchild"), [grandchild])
+        self.assertIsNone(scene.get_object_by_id(102))
+        # objects, created outside of the scene, are not indexed
+        free: Object = Object("free", 200)
+        free.create_subobject("free_child", 201)
+        self.assertIsNone(scene.get_object_by_id(201))
+        self.assertEqual(scene.get_objects_by_name("free_child"), [])
+
+    def test_repeated_ids(self) -> None:
+        scene: Scene = Scene()
+        first: Object = scene.create_object("first", 1)
+        second: Object = scene.create_object("second", 1)
+        third: Object = first.create_subobject("first", 1)
+        # the first object with the id is returned, but all objects are found by names
+        self.assertIs(scene.get_object_by_id(1), first)
+        self.assertEqual(scene.get_objects_by_name("first"), [first, third])
+        self.assertEqual(scene.get_objects_by_name("second"), [second])
+
+    def test_get_material(self) -> None:
+        scene: Scene = Scene()
+        first: PBRMaterial = scene.create_material("first", 10)
+        second: PBRMaterial = scene.create_material("second", 11)
+        repeated: PBRMaterial = scene.create_material("repeated", 10)
+        self.assertIs(scene.get_material(10), first)
+        self.assertIs(scene.get_material(11), second)
+        self.assertIsNone(scene.get_material(12))
+        self.assertEqual(scene.get_all_materials(), [first, second, repeated])
+
+class TestWorldTransforms(unittest.TestCase):
+    def get_expected(self, obj: Object) -> Transform:
+        '''Multiply local matrices of the object and all its parents
+        '''
+        tfm: Transform = get_srt_matrix(obj.get_translation(), obj.get_rotation(), obj.get_scale())
+        parent: Optional[Object] = obj.get_parent()
+        while parent is not None:
+            tfm = multiply(get_srt_matrix(parent.get_translation(), parent.get_rotation(), parent.get_scale()), tfm)
+            parent = parent.get_parent()
+        return tfm
+
+    def test_world_transforms(self) -> None:
+        scene: Scene = create_tree_scene()
+        tfms: dict[int, Transform] = scene.get_world_transforms()
+        self.assertEqual(len(tfms), 6)
+        for id, tfm in tfms.items():
+            obj: Optional[Object] = scene.get_object_by_id(id)
+            assert obj is not None
+            self.assertEqual(tfm, self.get_expected(obj))
+            self.assertIs(obj.get_world_transform(), tfm)
+        # the same result for objects, which are calculated one by one
+        other_scene: Scene = create_tree_scene()
+        self.assertEqual([obj.get_world_transform() for obj in other_scene.get_objects_by_name("leaf") + other_scene.get_objects_by_name("root")],
+                         [tfms[obj.get_id()] for obj in scene.get_objects_by_name("leaf") + scene.get_objects_by_name("root")])
+
+    def test_invalidate_subtree(self) -> None:
+        scene: Scene = create_tree_scene()
+        before: dict[int, Transform] = scene.get_world_transforms()
+        branch: Object = scene.get_objects_by_name("branch")[0]
+        branch.set_local_translation(0.0, 5.0, 0.0)
+        # only the changed object and its children have no cached world transforms
+        changed: set[str] = {"branch", "leaf"}
+        for name in ("root", "branch", "leaf", "sibling", "other", "other_child"):
+            obj: Object = scene.get_objects_by_name(name)[0]
+            self.assertEqual(obj._world_transform is None, name in changed)
+
+        after: dict[int, Transform] = scene.get_world_transforms()
+        for name in ("root", "branch", "leaf", "sibling", "other", "other_child"):
+            obj = scene.get_objects_by_name(name)[0]
+            self.assertEqual(after[obj.get_id()], self.get_expected(obj))
+            if name in changed:
+                self.assertNotEqual(after[obj.get_id()], before[obj.get_id()])
+            else:
+                self.assertIs(after[obj.get_id()], before[obj.get_id()])
+
+class TestLocalTransforms(unittest.TestCase):
+    def test_lazy_composition(self) -> None:
+        scene: Scene = Scene()
+        obj: Object = scene.create_object("object")
+        translation: tuple[float, float, float] = (1.0, -2.0, 3.0)
+        rotation: tuple[float, float, float, float] = get_rotation(0.7)
+        scale: tuple[float, float, float] = (0.5, 2.0, 1.5)
+        obj.set_local_srt(translation, rotation, scale)
+        # the matrix is composed only when it's requested
+        self.assertIsNone(obj._transform)
+        self.assertEqual((obj.get_translation(), obj.get_rotation(), obj.get_scale()), (translation, rotation, scale))
+        self.assertIsNone(obj._transform)
+        self.assertEqual(obj.get_transform(), get_srt_matrix(translation, rotation, scale))
+        self.assertIsNotNone(obj._transform)
+
+    def test_set_local_transforms(self) -> None:
+        scene: Scene = Scene()
+        objects: list[Object] = [scene.create_object(str(i)) for i in range(3)]
+        srts: list[tuple[tuple[float, float, float], tuple[float, float, float, float], tuple[float, float, float]]] = [
+            ((float(i), 1.0, 2.0), get_rotation(0.4 * i), (1.0, 1.0 + i, 1.0)) for i in range(3)]
+        # the unknown id is skipped, but its values are also in the array
+        ids: list[int] = [objects[2].get_id(), -1, objects[0].get_id()]
+        values: list[float] = [v for i in (2, 1, 0) for part in srts[i] for v in part]
+        self.assertEqual(len(values), 10 * len(ids))
+        scene.set_local_transforms(ids, values)
+        for i in (0, 2):
+            self.assertIsNone(objects[i]._transform)
+            self.assertEqual(objects[i].get_transform(), get_srt_matrix(*srts[i]))
+        self.assertEqual(objects[1].get_translation(), (0.0, 0.0, 0.0))
+        # world transforms compose all changed matrices at once, with the same result
+        scene.set_local_transforms(ids, values)
+        world_transforms: dict[int, Transform] = scene.get_world_transforms()
+        for i in (0, 2):
+            self.assertEqual(world_transforms[objects[i].get_id()], get_srt_matrix(*srts[i]))
+
+    def test_set_invalid_local_transforms(self) -> None:
+        scene: Scene = Scene()
+        obj: Object = scene.create_object("object")
+        for values in ([1.0] * 9, [1.0] * 11, [1.0] * 20):
+            with self.assertRaises(ValueError):
+                scene.set_local_transforms([obj.get_id()], values)
+        # nothing is changed
+        self.assertEqual(obj.get_translation(), (0.0, 0.0, 0.0))
+        self.assertIsNotNone(obj._transform)
+
+class TestBakePoses(unittest.TestCase):
+    def get_expected(self, scene: Scene, ids: list[int], frames: list[float]) -> array:
+        '''Set animated values to objects at each frame and return their world transforms
+        '''
+        animated: list[tuple[Object, tuple[float, ...], tuple[float, ...], tuple[float, ...]]] = []
+        stack: list[Object] = list(scene.get_root_objects())
+        while len(stack) > 0:
+            obj: Object = stack.pop()
+            stack.extend(obj.get_children())
+            if any(anim is not None for anim in (obj.get_translation_animation(), obj.get_rotation_animation(), obj.get_scale_animation())):
+                animated.append((obj, obj.get_translation(), obj.get_rotation(), obj.get_scale()))
+
+        tfms: list[list[Transform]] = [[] for _ in ids]
+        for frame in frames:
+            for obj, translation, rotation, scale in animated:
+                values: list[tuple[float, ...]] = []
+                for anim, value in ((obj.get_translation_animation(), translation), (obj.get_rotation_animation(), rotation), (obj.get_scale_animation(), scale)):
+                    values.append(value if anim is None else tuple(anim.evaluate([frame])))
+                obj.set_local_srt(*values)  # type: ignore
+            for i, id in enumerate(ids):
+                obj_by_id: Optional[Object] = scene.get_object_by_id(id)
+                assert obj_by_id is not None
+                tfms[i].append(obj_by_id.get_world_transform())
+        return transforms_to_buffer([tfm for object_tfms in tfms for tfm in object_tfms])
+
+    def test_bake_poses(self) -> None:
+        scene: Scene = create_rig_scene()
+        frames: list[float] = [-2.0, 0.0, 1.5, 3.0, 6.5, 7.0, 9.0, 10.0, 11.25, 12.0, 15.0, 19.5, 20.0, 25.0]
+        ids, baked = scene.bake_poses(frames, workers=1)
+        # only animated objects and their children are baked, parents are before children
+        self.assertEqual([scene.get_object_by_id(id).get_name() for id in ids], ["arm", "hand", "finger", "mover", "passenger"])  # type: ignore
+        self.assertEqual(len(baked), 16 * len(frames) * len(ids))
+        # frames are split into several parts for each process
+        parallel_ids, parallel_baked = scene.bake_poses(frames, workers=2)
+        self.assertEqual(parallel_ids, ids)
+        self.assertEqual(parallel_baked, baked)
+
+        expected: array = self.get_expected(scene, ids, frames)
+        for a, b in zip(baked, expected):
+            self.assertAlmostEqual(a, b)
+
+    def test_static_scene(self) -> None:
+        scene: Scene = Scene()
+        scene.create_object("root").create_subobject("child").set_local_translation(1.0, 0.0, 0.0)
+        self.assertEqual(scene.bake_poses([0.0, 1.0], workers=2), ([], array("d")))
+
+if __name__ == "__main__":
+    unittest.main()
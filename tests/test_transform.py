@@ -0,0 +1,59 @@
+import math
+import random
+import unittest
+from py3dscene.transform import Transform
+from py3dscene.transform import get_srt_matrix
+from py3dscene.transform import get_rotation_matrix
+from py3dscene.transform import multiply
+from py3dscene.transform import tfm_to_rotation
+from py3dscene.transform import tfm_to_srt
+from py3dscene.transform import transforms_to_buffer
+from py3dscene.transform import buffer_to_transforms
+from py3dscene.transform_batch import multiply_buffers
+from py3dscene.transform_batch import quaternions_to_transforms_buffer
+from py3dscene.transform_batch import srt_to_transforms_buffer
+from py3dscene.transform_batch import transforms_to_quaternions_buffer
+from py3dscene.transform_batch import transforms_to_srt_buffers
+
+def random_srt(rnd: random.Random) -> tuple[tuple[float, float, float], tuple[float, float, float, float], tuple[float, float, float]]:
+    q: list[float] = [rnd.uniform(-1.0, 1.0) for _ in range(4)]
+    q_length: float = math.sqrt(sum(v * v for v in q))
+    return ((rnd.uniform(-10.0, 10.0), rnd.uniform(-10.0, 10.0), rnd.uniform(-10.0, 10.0)),
+            (q[0] / q_length, q[1] / q_length, q[2] / q_length, q[3] / q_length),
+            (rnd.uniform(0.1, 4.0), rnd.uniform(0.1, 4.0), rnd.uniform(0.1, 4.0)))
+
+class TestTransform(unittest.TestCase):
+    def test_scalar_and_batch(self) -> None:
+        # scalar functions have own implementations, but results should be the same as for stacks
+        rnd: random.Random = random.Random(1)
+        srts = [random_srt(rnd) for _ in range(200)]
+        tfms: list[Transform] = [get_srt_matrix(*srt) for srt in srts]
+        translations: list[float] = [v for srt in srts for v in srt[0]]
+        rotations: list[float] = [v for srt in srts for v in srt[1]]
+        scales: list[float] = [v for srt in srts for v in srt[2]]
+        self.assertEqual(buffer_to_transforms(srt_to_transforms_buffer(translations, rotations, scales)), tfms)
+        self.assertEqual(buffer_to_transforms(quaternions_to_transforms_buffer(rotations)), [get_rotation_matrix(*srt[1]) for srt in srts])
+
+        buffer = transforms_to_buffer(tfms)
+        self.assertEqual(buffer_to_transforms(multiply_buffers(buffer, buffer[16:] + buffer[:16])),
+                         [multiply(tfms[i], tfms[(i + 1) % len(tfms)]) for i in range(len(tfms))])
+        self.assertEqual(list(transforms_to_quaternions_buffer(buffer)), [v for tfm in tfms for v in tfm_to_rotation(tfm)])
+        batch_translations, batch_rotations, batch_scales = transforms_to_srt_buffers(buffer)
+        self.assertEqual(list(batch_translations), [v for tfm in tfms for v in tfm_to_srt(tfm)[0]])
+        self.assertEqual(list(batch_rotations), [v for tfm in tfms for v in tfm_to_srt(tfm)[1]])
+        self.assertEqual(list(batch_scales), [v for tfm in tfms for v in tfm_to_srt(tfm)[2]])
+
+    def test_srt_round_trip(self) -> None:
+        rnd: random.Random = random.Random(2)
+        for _ in range(100):
+            translation, rotation, scale = random_srt(rnd)
+            out_translation, out_rotation, out_scale = tfm_to_srt(get_srt_matrix(translation, rotation, scale))
+            for a, b in zip(translation + scale, out_translation + out_scale):
+                self.assertAlmostEqual(a, b)
+            # q and -q define the same rotation
+            sign: float = 1.0 if sum(a * b for a, b in zip(rotation, out_rotation)) > 0.0 else -1.0
+            for a, b in zip(rotation, out_rotation):
+                self.assertAlmostEqual(a, sign * b)
+
+if __name__ == "__main__":
+    unittest.main()